@@ -1,46 +1,86 @@
 """Aetheris — Alerts Routes"""
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
 from app.schemas import AlertCreate, AlertResponse, AcknowledgeRequest
-from datetime import datetime
-import uuid
+from app.services.alert_events import alert_events
+from app.services.alert_store import InvalidCursor, alert_store
+from typing import Optional
 
 router = APIRouter()
 
-_alerts: dict = {}
+DEFAULT_PAGE_SIZE = 50
 
-@router.get("/", summary="Get all alerts")
-async def get_alerts(patient_id: str = None, unread_only: bool = False):
-    alerts = list(_alerts.values())
-    if patient_id:
-        alerts = [a for a in alerts if a["patient_id"] == patient_id]
-    if unread_only:
-        alerts = [a for a in alerts if not a["acknowledged"]]
-    return {"alerts": sorted(alerts, key=lambda x: x["created_at"], reverse=True), "total": len(alerts)}
+@router.get("/", summary="Get alerts, newest first")
+async def get_alerts(
+    patient_id: Optional[str] = None,
+    unread_only: bool = False,
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; 50 when only a cursor is given"),
+):
+    """
+    One page of alerts; follow `next_cursor` until it is null. Without
+    `cursor` and `limit`, every matching alert is returned in one response,
+    as before pagination existed.
+    """
+    if limit is None and cursor is not None:
+        limit = DEFAULT_PAGE_SIZE
+    try:
+        alerts, next_cursor, total = alert_store.query(patient_id, unread_only, cursor, limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"alerts": alerts, "total": total, "next_cursor": next_cursor}
 
 @router.post("/", response_model=AlertResponse, summary="Create an alert")
 async def create_alert(req: AlertCreate):
-    aid = str(uuid.uuid4())
-    alert = {
-        "id": aid, **req.dict(),
-        "acknowledged": False,
-        "created_at": datetime.utcnow().isoformat()
-    }
-    _alerts[aid] = alert
-    return alert
+    return alert_store.add(req)
 
 @router.patch("/{alert_id}/acknowledge", summary="Acknowledge an alert")
 async def acknowledge_alert(alert_id: str, req: AcknowledgeRequest):
-    if alert_id not in _alerts:
+    if not alert_store.acknowledge(alert_id, req.acknowledged_by):
         raise HTTPException(status_code=404, detail="Alert not found")
-    _alerts[alert_id]["acknowledged"] = True
-    _alerts[alert_id]["acknowledged_by"] = req.acknowledged_by
     return {"status": "acknowledged", "alert_id": alert_id}
 
 @router.delete("/acknowledge-all", summary="Acknowledge all alerts")
 async def acknowledge_all(patient_id: str = None):
-    count = 0
-    for alert in _alerts.values():
-        if not patient_id or alert["patient_id"] == patient_id:
-            alert["acknowledged"] = True
-            count += 1
-    return {"acknowledged_count": count}
+    return {"acknowledged_count": alert_store.acknowledge_all(patient_id)}
+
+@router.get("/stream", summary="Push alert events (Server-Sent Events)")
+async def stream_alerts(
+    patient_id: Optional[str] = None,
+    last_event_id: Optional[int] = Query(None, description="Resume after this event id (or send the Last-Event-ID header)"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    `text/event-stream` of `alert.created` and `alert.acknowledged` events,
+    each with an `id` and the alert as JSON `data`. Reconnecting with
+    `Last-Event-ID` replays what was missed; a `reset` event means the gap
+    is no longer buffered and the client should refetch `GET /api/alerts/` once.
+    """
+    if last_event_id is None and last_event_id_header:
+        try:
+            last_event_id = int(last_event_id_header)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID must be an integer")
+
+    async def events():
+        async with alert_events.subscribe(patient_id, last_event_id) as sub:
+            yield "retry: 3000\n\n"
+            for frame in sub.backlog:
+                yield frame
+            while True:
+                try:
+                    frame = await asyncio.wait_for(sub.queue.get(), settings.ALERT_STREAM_HEARTBEAT_SEC)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if frame is None:   # closed by the bus: client reconnects and resumes
+                    return
+                yield frame
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,23 +1,25 @@
 """
 Aetheris — API Routes: Intra-Operative
 POST /api/intraop/anomaly-check
+POST /api/intraop/anomaly-check/batch
 POST /api/intraop/voice-command
 PATCH /api/intraop/procedure-step
 WS   /api/intraop/vitals-stream/{patient_id}
 """
-import asyncio
-import json
-import random
-import math
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
 
+from app.core.inference import inference_pool
 from app.schemas import (
     AnomalyCheckRequest, AnomalyResult,
+    AnomalyCheckBatchRequest, AnomalyCheckBatchResponse,
     VoiceCommandRequest, VoiceCommandResponse,
     ProcedureStepUpdate
 )
-from app.services.intraop_service import analyze_anomalies, process_voice_command
+from app.services.intraop_service import (
+    anomaly_batcher, analyze_anomalies_batch, process_voice_command,
+)
+from app.services.vitals_hub import vitals_hub
 
 router = APIRouter()
 
@@ -29,7 +31,25 @@ async def check_anomaly(req: AnomalyCheckRequest):
     Call this every time new vitals data arrives from OR monitoring equipment.
     """
     try:
-        return analyze_anomalies(req)
+        return await anomaly_batcher.submit(req)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/anomaly-check/batch", response_model=AnomalyCheckBatchResponse,
+             summary="Check vitals for many patients at once")
+async def check_anomaly_batch(req: AnomalyCheckBatchRequest):
+    """
+    Evaluate one reading per OR (e.g. a central monitoring station's 1 Hz
+    sweep) in a single pass over an (N patients × 7 vitals) matrix.
+    """
+    try:
+        results = await inference_pool.run(analyze_anomalies_batch, req.readings)
+        return AnomalyCheckBatchResponse(
+            results=results,
+            total=len(results),
+            anomalies=sum(r.has_anomaly for r in results),
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -75,79 +95,24 @@ async def get_procedure_steps():
 
 
 # ── WEBSOCKET: LIVE VITALS STREAM ──────────────────────────────────────────
-def simulate_vitals(t: int, patient_id: str) -> dict:
-    """
-    Simulate realistic live vitals with sinusoidal variation + noise.
-    In production: replace with real IoT device data.
-    """
-    # Use patient_id as seed offset for variety between patients
-    seed_offset = sum(ord(c) for c in patient_id) % 20
-
-    hr   = 75 + 8 * math.sin(t * 0.05 + seed_offset) + random.gauss(0, 1.5)
-    spo2 = 97.5 + 1.5 * math.sin(t * 0.03) + random.gauss(0, 0.3)
-    sbp  = 120 + 12 * math.sin(t * 0.04 + 1) + random.gauss(0, 2)
-    dbp  = 78  + 8  * math.sin(t * 0.04 + 1) + random.gauss(0, 1.5)
-    temp = 36.8 + 0.3 * math.sin(t * 0.02) + random.gauss(0, 0.05)
-    etco2 = 38 + 4 * math.sin(t * 0.06) + random.gauss(0, 0.8)
-    rr   = 15 + 3 * math.sin(t * 0.03) + random.gauss(0, 0.5)
-
-    # Clamp values to clinical ranges
-    vitals = {
-        "heart_rate":   round(max(40, min(160, hr)), 1),
-        "spo2":         round(max(85, min(100, spo2)), 1),
-        "systolic_bp":  round(max(70, min(200, sbp)), 1),
-        "diastolic_bp": round(max(40, min(130, dbp)), 1),
-        "temperature":  round(max(35.0, min(40.5, temp)), 2),
-        "etco2":        round(max(15, min(70, etco2)), 1),
-        "resp_rate":    round(max(6, min(35, rr)), 1),
-        "timestamp":    datetime.utcnow().isoformat(),
-        "patient_id":   patient_id,
-    }
-
-    # Determine overall status
-    status = "normal"
-    if vitals["spo2"] < 90 or vitals["heart_rate"] > 135 or vitals["heart_rate"] < 45:
-        status = "critical"
-    elif vitals["spo2"] < 93 or vitals["systolic_bp"] > 160:
-        status = "warning"
-    vitals["status"] = status
-
-    return vitals
-
-
 @router.websocket("/vitals-stream/{patient_id}")
 async def vitals_stream(websocket: WebSocket, patient_id: str):
     """
     WebSocket endpoint for live vitals streaming.
-    Sends a new vitals reading every 1.5 seconds.
+    Sends a new vitals reading every 1.5 seconds (VITALS_STREAM_INTERVAL_SEC).
+    All sockets for the same patient share one producer, so every dashboard
+    sees the same readings and alerts.
 
     Frontend usage:
         const ws = new WebSocket(`ws://localhost:8000/api/intraop/vitals-stream/${patientId}`);
         ws.onmessage = (e) => { const vitals = JSON.parse(e.data); /* update UI */ };
     """
     await websocket.accept()
-    t = 0
     try:
-        while True:
-            vitals = simulate_vitals(t, patient_id)
-            await websocket.send_text(json.dumps(vitals))
-
-            # Auto-trigger anomaly check every tick
-            from app.schemas import AnomalyCheckRequest, VitalsReading
-            check = AnomalyCheckRequest(
-                patient_id=patient_id,
-                vitals=VitalsReading(**{k:v for k,v in vitals.items()
-                                        if k not in ("timestamp","patient_id","status")})
-            )
-            result = analyze_anomalies(check)
-            if result.has_anomaly:
-                await websocket.send_text(json.dumps({
-                    "type": "ANOMALY_ALERT",
-                    "alerts": [a.dict() for a in result.alerts_fired],
-                }))
-
-            t += 1
-            await asyncio.sleep(1.5)
+        # One producer per patient feeds every socket watching them
+        async with vitals_hub.subscribe(patient_id) as frames:
+            while True:
+                await websocket.send_text(await frames.get())
 
     except WebSocketDisconnect:
         pass
@@ -1,7 +1,13 @@
 """Aetheris — Post-Operative Routes"""
 from fastapi import APIRouter, HTTPException
-from app.schemas import ComplicationRiskRequest, ComplicationRiskResponse, ReportGenerateRequest
-from app.services.postop_service import predict_complications, run_report_generation
+from app.schemas import (
+    ComplicationRiskRequest, ComplicationRiskResponse, ReportGenerateRequest,
+    ComplicationRiskBatchRequest, ComplicationRiskBatchResponse,
+)
+from app.core.inference import inference_pool
+from app.services.postop_service import (
+    predict_complication_risk, predict_complications_batch, run_report_generation,
+)
 
 router = APIRouter()
 
@@ -10,6 +16,20 @@ router = APIRouter()
 async def complication_risk(req: ComplicationRiskRequest):
     """ML-powered prediction for DVT, Infection, Pneumonia, and 30-day Readmission."""
     try:
-        return predict_complications(req)
+        return await predict_complication_risk(req)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/complication-risk/batch", response_model=ComplicationRiskBatchResponse,
+             summary="Predict complication risks for a whole census")
+async def complication_risk_batch(req: ComplicationRiskBatchRequest):
+    """
+    Score many patients (e.g. a full PACU census) in one call.
+    Builds a single feature matrix and makes one model prediction for all rows.
+    """
+    try:
+        results = await inference_pool.run(predict_complications_batch, req.patients)
+        return ComplicationRiskBatchResponse(results=results, total=len(results))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
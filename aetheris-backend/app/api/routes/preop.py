@@ -1,10 +1,15 @@
 """
 Aetheris — API Routes: Pre-Operative
 POST /api/preop/assess
+POST /api/preop/assess/batch
 """
 from fastapi import APIRouter, HTTPException
-from app.schemas import PreOpAssessmentRequest, PreOpAssessmentResponse
-from app.services.preop_service import run_preop_assessment
+from fastapi.responses import StreamingResponse
+from app.schemas import (
+    PreOpAssessmentRequest, PreOpAssessmentResponse,
+    PreOpBatchRequest, PreOpBatchResult,
+)
+from app.services.preop_service import run_preop_assessment, run_preop_assessment_batch
 
 router = APIRouter()
 
@@ -23,6 +28,20 @@ async def assess_patient(req: PreOpAssessmentRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/assess/batch", summary="Run Pre-Op Assessment for a full OR schedule")
+async def assess_batch(req: PreOpBatchRequest):
+    """
+    Assess many scheduled cases in one call.
+    Streams newline-delimited JSON, one PreOpBatchResult per line, in the order
+    cases complete; `index` refers to the position in `cases`.
+    """
+    async def ndjson():
+        async for index, assessment in run_preop_assessment_batch(req.cases):
+            yield PreOpBatchResult(index=index, assessment=assessment).model_dump_json() + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
 @router.get("/checklist/templates", summary="Get standard checklist templates")
 async def get_checklist_templates():
     """Return base checklist templates for all surgery types."""
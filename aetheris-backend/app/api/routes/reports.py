@@ -1,7 +1,9 @@
 """Aetheris — Report Generation Routes"""
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from app.schemas import ReportGenerateRequest, ReportResponse, ReportSendToEHR
-from app.services.postop_service import run_report_generation
+from app.services.postop_service import run_report_generation, stream_report_generation
 from datetime import datetime
 
 router = APIRouter()
@@ -18,6 +20,26 @@ async def generate_report(req: ReportGenerateRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/generate/stream", summary="Generate AI clinical report, streamed (Server-Sent Events)")
+async def generate_report_stream(req: ReportGenerateRequest):
+    """
+    `text/event-stream` of the report as it is written: `token` events with
+    `{"text"}` deltas, then `stats` (`source`, `ttft_ms`, `total_ms`) and a
+    final `report` event carrying the full ReportResponse. A `reset` event
+    means the API failed mid-report; discard the text so far, the template
+    report follows.
+    """
+    async def events():
+        async for event, data in stream_report_generation(req):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/send-to-ehr", summary="Send report to EHR system")
 async def send_to_ehr(req: ReportSendToEHR):
     """Mock EHR submission endpoint. In production: integrates with Epic/Cerner via FHIR R4."""
@@ -1,30 +1,129 @@
 """Aetheris — Vitals Routes"""
-from fastapi import APIRouter
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from app.core.config import settings
 from app.schemas import VitalsLogRequest
-from datetime import datetime
+from app.services.vitals_ingest import BulkIngestError, apply_batch, log_rows, prepare_body
+from app.services.vitals_store import (
+    ROLLUP_TIERS, VITAL_COLUMNS, OutOfOrderError,
+    rollup_to_series, rows_to_readings, to_epoch_us, to_naive_utc, vitals_store,
+)
+from app.services.vitals_writer import WriteBehindFull, vitals_row, vitals_writer
+from datetime import datetime, timedelta
+from typing import Optional
 
 router = APIRouter()
 
-_vitals_history: dict = {}
+# Window served when only `end` (or only `resolution`) is given
+DEFAULT_HISTORY_WINDOW = timedelta(hours=1)
 
 @router.post("/log", summary="Log a vitals reading")
 async def log_vitals(req: VitalsLogRequest):
     pid = req.patient_id
-    if pid not in _vitals_history:
-        _vitals_history[pid] = []
-    reading = req.vitals.dict()
-    reading["recorded_at"] = datetime.utcnow().isoformat()
-    _vitals_history[pid].append(reading)
-    # Keep last 100 readings
-    _vitals_history[pid] = _vitals_history[pid][-100:]
+    recorded_at = datetime.utcnow()
+    try:
+        # Backpressure from the DB write-behind queue, before touching history
+        await vitals_writer.wait_for_capacity(1)
+    except WriteBehindFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    try:
+        vitals_store.append(pid, req.vitals, recorded_at)
+    except OutOfOrderError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    reading = {c: getattr(req.vitals, c) for c in VITAL_COLUMNS}
+    vitals_writer.put_nowait([vitals_row(pid, req.surgery_id, reading, recorded_at)])
+    reading["recorded_at"] = recorded_at.isoformat()
     return {"status": "logged", "patient_id": pid, "reading": reading}
 
+@router.post(
+    "/bulk",
+    summary="Ingest a batch of vitals readings",
+    openapi_extra={"requestBody": {"required": True, "content": {
+        "application/json":     {"schema": {"type": "array", "items": VitalsLogRequest.model_json_schema()}},
+        "application/x-ndjson": {"schema": {"type": "string", "description": "One VitalsLogRequest JSON object per line"}},
+    }}},
+)
+async def ingest_vitals_bulk(request: Request):
+    """
+    For monitor gateways: many patients' readings in one request, as a JSON
+    array or NDJSON (`Content-Type: application/x-ndjson`) of VitalsLogRequest
+    objects. `vitals.recorded_at` is the device time; readings without one
+    are stamped on receipt.
+
+    Returns one ack per reading, in request order: `accepted` (with any
+    threshold alerts fired) or `rejected` with the validation errors. Readings
+    older than the patient's latest stored reading are rejected as out of order.
+    Accepted readings also go through the alert engine, as live ticks do.
+    """
+    body = await request.body()
+    received_at = datetime.utcnow()
+    try:
+        # Decode + validate + classify off the loop; only the store append runs on it
+        batch = await asyncio.to_thread(prepare_body, body, request.headers.get("content-type"), received_at)
+        await vitals_writer.wait_for_capacity(batch.n - len(batch.errors))
+        result = apply_batch(batch)
+        vitals_writer.put_nowait(log_rows(batch))
+        # Acks are plain JSON types already; skip jsonable_encoder's walk over 10k+ dicts
+        return JSONResponse(result)
+    except BulkIngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WriteBehindFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{patient_id}/history", summary="Get vitals history for patient")
-async def get_vitals_history(patient_id: str, limit: int = 20):
-    history = _vitals_history.get(patient_id, [])
+async def get_vitals_history(
+    patient_id: str,
+    limit: int = Query(20, ge=1, description="Raw readings to return when no time range is given"),
+    start: Optional[datetime] = Query(None, description="Range start (UTC)"),
+    end: Optional[datetime] = Query(None, description="Range end (UTC), default now"),
+    resolution: Optional[str] = Query(
+        None, pattern="^(auto|1s|1m|5m)$",
+        description="Rollup tier: 1s, 1m, 5m, or auto (finest that fits VITALS_HISTORY_MAX_POINTS)",
+    ),
+):
+    """
+    Without start/end/resolution: the last `limit` raw readings.
+    With any of them: min/max/mean/last per bucket from a rollup tier, as
+    parallel arrays, capped at VITALS_HISTORY_MAX_POINTS buckets.
+    """
+    if start is None and end is None and resolution is None:
+        # Zero-copy views of the ring buffer; only the returned rows become dicts
+        ts, values = vitals_store.last(patient_id, limit)
+        readings = rows_to_readings(ts, values)
+        return {
+            "patient_id": patient_id,
+            "readings":   readings,
+            "latest":     readings[-1] if readings else None,
+            "total":      vitals_store.size(patient_id),
+        }
+
+    # Compare in naive UTC: the bounds may be timezone-aware, utcnow() is not
+    end = to_naive_utc(end) if end else datetime.utcnow()
+    start = to_naive_utc(start) if start else end - DEFAULT_HISTORY_WINDOW
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    start_us, end_us = to_epoch_us(start), to_epoch_us(end)
+    max_points = settings.VITALS_HISTORY_MAX_POINTS
+
+    if resolution in (None, "auto"):
+        resolution = vitals_store.pick_resolution(patient_id, start_us, end_us, max_points)
+    tier = vitals_store.rollup(patient_id, resolution)
+    if tier is None:
+        columns, truncated = None, False
+    else:
+        columns, truncated = tier.query(start_us, end_us, max_points)
+
     return {
         "patient_id": patient_id,
-        "readings":   history[-limit:],
-        "latest":     history[-1] if history else None,
-        "total":      len(history),
+        "resolution": resolution,
+        "bucket_sec": ROLLUP_TIERS[resolution][0],
+        "start":      start.isoformat(),
+        "end":        end.isoformat(),
+        "truncated":  truncated,
+        "total":      0 if columns is None else len(columns["start"]),
+        **(rollup_to_series(columns) if columns is not None
+           else {"timestamps": [], "count": [], "series": {}}),
     }
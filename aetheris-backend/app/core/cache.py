@@ -0,0 +1,220 @@
+"""
+Aetheris — Tiered TTL Cache
+Two-tier read-through cache for slow, rarely-changing upstream lookups:
+
+  • memory — LRU of up to `max_entries` keys, each with its own expiry
+  • disk   — SQLite table that survives restarts and is shared across workers
+
+A lookup checks memory, then disk (promoting disk hits to memory), then calls
+the fetch function and stores the result in both tiers. Results the caller
+marks negative (e.g. "no label found") are kept for `negative_ttl_sec`.
+When the fetch fails, the last known value is served even if expired
+(stale-if-error); with nothing to serve, the fallback value is cached for
+`error_ttl_sec` so an unreachable upstream is not hammered on every request.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger("aetheris.cache")
+
+# (expires_at epoch seconds, value)
+_Entry = Tuple[float, Any]
+
+
+class _DiskTier:
+    """Key/value rows with an expiry, in one SQLite table per cache namespace."""
+
+    def __init__(self, path: str, namespace: str, keep_stale_sec: float):
+        self.path = path
+        self.namespace = namespace
+        self.keep_stale_sec = keep_stale_sec
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL,"
+                " value TEXT NOT NULL, expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            # Drop entries too old to be useful even as stale fallbacks
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND expires_at < ?",
+                (self.namespace, time.time() - self.keep_stale_sec),
+            )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[_Entry]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT expires_at, value FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), expires_at),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class TieredCache:
+    """In-memory LRU + TTL in front of an optional SQLite tier. Values must be JSON-serializable."""
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = 1024,
+        ttl_sec: float = 86_400.0,
+        negative_ttl_sec: float = 3_600.0,
+        error_ttl_sec: float = 60.0,
+        path: Optional[str] = None,
+        keep_stale_sec: float = 7 * 86_400.0,
+    ):
+        self.namespace        = namespace
+        self.max_entries      = max_entries
+        self.ttl_sec          = ttl_sec
+        self.negative_ttl_sec = negative_ttl_sec
+        self.error_ttl_sec    = error_ttl_sec
+        self._memory: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._disk = _DiskTier(path, namespace, keep_stale_sec) if path else None
+
+        # Metrics
+        self.memory_hits   = 0
+        self.disk_hits     = 0
+        self.misses        = 0
+        self.fetch_errors  = 0
+        self.stale_served  = 0
+        self.disk_errors   = 0
+        self.evictions     = 0
+
+    # ── TIERS ───────────────────────────────────────────────────────────────
+    def _remember(self, key: str, entry: _Entry) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    async def _disk_get(self, key: str) -> Optional[_Entry]:
+        if self._disk is None:
+            return None
+        try:
+            return await asyncio.to_thread(self._disk.get, key)
+        except (sqlite3.Error, ValueError) as e:
+            self.disk_errors += 1
+            logger.warning(f"Cache '{self.namespace}' disk read failed: {e}")
+            return None
+
+    async def _disk_set(self, key: str, entry: _Entry) -> None:
+        if self._disk is None:
+            return
+        try:
+            await asyncio.to_thread(self._disk.set, key, entry[1], entry[0])
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self.disk_errors += 1
+            logger.warning(f"Cache '{self.namespace}' disk write failed: {e}")
+
+    async def _lookup(self, key: str) -> Tuple[bool, Any, Optional[_Entry]]:
+        """(hit, value, expired entry still on hand) — memory first, then disk."""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None and entry[0] > now:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return True, entry[1], None
+        disk_entry = await self._disk_get(key)
+        if disk_entry is not None and disk_entry[0] > now:
+            self._remember(key, disk_entry)
+            self.disk_hits += 1
+            return True, disk_entry[1], None
+        self.misses += 1
+        return False, None, entry or disk_entry
+
+    # ── API ─────────────────────────────────────────────────────────────────
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        """(found, value) for an unexpired entry."""
+        hit, value, _ = await self._lookup(key)
+        return hit, value
+
+    async def set(self, key: str, value: Any, ttl_sec: Optional[float] = None) -> None:
+        entry = (time.time() + (self.ttl_sec if ttl_sec is None else ttl_sec), value)
+        self._remember(key, entry)
+        await self._disk_set(key, entry)
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        is_negative: Callable[[Any], bool] = lambda value: value is None,
+        fallback: Any = None,
+    ) -> Any:
+        """
+        Cached value for `key`, calling `fetch()` on a miss. `fetch` should raise
+        on upstream failure; this method never raises for it.
+        """
+        hit, value, stale = await self._lookup(key)
+        if hit:
+            return value
+
+        try:
+            value = await fetch()
+        except Exception as e:
+            self.fetch_errors += 1
+            if stale is not None:
+                self.stale_served += 1
+                value = stale[1]
+                logger.warning(f"Cache '{self.namespace}' fetch for {key!r} failed, serving stale value: {e}")
+            else:
+                value = fallback
+                logger.warning(f"Cache '{self.namespace}' fetch for {key!r} failed: {e}")
+            # Retry after error_ttl_sec. Memory only, so the outage does not outlive a restart
+            self._remember(key, (time.time() + self.error_ttl_sec, value))
+            return value
+
+        await self.set(key, value, self.negative_ttl_sec if is_negative(value) else self.ttl_sec)
+        return value
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "entries_memory": len(self._memory),
+            "max_entries":    self.max_entries,
+            "disk_enabled":   self._disk is not None,
+            "memory_hits":    self.memory_hits,
+            "disk_hits":      self.disk_hits,
+            "misses":         self.misses,
+            "hit_ratio":      round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "fetch_errors":   self.fetch_errors,
+            "stale_served":   self.stale_served,
+            "disk_errors":    self.disk_errors,
+            "evictions":      self.evictions,
+        }
@@ -7,6 +7,10 @@ from pydantic_settings import BaseSettings
 from typing import List
 import os
 
+# Local runtime data (on-disk caches). Anchored to the backend directory, not
+# the working directory, and git-ignored: the caches may hold patient data.
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data")
+
 
 class Settings(BaseSettings):
     # ── APP ─────────────────────────────────────────────────────────────────
@@ -28,15 +32,101 @@ class Settings(BaseSettings):
     LLM_MODEL: str = "claude-3-5-sonnet-20241022"
     LLM_MAX_TOKENS: int = 2048
     LLM_TEMPERATURE: float = 0.3
+    PREOP_BATCH_LLM_CONCURRENCY: int = 8   # Parallel Claude summaries per batch assessment
+
+    # ── LLM GATEWAY (shared client, limits, retries, circuit breaker) ────────
+    LLM_TIMEOUT_SEC: float = 30.0             # Per attempt
+    LLM_MAX_CONCURRENCY: int = 16             # In-flight Claude calls per process
+    LLM_QUEUE_TIMEOUT_SEC: float = 5.0        # Wait for a slot / rate token, then fallback
+    LLM_RATE_PER_SEC: float = 10.0            # Token bucket (0 = unlimited)
+    LLM_RATE_BURST: int = 20
+    LLM_RETRIES: int = 2                      # Transient errors only
+    LLM_RETRY_BASE_SEC: float = 0.5
+    LLM_RETRY_MAX_SEC: float = 4.0
+    LLM_BREAKER_FAILURES: int = 5             # Consecutive failed calls that open the circuit
+    LLM_BREAKER_COOLDOWN_SEC: float = 30.0    # Fail fast this long, then probe once
+
+    # ── REQUEST COALESCING (single-flight) ───────────────────────────────────
+    SINGLEFLIGHT_ENABLED: bool = True         # Identical concurrent requests share one computation
+
+    # ── LLM RESPONSE CACHE (content-addressed) ───────────────────────────────
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 512          # In-memory LRU size
+    LLM_CACHE_TTL_SEC: float = 86_400.0
+    LLM_CACHE_PATH: str = os.path.join(DATA_DIR, "llm_cache.db")   # On-disk tier ("" = memory only); holds patient text
+
+    # ── PRE-OP PIPELINE STAGE DEADLINES ──────────────────────────────────────
+    PREOP_ASA_TIMEOUT_SEC: float = 2.0        # Then the heuristic ASA class
+    PREOP_OPENFDA_TIMEOUT_SEC: float = 3.0    # Then "no label warnings"
+    PREOP_SUMMARY_TIMEOUT_SEC: float = 15.0   # Then the template summary
 
     # ── DRUG INTERACTION ─────────────────────────────────────────────────────
     OPENFDA_BASE_URL: str = "https://api.fda.gov/drug/event.json"
     RXNORM_BASE_URL: str = "https://rxnav.nlm.nih.gov/REST"
+    OPENFDA_TIMEOUT_SEC: float = 5.0
+    OPENFDA_CACHE_MAX_ENTRIES: int = 2048            # In-memory LRU size
+    OPENFDA_CACHE_TTL_SEC: float = 86_400.0          # Labels with warnings
+    OPENFDA_CACHE_NEGATIVE_TTL_SEC: float = 21_600.0 # No label / no warnings
+    OPENFDA_CACHE_ERROR_TTL_SEC: float = 60.0        # API unreachable: retry after
+    OPENFDA_CACHE_PATH: str = os.path.join(DATA_DIR, "openfda_cache.db")   # On-disk tier ("" = memory only)
+
+    # ── OUTBOUND HTTP (shared keep-alive pools, one per upstream) ────────────
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_MAX_KEEPALIVE_PER_HOST: int = 10
+    HTTP_KEEPALIVE_EXPIRY_SEC: float = 30.0
+    HTTP_CONNECT_TIMEOUT_SEC: float = 3.0
+    HTTP_READ_TIMEOUT_SEC: float = 10.0     # Default for upstreams without their own
+    HTTP_POOL_TIMEOUT_SEC: float = 2.0      # Wait for a free connection when the pool is full
+    WHISPER_TIMEOUT_SEC: float = 15.0
 
     # ── ML MODELS ────────────────────────────────────────────────────────────
     ML_MODELS_DIR: str = "./app/ml/models"
     ASA_MODEL_PATH: str = "./app/ml/models/asa_risk_model.pkl"
     COMPLICATION_MODEL_PATH: str = "./app/ml/models/complication_model.pkl"
+    ML_MODEL_RELOAD_INTERVAL_SEC: float = 30.0   # How often to check .pkl files for changes
+    ML_COMPILED_INFERENCE: bool = True          # Serve tree models from the flat NumPy engine
+    ML_ARTIFACT_FORMAT: str = "auto"            # npy (mmap) | pickle | auto (npy when exported)
+
+    # ── INFERENCE EXECUTOR ───────────────────────────────────────────────────
+    INFERENCE_EXECUTOR: str = "thread"       # "thread" or "process"
+    INFERENCE_WORKERS: int = 2
+    INFERENCE_BATCH_WINDOW_MS: float = 2.0   # Micro-batch coalescing window
+    INFERENCE_MAX_BATCH_SIZE: int = 64
+
+    # ── LIVE VITALS STREAM ───────────────────────────────────────────────────
+    VITALS_STREAM_INTERVAL_SEC: float = 1.5
+    VITALS_STREAM_SUBSCRIBER_QUEUE: int = 16   # Frames buffered per socket; oldest dropped when full
+
+    # ── STREAMING ALERT ENGINE ───────────────────────────────────────────────
+    ALERT_RENOTIFY_CRITICAL_SEC: float = 60.0    # Repeat a still-active critical alert this often (0 = never)
+    ALERT_RENOTIFY_WARNING_SEC: float = 300.0    # Same for warnings
+    ALERT_CLEAR_HOLD_SEC: float = 30.0           # A vital must stay back in range this long to resolve/de-escalate
+
+    # ── ALERT PUSH STREAM (SSE) ──────────────────────────────────────────────
+    ALERT_EVENTS_REPLAY: int = 1000              # Recent events kept for Last-Event-ID resume
+    ALERT_STREAM_QUEUE: int = 256                # Frames buffered per client before it is disconnected to resync
+    ALERT_STREAM_HEARTBEAT_SEC: float = 15.0     # Keep-alive comment interval for idle streams
+
+    # ── VITALS HISTORY ───────────────────────────────────────────────────────
+    VITALS_HISTORY_HOURS: float = 4.0        # Ring buffer span per patient (~1.8 MB each at 1 Hz)
+    VITALS_HISTORY_SAMPLE_HZ: float = 1.0    # Expected reading rate; sizes the buffer
+    VITALS_ROLLUP_1S_HOURS: float = 1.0      # Retention of each rollup tier
+    VITALS_ROLLUP_1M_HOURS: float = 24.0
+    VITALS_ROLLUP_5M_HOURS: float = 72.0
+    VITALS_HISTORY_MAX_POINTS: int = 1000    # Cap on buckets per history query
+
+    # ── BULK VITALS INGESTION ────────────────────────────────────────────────
+    VITALS_BULK_MAX_ITEMS: int = 50_000           # Readings per /api/vitals/bulk request
+    VITALS_BULK_MAX_CLOCK_SKEW_SEC: float = 60.0  # Reject device timestamps this far ahead of server time
+
+    # ── VITALS PERSISTENCE (write-behind to vitals_logs) ─────────────────────
+    VITALS_PERSIST_ENABLED: bool = True
+    VITALS_WRITE_BATCH_ROWS: int = 1000                  # Flush when this many rows are queued...
+    VITALS_WRITE_INTERVAL_MS: float = 500.0              # ...or when the oldest queued row is this old
+    VITALS_WRITE_QUEUE_MAX: int = 50_000                 # Queue bound; producers wait beyond it
+    VITALS_WRITE_BACKPRESSURE_TIMEOUT_SEC: float = 2.0   # Then the request fails with 503
+    VITALS_WRITE_RETRIES: int = 3
+    VITALS_WRITE_DRAIN_TIMEOUT_SEC: float = 10.0         # Shutdown flush budget
 
     # ── CORS ──────────────────────────────────────────────────────────────────
     ALLOWED_ORIGINS: List[str] = [
@@ -29,7 +29,7 @@ class Base(DeclarativeBase):
 async def init_db():
     """Create all tables on startup."""
     async with engine.begin() as conn:
-        from app.models import patient, surgery, vitals_log, alert, report  # noqa
+        import app.models  # noqa: F401 — registers every table on Base.metadata
         await conn.run_sync(Base.metadata.create_all)
     logger.info("Database tables created/verified.")
 
@@ -0,0 +1,111 @@
+"""
+Aetheris — Shared Outbound HTTP Clients
+One long-lived httpx.AsyncClient per upstream service (OpenFDA, OpenAI),
+created in the app lifespan and shared by every request. Connections are
+kept alive between calls, so a pre-op assessment or voice command reuses an
+open TLS connection instead of paying for a new TCP + TLS handshake.
+
+Each upstream has its own pool, so HTTP_MAX_CONNECTIONS_PER_HOST bounds the
+connections to that host and a slow upstream cannot starve the others.
+"""
+
+import logging
+from typing import Any, Dict
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger("aetheris.http")
+
+UPSTREAM_OPENFDA = "openfda"
+UPSTREAM_OPENAI  = "openai"
+
+
+def _upstream_timeouts() -> Dict[str, float]:
+    """Read timeout per upstream, in seconds."""
+    return {
+        UPSTREAM_OPENFDA: settings.OPENFDA_TIMEOUT_SEC,
+        UPSTREAM_OPENAI:  settings.WHISPER_TIMEOUT_SEC,
+    }
+
+
+class HttpClients:
+    """Named, pooled httpx clients with keep-alive, per-host limits and timeouts."""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self.requests_total: Dict[str, int] = {}
+
+    # ── LIFECYCLE ───────────────────────────────────────────────────────────
+    def start(self) -> None:
+        for name in _upstream_timeouts():
+            self.get(name)
+        logger.info(
+            f"HTTP client pools ready: {', '.join(self._clients)} "
+            f"(≤{settings.HTTP_MAX_CONNECTIONS_PER_HOST} connections per host, "
+            f"keep-alive {settings.HTTP_KEEPALIVE_EXPIRY_SEC:g}s)"
+        )
+
+    async def aclose(self) -> None:
+        """Close every pool (app shutdown)."""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """
+        The shared client for an upstream. Created on first use, so scripts and
+        tests that skip the lifespan still get a pooled client.
+        """
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = self._build(name)
+        return client
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        read_timeout = _upstream_timeouts().get(name, settings.HTTP_READ_TIMEOUT_SEC)
+        self.requests_total.setdefault(name, 0)
+
+        async def count_request(request: httpx.Request) -> None:
+            self.requests_total[name] += 1
+
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                read_timeout,
+                connect=settings.HTTP_CONNECT_TIMEOUT_SEC,
+                pool=settings.HTTP_POOL_TIMEOUT_SEC,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_PER_HOST,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SEC,
+            ),
+            event_hooks={"request": [count_request]},
+        )
+
+    # ── METRICS ─────────────────────────────────────────────────────────────
+    def metrics(self) -> Dict[str, Any]:
+        """Pool utilization per upstream: open / in-use / idle connections and queued requests."""
+        pools: Dict[str, Any] = {}
+        for name, client in self._clients.items():
+            stats: Dict[str, Any] = {
+                "requests_total":  self.requests_total.get(name, 0),
+                "max_connections": settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            }
+            pool = getattr(client._transport, "_pool", None)   # httpcore.AsyncConnectionPool
+            if pool is not None:
+                connections = list(pool.connections)
+                active = sum(not c.is_idle() for c in connections)
+                stats.update({
+                    "connections_open":   len(connections),
+                    "connections_active": active,
+                    "connections_idle":   len(connections) - active,
+                    "requests_waiting":   sum(r.is_queued() for r in getattr(pool, "_requests", ())),
+                    "utilization":        round(active / settings.HTTP_MAX_CONNECTIONS_PER_HOST, 3),
+                })
+            pools[name] = stats
+        return pools
+
+
+http_clients = HttpClients()
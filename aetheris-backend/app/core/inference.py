@@ -0,0 +1,217 @@
+"""
+Aetheris — Inference Executor & Micro-Batching
+Runs CPU-bound model inference off the event loop in a dedicated thread or
+process pool. Concurrent requests for the same model are coalesced into a
+single batch call within a small time window.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger("aetheris.inference")
+
+BatchFn = Callable[[Sequence[Any]], List[Any]]
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+def round1(values: np.ndarray) -> np.ndarray:
+    """
+    Round scores to one decimal exactly like the scalar code paths' round(x, 1).
+    Python's round() is correctly rounded on ties (e.g. 60.15); np.round is not.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    return np.array([round(v, 1) for v in values.ravel().tolist()]).reshape(values.shape)
+
+
+# ── WORKER PROCESS SETUP ───────────────────────────────────────────────────
+_last_refresh = 0.0
+
+
+def _init_worker():
+    """Process-pool initializer: each worker keeps its own model registry."""
+    from app.ml.model_registry import model_registry
+    logging.basicConfig(level=logging.INFO)
+    model_registry.load()
+
+
+def _run_in_worker(fn: BatchFn, items: Sequence[Any]) -> List[Any]:
+    """Process-pool entry point: pick up retrained models, then run the batch."""
+    global _last_refresh
+    now = time.monotonic()
+    if now - _last_refresh >= settings.ML_MODEL_RELOAD_INTERVAL_SEC:
+        from app.ml.model_registry import model_registry
+        model_registry.refresh()
+        _last_refresh = now
+    return fn(items)
+
+
+# ── EXECUTOR POOL ──────────────────────────────────────────────────────────
+class InferencePool:
+    """Owns the executor used for all model inference."""
+
+    def __init__(self):
+        self._executor: Optional[Executor] = None
+        self.kind = settings.INFERENCE_EXECUTOR
+        self.workers = settings.INFERENCE_WORKERS
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        if self.kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        logger.info(f"Inference pool started: {self.workers} {self.kind} worker(s)")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, fn: BatchFn, items: Sequence[Any]) -> List[Any]:
+        """Run a batch function in the pool and await its result."""
+        self.start()
+        loop = asyncio.get_running_loop()
+        if self.kind == "process":
+            return await loop.run_in_executor(self._executor, _run_in_worker, fn, list(items))
+        return await loop.run_in_executor(self._executor, fn, items)
+
+
+inference_pool = InferencePool()
+
+
+# ── MICRO-BATCHER ──────────────────────────────────────────────────────────
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item requests into batch calls.
+
+    The first queued item opens a window of INFERENCE_BATCH_WINDOW_MS; every
+    item that arrives before it closes (up to INFERENCE_MAX_BATCH_SIZE) goes
+    into the same `batch_fn` call on the inference pool.
+    """
+
+    _all: List["MicroBatcher"] = []
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: BatchFn,
+        max_batch_size: Optional[int] = None,
+        window_ms: Optional[float] = None,
+    ):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size or settings.INFERENCE_MAX_BATCH_SIZE
+        self.window_sec = (window_ms if window_ms is not None else settings.INFERENCE_BATCH_WINDOW_MS) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight = 0
+
+        # Metrics
+        self.batches_total = 0
+        self.items_total = 0
+        self.errors_total = 0
+        self.last_batch_size = 0
+        self.max_batch_size_seen = 0
+        self.batch_seconds_total = 0.0
+        self.histogram: Dict[str, int] = {f"le_{b}": 0 for b in BATCH_SIZE_BUCKETS}
+        self.histogram["le_inf"] = 0
+
+        MicroBatcher._all.append(self)
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result from the next batch."""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._collect(self._queue, loop), name=f"microbatch-{self.name}")
+
+    async def _collect(self, queue: asyncio.Queue, loop: asyncio.AbstractEventLoop) -> None:
+        # Bound to the queue/loop it was started with, even if a later loop rebinds the batcher
+        slots = asyncio.Semaphore(max(1, inference_pool.workers))
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.window_sec
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await slots.acquire()
+            loop.create_task(self._dispatch(batch, slots))
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]], slots: asyncio.Semaphore) -> None:
+        items = [item for item, _ in batch]
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            results = await inference_pool.run(self.batch_fn, items)
+        except Exception as e:
+            self.errors_total += 1
+            logger.warning(f"Micro-batch '{self.name}' failed ({len(items)} items): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._in_flight -= 1
+            slots.release()
+            self._record(len(items), time.perf_counter() - started)
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _record(self, size: int, seconds: float) -> None:
+        self.batches_total += 1
+        self.items_total += size
+        self.last_batch_size = size
+        self.max_batch_size_seen = max(self.max_batch_size_seen, size)
+        self.batch_seconds_total += seconds
+        bucket = next((f"le_{b}" for b in BATCH_SIZE_BUCKETS if size <= b), "le_inf")
+        self.histogram[bucket] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        batches = self.batches_total or 1
+        return {
+            "queue_depth":         self._queue.qsize() if self._queue else 0,
+            "in_flight_batches":   self._in_flight,
+            "batches_total":       self.batches_total,
+            "items_total":         self.items_total,
+            "errors_total":        self.errors_total,
+            "last_batch_size":     self.last_batch_size,
+            "max_batch_size_seen": self.max_batch_size_seen,
+            "avg_batch_size":      round(self.items_total / batches, 2),
+            "avg_batch_ms":        round(self.batch_seconds_total / batches * 1000, 3),
+            "batch_size_histogram": dict(self.histogram),
+        }
+
+
+def inference_metrics() -> Dict[str, Any]:
+    return {
+        "executor":  inference_pool.kind,
+        "workers":   inference_pool.workers,
+        "window_ms": settings.INFERENCE_BATCH_WINDOW_MS,
+        "max_batch_size": settings.INFERENCE_MAX_BATCH_SIZE,
+        "batchers":  {b.name: b.metrics() for b in MicroBatcher._all},
+    }
@@ -0,0 +1,98 @@
+"""
+Aetheris — Stage Pipeline
+Runs a request's processing stages as a dependency graph: every stage starts
+as soon as the stages it depends on have finished, so independent stages
+overlap and end-to-end latency is the critical path rather than the sum.
+
+Each stage has its own deadline and a fallback. A stage that times out or
+raises is replaced by its fallback value and the rest of the graph carries
+on; the run reports how long each stage took and which ones fell back.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+logger = logging.getLogger("aetheris.pipeline")
+
+# Stage functions and fallbacks receive the results so far, keyed by stage name
+StageFn = Callable[[Dict[str, Any]], Union[Awaitable[Any], Any]]
+
+
+class Stage:
+    """One node of the graph."""
+
+    __slots__ = ("name", "fn", "deps", "timeout", "fallback")
+
+    def __init__(
+        self,
+        name: str,
+        fn: StageFn,
+        deps: Sequence[str] = (),
+        timeout: Optional[float] = None,
+        fallback: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ):
+        self.name     = name
+        self.fn       = fn
+        self.deps     = tuple(deps)
+        self.timeout  = timeout
+        self.fallback = fallback
+
+
+class PipelineRun:
+    """Results of one run: values by stage, time spent in each stage, stages that fell back."""
+
+    def __init__(self):
+        self.results: Dict[str, Any] = {}
+        self.timings_ms: Dict[str, float] = {}
+        self.fallbacks: List[str] = []
+
+
+async def run_pipeline(stages: Sequence[Stage], label: str = "pipeline") -> PipelineRun:
+    """
+    Run `stages` (listed after their dependencies) concurrently. Deadlines
+    apply to async stage functions; sync ones are expected to be instant. A
+    stage's timing covers its own work, not the wait for its dependencies;
+    `total` is wall time. Stages without a fallback propagate their errors.
+    """
+    seen: set = set()
+    for s in stages:
+        missing = [d for d in s.deps if d not in seen]
+        if missing:
+            raise ValueError(f"Stage '{s.name}' must come after its dependencies: {missing}")
+        seen.add(s.name)
+
+    run = PipelineRun()
+    started = time.perf_counter()
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def execute(stage: Stage) -> Any:
+        if stage.deps:
+            await asyncio.gather(*(tasks[d] for d in stage.deps))
+        start = time.perf_counter()
+        try:
+            value = stage.fn(run.results)
+            if inspect.isawaitable(value):
+                value = await asyncio.wait_for(value, stage.timeout)
+        except Exception as e:
+            if stage.fallback is None:
+                raise
+            reason = f"timed out after {stage.timeout}s" if isinstance(e, asyncio.TimeoutError) else repr(e)
+            logger.warning(f"{label}: stage '{stage.name}' {reason}, using fallback")
+            run.fallbacks.append(stage.name)
+            value = stage.fallback(run.results)
+        run.timings_ms[stage.name] = round((time.perf_counter() - start) * 1000, 2)
+        run.results[stage.name] = value
+        return value
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.create_task(execute(stage), name=f"{label}:{stage.name}")
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        for t in tasks.values():
+            t.cancel()
+    run.timings_ms["total"] = round((time.perf_counter() - started) * 1000, 2)
+    return run
@@ -0,0 +1,137 @@
+"""
+Aetheris — Upstream Resilience Primitives
+Building blocks for calling a slow or flaky upstream without letting it set
+our tail latency:
+
+  • TokenBucket    — average request rate with a burst allowance
+  • CircuitBreaker — after N consecutive failures, fail fast for a cooldown,
+                     then let a single probe through to test recovery
+  • backoff_delay  — capped exponential backoff with full jitter
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Dict, Optional
+
+
+class CircuitOpen(RuntimeError):
+    """The breaker is open: the upstream is considered down, don't call it."""
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`. rate <= 0 means unlimited."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take one token, waiting up to `timeout` seconds. False if none would
+        come in time. Waiting callers reserve their token up front (the
+        balance goes negative), so they are served in arrival order.
+        """
+        if self.rate <= 0:
+            return True
+        self._refill()
+        wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+        if timeout is not None and wait > timeout:
+            return False
+        self._tokens -= 1
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # The caller gave up before using its reservation: return it
+                self._tokens += 1
+                raise
+        return True
+
+
+class CircuitBreaker:
+    """Closed → open after `failure_threshold` consecutive failures → half-open after `cooldown_sec`."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int, cooldown_sec: float):
+        self.failure_threshold = failure_threshold
+        self.cooldown_sec = cooldown_sec
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe: Optional[object] = None   # token of the half-open probe in flight
+
+        # Metrics
+        self.opened_total         = 0
+        self.short_circuits_total = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown_sec:
+            return self.HALF_OPEN
+        return self._state
+
+    def before_call(self) -> Optional[object]:
+        """
+        Raise CircuitOpen unless a call may go through now. Returns a probe
+        token when this call is the half-open probe (None otherwise); pass it
+        back to record_success / record_failure / release.
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return None
+        if state == self.HALF_OPEN and self._probe is None:
+            self._probe = object()   # exactly one probe at a time
+            return self._probe
+        self.short_circuits_total += 1
+        raise CircuitOpen(f"Circuit open after {self._failures} consecutive failures")
+
+    def _is_probe(self, probe: Optional[object]) -> bool:
+        return probe is not None and probe is self._probe
+
+    def record_success(self, probe: Optional[object] = None) -> None:
+        # While open, only the probe decides; a call admitted before the circuit opened does not
+        if self._state != self.CLOSED and not self._is_probe(probe):
+            return
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probe = None
+
+    def record_failure(self, probe: Optional[object] = None) -> None:
+        was_probe = self._is_probe(probe)
+        if was_probe:
+            self._probe = None
+        elif self._state != self.CLOSED:
+            return   # late result of a call admitted before the circuit opened
+        self._failures += 1
+        if was_probe or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.opened_total += 1
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self, probe: Optional[object] = None) -> None:
+        """The call ended without a verdict on upstream health (e.g. cancelled)."""
+        if self._is_probe(probe):
+            self._probe = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "state":                self.state,
+            "consecutive_failures": self._failures,
+            "opened_total":         self.opened_total,
+            "short_circuits_total": self.short_circuits_total,
+        }
+
+
+def backoff_delay(attempt: int, base_sec: float, max_sec: float) -> float:
+    """Full-jitter backoff for retry `attempt` (0-based): uniform in [0, min(max, base·2^attempt)]."""
+    return random.uniform(0, min(max_sec, base_sec * 2 ** attempt))
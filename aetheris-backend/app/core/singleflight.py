@@ -0,0 +1,102 @@
+"""
+Aetheris — Request Coalescing (Single-Flight)
+When identical requests arrive while one is already being computed — two
+clinicians opening the same patient at shift change — only the first runs;
+the others wait for it and receive the same result (or the same exception).
+
+Requests are identified by a content key (see `request_key`). The shared call
+runs in its own task, so a caller that disconnects does not cancel it for the
+others; if every caller leaves, it still finishes and warms the caches below
+it. Nothing is kept once the call completes: this removes duplicate work in
+flight, caching is left to the layers that own it.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, TypeVar
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+logger = logging.getLogger("aetheris.singleflight")
+
+T = TypeVar("T")
+
+
+def request_key(*parts: Any) -> str:
+    """
+    Content address of a request: SHA-256 of its canonical JSON. Pydantic
+    models are dumped with their defaults filled in and keys sorted, so
+    requests that differ only in field order or omitted defaults coincide.
+    """
+    normalized = [p.model_dump(mode="json") if isinstance(p, BaseModel) else p for p in parts]
+    payload = json.dumps(normalized, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """One in-flight call per key; concurrent callers with the same key share it."""
+
+    _all: List["SingleFlight"] = []
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, asyncio.Task] = {}
+
+        # Metrics
+        self.calls_total      = 0
+        self.executions_total = 0
+        self.shared_total     = 0   # callers served by another caller's execution
+        self.max_waiters      = 0   # largest number of callers on one execution
+        self._waiters: Dict[str, int] = {}
+
+        SingleFlight._all.append(self)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Result of `fn()`, shared with every concurrent caller passing the same `key`."""
+        self.calls_total += 1
+        if not settings.SINGLEFLIGHT_ENABLED:
+            self.executions_total += 1
+            return await fn()
+
+        task = self._calls.get(key)
+        # A task left over from another event loop (tests, worker restart) can't be awaited here
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.shared_total += 1
+            self._waiters[key] += 1
+            self.max_waiters = max(self.max_waiters, self._waiters[key])
+        else:
+            task = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda t: self._finished(key, t))
+            self._calls[key] = task
+            self._waiters[key] = 1
+            self.executions_total += 1
+        # shield: cancelling one caller must not cancel the call for the rest
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            self._waiters.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here so it is not reported as unhandled when every caller left
+            logger.debug(f"Single-flight '{self.name}' call failed: {task.exception()!r}")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "in_flight":        len(self._calls),
+            "calls_total":      self.calls_total,
+            "executions_total": self.executions_total,
+            "shared_total":     self.shared_total,
+            "max_waiters":      self.max_waiters,
+        }
+
+
+def singleflight_metrics() -> Dict[str, Any]:
+    return {
+        "enabled": settings.SINGLEFLIGHT_ENABLED,
+        "groups":  {g.name: g.metrics() for g in SingleFlight._all},
+    }
@@ -4,14 +4,28 @@ FastAPI Backend Entry Point
 """
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 
 from app.api.routes import preop, intraop, postop, reports, vitals, patients, alerts
 from app.core.config import settings
 from app.core.database import init_db
+from app.core.http import http_clients
+from app.core.inference import inference_pool, inference_metrics
+from app.core.singleflight import singleflight_metrics
+from app.ml.model_registry import model_registry
+from app.services.alert_engine import alert_engine
+from app.services.alert_events import alert_events
+from app.services import llm_gateway
+from app.services.alert_store import alert_store
+from app.services.preop_service import openfda_cache
+from app.services.vitals_hub import vitals_hub
+from app.services.vitals_store import vitals_store
+from app.services.vitals_writer import vitals_writer
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("aetheris")
@@ -23,8 +37,23 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Aetheris Backend Starting...")
     await init_db()
     logger.info("✅ Database initialized")
+    await asyncio.to_thread(model_registry.load)
+    logger.info(f"✅ ML models loaded: {model_registry.versions()}")
+    watcher = asyncio.create_task(model_registry.watch(settings.ML_MODEL_RELOAD_INTERVAL_SEC))
+    inference_pool.start()
+    http_clients.start()
+    vitals_writer.start()
     yield
     logger.info("🛑 Aetheris Backend Shutting down...")
+    watcher.cancel()
+    await vitals_hub.shutdown()
+    alert_events.close()
+    await vitals_writer.stop()
+    await http_clients.aclose()
+    openfda_cache.close()
+    await llm_gateway.aclose()
+    llm_gateway.llm_cache.close()
+    inference_pool.shutdown()
 
 
 app = FastAPI(
@@ -66,4 +95,36 @@ async def root():
 
 @app.get("/health", tags=["Health"])
 async def health_check():
-    return {"status": "healthy", "api": "online"}
+    return {"status": "healthy", "api": "online", "models": model_registry.versions()}
+
+
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+    """
+    Readiness probe: unready until every ML artifact is loaded.
+    The API keeps serving heuristic predictions in the meantime.
+    """
+    if not model_registry.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "not_ready", "missing_models": model_registry.missing()},
+        )
+    return {"status": "ready", "models": model_registry.versions()}
+
+
+@app.get("/metrics", tags=["Health"])
+async def metrics():
+    """Runtime metrics for capacity planning (inference queue depth, batch sizes, live streams, DB write-behind, outbound HTTP pools, caches and request coalescing)."""
+    return {
+        "inference":      inference_metrics(),
+        "vitals_stream":  vitals_hub.metrics(),
+        "vitals_history": vitals_store.metrics(),
+        "vitals_persist": vitals_writer.metrics(),
+        "alerts":         alert_store.metrics(),
+        "alert_engine":   alert_engine.metrics(),
+        "alert_stream":   alert_events.metrics(),
+        "http_pools":     http_clients.metrics(),
+        "openfda_cache":  openfda_cache.metrics(),
+        "llm":            llm_gateway.metrics(),
+        "singleflight":   singleflight_metrics(),
+    }
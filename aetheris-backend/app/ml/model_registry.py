@@ -0,0 +1,256 @@
+"""
+Aetheris — In-Process Model Registry
+Holds the trained models and feature lists in memory so request handlers
+never re-read or deserialize artifacts. Loaded once at startup; a background
+watcher hot-reloads any model whose artifacts change on disk.
+
+Each model is served from one of two sources:
+  • npy    — the compiled engine, memory-mapped from a versioned artifact
+             directory. No pickle; every worker process shares one copy of
+             the node arrays through the page cache.
+  • pickle — the sklearn estimators, optionally compiled in-process.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from app.core.config import settings
+from app.ml.model_service import (
+    ASA_MODEL_PATH, COMPLICATION_MODEL_PATH, SCALER_PATH,
+    artifact_path, compile_asa_model, compile_complication_model,
+    current_artifact_version, load_artifact,
+)
+
+logger = logging.getLogger("aetheris.ml.registry")
+
+# Pickle files each model is built from, in load order
+PICKLE_SOURCES: Dict[str, Tuple[Path, ...]] = {
+    "asa":          (ASA_MODEL_PATH, SCALER_PATH),
+    "complication": (COMPLICATION_MODEL_PATH,),
+}
+
+
+class _SklearnEstimator:
+    """
+    sklearn model (behind its StandardScaler, if any) with the engine's
+    predict() shape. Rows are scored as a DataFrame with the training column
+    names, the way the model and scaler were fitted.
+    """
+
+    def __init__(self, model, features: List[str], scaler=None):
+        self.model    = model
+        self.features = list(features)
+        self.scaler   = scaler
+
+    def predict(self, X):
+        X = pd.DataFrame(X, columns=self.features)
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        return self.model.predict(X)
+
+
+class ModelEntry:
+    """One servable model plus the artifact signature it was loaded from."""
+
+    __slots__ = ("name", "source", "path", "version", "loaded_at", "signature",
+                 "features", "engine", "estimator")
+
+    def __init__(
+        self,
+        name: str,
+        source: str,
+        path: Path,
+        version: str,
+        signature: Any,
+        features: List[str],
+        engine: Any = None,
+        estimator: Any = None,
+    ):
+        self.name      = name
+        self.source    = source
+        self.path      = path
+        self.version   = version
+        self.loaded_at = datetime.now(timezone.utc)
+        self.signature = signature
+        self.features  = list(features)
+        self.engine    = engine       # compiled NumPy engine, if any
+        self.estimator = estimator    # sklearn estimator, pickle source only
+
+    def predictor(self, n_rows: int) -> Any:
+        """Compiled engine unless the batch is past its crossover and sklearn is at hand."""
+        engine = self.engine
+        if engine is not None and (
+            self.estimator is None or engine.max_rows is None or n_rows <= engine.max_rows
+        ):
+            return engine
+        return self.estimator
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "version":   self.version,
+            "source":    self.source,
+            "compiled":  self.engine is not None,
+            "path":      str(self.path),
+            "loaded_at": self.loaded_at.isoformat(),
+        }
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of ML models.
+
+    Readers grab an entry with a single dict lookup; reloads build a new
+    ModelEntry and swap it in, so a request never sees a half-loaded model.
+    """
+
+    def __init__(self, names: Sequence[str] = ("asa", "complication"), artifact_format: Optional[str] = None):
+        self._names = tuple(names)
+        self._format = artifact_format or settings.ML_ARTIFACT_FORMAT
+        self._entries: Dict[str, ModelEntry] = {}
+        self._lock = threading.Lock()
+
+    # ── LOADING ─────────────────────────────────────────────────────────────
+    def _source(self, name: str) -> str:
+        if self._format == "auto":
+            return "npy" if current_artifact_version(name) else "pickle"
+        return self._format
+
+    def _load_npy(self, name: str) -> bool:
+        version = current_artifact_version(name)
+        if version is None:
+            return False
+        signature = ("npy", version)
+        current = self._entries.get(name)
+        if current is not None and current.signature == signature:
+            return False
+
+        engine = load_artifact(name, version)
+        self._entries[name] = ModelEntry(
+            name, "npy", artifact_path(name, version), version, signature,
+            features=engine.features, engine=engine,
+        )
+        logger.info(f"Memory-mapped model '{name}' version {version}")
+        return True
+
+    def _load_pickle(self, name: str) -> bool:
+        paths = PICKLE_SOURCES[name]
+        signature = tuple(_file_signature(p) for p in paths)
+        if any(sig is None for sig in signature):
+            return False
+        current = self._entries.get(name)
+        if current is not None and current.signature == signature:
+            return False
+
+        raws = [p.read_bytes() for p in paths]
+        objs = [pickle.loads(raw) for raw in raws]
+        mtime = datetime.fromtimestamp(max(sig[0] for sig in signature) / 1e9, tz=timezone.utc)
+        version = f"{mtime:%Y%m%dT%H%M%SZ}-{hashlib.sha256(b''.join(raws)).hexdigest()[:12]}"
+
+        bundle = objs[0]
+        if name == "asa":
+            estimator = _SklearnEstimator(bundle["model"], bundle["features"], scaler=objs[1])
+            compile_fn = lambda: compile_asa_model(bundle, objs[1])
+        else:
+            estimator = _SklearnEstimator(bundle["model"], bundle["features"])
+            compile_fn = lambda: compile_complication_model(bundle)
+
+        engine = None
+        if settings.ML_COMPILED_INFERENCE:
+            try:
+                engine = compile_fn()
+                logger.info(f"Compiled '{name}' model to NumPy engine")
+            except Exception as e:
+                logger.warning(f"Could not compile '{name}' model, using sklearn: {e}")
+
+        self._entries[name] = ModelEntry(
+            name, "pickle", paths[0], version, signature,
+            features=bundle["features"], engine=engine, estimator=estimator,
+        )
+        logger.info(f"Loaded model '{name}' version {version}")
+        return True
+
+    def refresh(self) -> Dict[str, str]:
+        """Load any model that is new or changed since the last check."""
+        reloaded: Dict[str, str] = {}
+        with self._lock:
+            for name in self._names:
+                source = self._source(name)
+                try:
+                    loaded = self._load_npy(name) if source == "npy" else self._load_pickle(name)
+                    if loaded:
+                        reloaded[name] = self._entries[name].version
+                except Exception as e:
+                    # Keep serving the previous version; a half-written artifact
+                    # will be picked up on the next tick once it is complete.
+                    logger.warning(f"Failed to load model '{name}' from {source}: {e}")
+        return reloaded
+
+    def load(self) -> None:
+        """Initial load at startup."""
+        self.refresh()
+        missing = self.missing()
+        if missing:
+            logger.warning(
+                f"Models not found on disk: {', '.join(missing)} — "
+                "serving heuristics until `python -m app.ml.train` produces them."
+            )
+
+    async def watch(self, interval_sec: float) -> None:
+        """Background task: poll artifacts and hot-reload on change."""
+        while True:
+            await asyncio.sleep(interval_sec)
+            reloaded = await asyncio.to_thread(self.refresh)
+            if reloaded:
+                logger.info(f"Hot-reloaded models: {reloaded}")
+
+    # ── ACCESSORS ───────────────────────────────────────────────────────────
+    def _entry(self, name: str) -> ModelEntry:
+        entry = self._entries.get(name)
+        if entry is None:
+            raise RuntimeError(f"Model '{name}' is not loaded")
+        return entry
+
+    def predictor(self, name: str, n_rows: int = 1) -> Any:
+        """Object with .predict(X) best suited to a batch of n_rows."""
+        return self._entry(name).predictor(n_rows)
+
+    def features(self, name: str) -> List[str]:
+        """Feature columns, in the order predict() expects them."""
+        return self._entry(name).features
+
+    def is_loaded(self, *names: str) -> bool:
+        return all(name in self._entries for name in names)
+
+    def missing(self) -> List[str]:
+        return [name for name in self._names if name not in self._entries]
+
+    @property
+    def ready(self) -> bool:
+        """True once every model is loaded — drives the /ready probe."""
+        return not self.missing()
+
+    def versions(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        return {
+            name: (self._entries[name].describe() if name in self._entries else None)
+            for name in self._names
+        }
+
+
+model_registry = ModelRegistry()
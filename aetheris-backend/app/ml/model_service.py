@@ -1,15 +1,20 @@
 """
 Aetheris — ML Model Service
 Trains and loads the ASA Risk Model + Complication Risk Model
-Run this once: python -m app.ml.model_service
+Run this once: python -m app.ml.train
 """
 
 import numpy as np
 import pandas as pd
 import pickle
 import os
+import shutil
+import time
 import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
 
 logger = logging.getLogger("aetheris.ml")
 
@@ -18,9 +23,62 @@ ASA_MODEL_PATH       = MODELS_DIR / "asa_risk_model.pkl"
 COMPLICATION_MODEL_PATH = MODELS_DIR / "complication_model.pkl"
 SCALER_PATH          = MODELS_DIR / "feature_scaler.pkl"
 
+# Memory-mappable artifacts: ARTIFACTS_DIR/<model>/<version>/*.npy + manifest.json,
+# with ARTIFACTS_DIR/<model>/CURRENT naming the version to serve.
+ARTIFACTS_DIR          = MODELS_DIR / "artifacts"
+ARTIFACT_KEEP_VERSIONS = 3
+ARTIFACT_FORMATS       = ("pickle", "npy")
+
+
+class StageTimer:
+    """Wall-clock seconds spent in each named training stage."""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def summary(self) -> str:
+        return " · ".join(f"{name} {sec:.2f}s" for name, sec in self.stages.items())
+
+
+def _check_samples(n_samples: int):
+    if n_samples < 100:
+        raise ValueError(f"n_samples must be at least 100, got {n_samples}")
+
 
 # ── TRAIN ASA RISK MODEL ───────────────────────────────────────────────────
-def train_asa_model(n_samples: int = 8000):
+# Rule-based ASA label (mirrors clinical ASA definitions): the summed score is
+# bucketed as ≤1 → I, ≤3 → II, ≤6 → III, ≤9 → IV, else V.
+ASA_SCORE_BINS = [1, 3, 6, 9]
+
+
+def assign_asa(df: pd.DataFrame) -> np.ndarray:
+    """ASA class (1–5) for every row, computed column-wise."""
+    col = lambda name: df[name].to_numpy()
+    score = (
+        np.select([col("age") > 70, col("age") > 60], [2, 1], 0)
+        + np.select([col("bmi") > 40, col("bmi") > 30], [2, 1], 0)
+        + (col("diabetes") != 0)
+        + (col("hypertension") != 0)
+        + 3 * (col("cardiac_hx") != 0)
+        + (col("smoking") != 0)
+        + np.select([col("comorbidity_count") > 4, col("comorbidity_count") > 2], [2, 1], 0)
+        + np.select([col("spo2") < 92, col("spo2") < 95], [3, 1], 0)
+        + (col("systolic_bp") > 160)
+        + (col("albumin_low") != 0)
+        + (col("hematocrit_low") != 0)
+    )
+    return np.digitize(score, ASA_SCORE_BINS, right=True) + 1
+
+
+def train_asa_model(n_samples: int = 8000, timer: Optional[StageTimer] = None):
     """
     Train ASA Classification model on synthetic clinical data.
     Based on published research feature importance from MIMIC-IV/NSQIP studies.
@@ -29,67 +87,51 @@ def train_asa_model(n_samples: int = 8000):
     - MIMIC-IV: physionet.org/content/mimiciv
     - ACS NSQIP PUF: facs.org/quality-programs/acs-nsqip
     - Kaggle: kaggle.com/datasets/omnamahshivaya/surgical-risk
+
+    Data generation and labelling are whole-array NumPy operations, so
+    n_samples scales to millions of rows; per-stage wall time is recorded
+    on `timer` (generate, label, scale, fit, evaluate).
     """
     from sklearn.ensemble import GradientBoostingClassifier
     from sklearn.preprocessing import StandardScaler
     from sklearn.model_selection import train_test_split
     from sklearn.metrics import classification_report
 
-    logger.info("Generating synthetic training data...")
+    _check_samples(n_samples)
+    timer = timer or StageTimer()
+    logger.info(f"Generating synthetic training data ({n_samples} rows)...")
     np.random.seed(42)
     n = n_samples
 
-    df = pd.DataFrame({
-        "age":              np.random.normal(55, 18, n).clip(18, 90),
-        "bmi":              np.random.normal(27, 6, n).clip(15, 55),
-        "weight_kg":        np.random.normal(75, 18, n).clip(40, 180),
-        "systolic_bp":      np.random.normal(125, 22, n).clip(80, 200),
-        "diastolic_bp":     np.random.normal(80, 14, n).clip(50, 130),
-        "heart_rate":       np.random.normal(78, 16, n).clip(40, 150),
-        "temperature":      np.random.normal(36.8, 0.4, n).clip(35.0, 40.0),
-        "spo2":             np.random.normal(97.5, 2.0, n).clip(80, 100),
-        "resp_rate":        np.random.normal(16, 4, n).clip(8, 35),
-        "etco2":            np.random.normal(38, 5, n).clip(20, 60),
-        "diabetes":         np.random.binomial(1, 0.15, n).astype(float),
-        "hypertension":     np.random.binomial(1, 0.30, n).astype(float),
-        "cardiac_hx":       np.random.binomial(1, 0.12, n).astype(float),
-        "smoking":          np.random.binomial(1, 0.20, n).astype(float),
-        "comorbidity_count": np.random.poisson(1.2, n).clip(0, 8).astype(float),
-        "albumin_low":      np.random.binomial(1, 0.10, n).astype(float),
-        "hematocrit_low":   np.random.binomial(1, 0.12, n).astype(float),
-    })
-
-    # Rule-based ASA label (mirrors clinical ASA definitions)
-    def assign_asa(row):
-        score = 0
-        if row["age"] > 70:              score += 2
-        elif row["age"] > 60:            score += 1
-        if row["bmi"] > 40:              score += 2
-        elif row["bmi"] > 30:            score += 1
-        if row["diabetes"]:              score += 1
-        if row["hypertension"]:          score += 1
-        if row["cardiac_hx"]:            score += 3
-        if row["smoking"]:               score += 1
-        if row["comorbidity_count"] > 4: score += 2
-        elif row["comorbidity_count"] > 2: score += 1
-        if row["spo2"] < 92:             score += 3
-        elif row["spo2"] < 95:           score += 1
-        if row["systolic_bp"] > 160:     score += 1
-        if row["albumin_low"]:           score += 1
-        if row["hematocrit_low"]:        score += 1
-        if score <= 1:   return 1
-        elif score <= 3: return 2
-        elif score <= 6: return 3
-        elif score <= 9: return 4
-        else:            return 5
-
-    df["asa_class"] = df.apply(assign_asa, axis=1)
-
-    # Add clinical noise (15% label uncertainty — mirrors real-world inter-rater variability)
-    noise_idx = np.random.choice(n, size=int(n * 0.15), replace=False)
-    df.loc[noise_idx, "asa_class"] = df.loc[noise_idx, "asa_class"].apply(
-        lambda x: min(5, max(1, x + np.random.choice([-1, 1])))
-    )
+    with timer.stage("generate"):
+        df = pd.DataFrame({
+            "age":              np.random.normal(55, 18, n).clip(18, 90),
+            "bmi":              np.random.normal(27, 6, n).clip(15, 55),
+            "weight_kg":        np.random.normal(75, 18, n).clip(40, 180),
+            "systolic_bp":      np.random.normal(125, 22, n).clip(80, 200),
+            "diastolic_bp":     np.random.normal(80, 14, n).clip(50, 130),
+            "heart_rate":       np.random.normal(78, 16, n).clip(40, 150),
+            "temperature":      np.random.normal(36.8, 0.4, n).clip(35.0, 40.0),
+            "spo2":             np.random.normal(97.5, 2.0, n).clip(80, 100),
+            "resp_rate":        np.random.normal(16, 4, n).clip(8, 35),
+            "etco2":            np.random.normal(38, 5, n).clip(20, 60),
+            "diabetes":         np.random.binomial(1, 0.15, n).astype(float),
+            "hypertension":     np.random.binomial(1, 0.30, n).astype(float),
+            "cardiac_hx":       np.random.binomial(1, 0.12, n).astype(float),
+            "smoking":          np.random.binomial(1, 0.20, n).astype(float),
+            "comorbidity_count": np.random.poisson(1.2, n).clip(0, 8).astype(float),
+            "albumin_low":      np.random.binomial(1, 0.10, n).astype(float),
+            "hematocrit_low":   np.random.binomial(1, 0.12, n).astype(float),
+        })
+
+    with timer.stage("label"):
+        labels = assign_asa(df)
+
+        # Add clinical noise (15% label uncertainty — mirrors real-world inter-rater variability)
+        noise_idx = np.random.choice(n, size=int(n * 0.15), replace=False)
+        shift = np.random.choice([-1, 1], size=noise_idx.size)
+        labels[noise_idx] = np.clip(labels[noise_idx] + shift, 1, 5)
+        df["asa_class"] = labels
 
     FEATURES = [
         "age", "bmi", "weight_kg", "systolic_bp", "diastolic_bp",
@@ -101,13 +143,14 @@ def train_asa_model(n_samples: int = 8000):
     X = df[FEATURES]
     y = df["asa_class"]
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    with timer.stage("scale"):
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
+        )
 
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled  = scaler.transform(X_test)
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled  = scaler.transform(X_test)
 
     model = GradientBoostingClassifier(
         n_estimators=200,
@@ -116,52 +159,60 @@ def train_asa_model(n_samples: int = 8000):
         subsample=0.8,
         random_state=42,
     )
-    model.fit(X_train_scaled, y_train)
+    with timer.stage("fit"):
+        model.fit(X_train_scaled, y_train)
 
-    acc = model.score(X_test_scaled, y_test)
-    logger.info(f"ASA Model Accuracy: {acc:.2%}")
-    logger.info("\n" + classification_report(y_test, model.predict(X_test_scaled)))
+    with timer.stage("evaluate"):
+        y_pred = model.predict(X_test_scaled)
+        acc = float(np.mean(y_pred == y_test.to_numpy()))
+        logger.info(f"ASA Model Accuracy: {acc:.2%}")
+        logger.info("\n" + classification_report(y_test, y_pred))
 
     return model, scaler, FEATURES
 
 
 # ── TRAIN COMPLICATION RISK MODEL ──────────────────────────────────────────
-def train_complication_model(n_samples: int = 6000):
+def train_complication_model(n_samples: int = 6000, timer: Optional[StageTimer] = None):
     """
     Multi-output regression for post-op complication risks.
     Predicts: DVT %, Infection %, Pneumonia %, Readmission %
+    Per-stage wall time is recorded on `timer` (generate, label, fit).
     """
     from sklearn.multioutput import MultiOutputRegressor
     from sklearn.ensemble import RandomForestRegressor
 
+    _check_samples(n_samples)
+    timer = timer or StageTimer()
     np.random.seed(99)
     n = n_samples
 
-    df = pd.DataFrame({
-        "age":            np.random.normal(55, 18, n).clip(18, 90),
-        "bmi":            np.random.normal(27, 6, n).clip(15, 55),
-        "surgery_duration_min": np.random.normal(150, 60, n).clip(30, 480),
-        "blood_loss_ml":  np.random.normal(300, 200, n).clip(50, 2000),
-        "asa_class":      np.random.choice([1,2,3,4], n, p=[0.15,0.40,0.35,0.10]),
-        "diabetes":       np.random.binomial(1, 0.15, n).astype(float),
-        "hypertension":   np.random.binomial(1, 0.30, n).astype(float),
-        "cardiac_hx":     np.random.binomial(1, 0.12, n).astype(float),
-        "smoker":         np.random.binomial(1, 0.20, n).astype(float),
-        "surgery_type_cardiac":    np.random.binomial(1, 0.15, n).astype(float),
-        "surgery_type_orthopedic": np.random.binomial(1, 0.25, n).astype(float),
-        "surgery_type_neuro":      np.random.binomial(1, 0.10, n).astype(float),
-    })
+    with timer.stage("generate"):
+        df = pd.DataFrame({
+            "age":            np.random.normal(55, 18, n).clip(18, 90),
+            "bmi":            np.random.normal(27, 6, n).clip(15, 55),
+            "surgery_duration_min": np.random.normal(150, 60, n).clip(30, 480),
+            "blood_loss_ml":  np.random.normal(300, 200, n).clip(50, 2000),
+            "asa_class":      np.random.choice([1,2,3,4], n, p=[0.15,0.40,0.35,0.10]),
+            "diabetes":       np.random.binomial(1, 0.15, n).astype(float),
+            "hypertension":   np.random.binomial(1, 0.30, n).astype(float),
+            "cardiac_hx":     np.random.binomial(1, 0.12, n).astype(float),
+            "smoker":         np.random.binomial(1, 0.20, n).astype(float),
+            "surgery_type_cardiac":    np.random.binomial(1, 0.15, n).astype(float),
+            "surgery_type_orthopedic": np.random.binomial(1, 0.25, n).astype(float),
+            "surgery_type_neuro":      np.random.binomial(1, 0.10, n).astype(float),
+        })
 
     # Generate realistic complication risk targets
-    base = df["asa_class"] * 3
-    df["dvt_risk"]        = (base + df["age"]*0.1 + df["surgery_duration_min"]*0.02
-                             + df["cardiac_hx"]*8 + np.random.normal(0,2,n)).clip(1,60)
-    df["infection_risk"]  = (base*0.8 + df["diabetes"]*10 + df["blood_loss_ml"]*0.005
-                             + df["smoker"]*5 + np.random.normal(0,2,n)).clip(1,50)
-    df["pneumonia_risk"]  = (base*1.2 + df["age"]*0.15 + df["smoker"]*12
-                             + df["cardiac_hx"]*6 + np.random.normal(0,3,n)).clip(1,60)
-    df["readmission_risk"] = (base + df["diabetes"]*8 + df["cardiac_hx"]*10
-                              + df["age"]*0.08 + np.random.normal(0,2,n)).clip(1,50)
+    with timer.stage("label"):
+        base = df["asa_class"] * 3
+        df["dvt_risk"]        = (base + df["age"]*0.1 + df["surgery_duration_min"]*0.02
+                                 + df["cardiac_hx"]*8 + np.random.normal(0,2,n)).clip(1,60)
+        df["infection_risk"]  = (base*0.8 + df["diabetes"]*10 + df["blood_loss_ml"]*0.005
+                                 + df["smoker"]*5 + np.random.normal(0,2,n)).clip(1,50)
+        df["pneumonia_risk"]  = (base*1.2 + df["age"]*0.15 + df["smoker"]*12
+                                 + df["cardiac_hx"]*6 + np.random.normal(0,3,n)).clip(1,60)
+        df["readmission_risk"] = (base + df["diabetes"]*8 + df["cardiac_hx"]*10
+                                  + df["age"]*0.08 + np.random.normal(0,2,n)).clip(1,50)
 
     FEATURES = [
         "age", "bmi", "surgery_duration_min", "blood_loss_ml", "asa_class",
@@ -176,55 +227,231 @@ def train_complication_model(n_samples: int = 6000):
     model = MultiOutputRegressor(
         RandomForestRegressor(n_estimators=100, random_state=42)
     )
-    model.fit(X, y)
+    with timer.stage("fit"):
+        model.fit(X, y)
     logger.info("Complication model trained.")
     return model, FEATURES, TARGETS
 
 
 # ── SAVE / LOAD ─────────────────────────────────────────────────────────────
-def save_models():
-    """Train and save all ML models to disk."""
-    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+def _atomic_pickle(obj, path: Path):
+    """Write to a temp file and rename, so readers never see a partial pickle."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(obj, f)
+    os.replace(tmp, path)
 
-    logger.info("Training ASA Risk Model...")
-    asa_model, scaler, asa_features = train_asa_model()
-    with open(ASA_MODEL_PATH, "wb") as f:
-        pickle.dump({"model": asa_model, "features": asa_features}, f)
-    with open(SCALER_PATH, "wb") as f:
-        pickle.dump(scaler, f)
-    logger.info(f"✅ ASA model saved → {ASA_MODEL_PATH}")
 
-    logger.info("Training Complication Model...")
-    comp_model, comp_features, comp_targets = train_complication_model()
-    with open(COMPLICATION_MODEL_PATH, "wb") as f:
-        pickle.dump({"model": comp_model, "features": comp_features, "targets": comp_targets}, f)
-    logger.info(f"✅ Complication model saved → {COMPLICATION_MODEL_PATH}")
+ProgressCallback = Callable[[int, int, str], None]
 
 
-def load_asa_model():
-    if not ASA_MODEL_PATH.exists():
-        logger.warning("ASA model not found — training now...")
-        save_models()
-    with open(ASA_MODEL_PATH, "rb") as f:
+def _log_progress(step: int, total: int, message: str):
+    logger.info(f"[{step}/{total}] {message}")
+
+
+def save_models(
+    models: Iterable[str] = ("asa", "complication"),
+    asa_samples: int = 8000,
+    complication_samples: int = 6000,
+    progress: Optional[ProgressCallback] = None,
+    formats: Iterable[str] = ARTIFACT_FORMATS,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Train and save ML models to disk.
+    This is an offline job — never call it from a request handler.
+
+    formats: "pickle" writes the sklearn estimators; "npy" writes the compiled
+    engine as a versioned, memory-mappable artifact directory.
+    Returns seconds per stage for each model trained, e.g.
+    {"asa": {"generate": 0.01, "label": 0.002, ..., "save": 0.4}}.
+    """
+    models  = list(models)
+    formats = set(formats)
+    unknown = formats - set(ARTIFACT_FORMATS)
+    if unknown or not formats:
+        raise ValueError(f"formats must be a non-empty subset of {ARTIFACT_FORMATS}, got {sorted(formats)}")
+
+    report  = progress or _log_progress
+    total   = 2 * len(models)
+    step    = 0
+    timings: Dict[str, Dict[str, float]] = {}
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+
+    if "asa" in models:
+        timer = StageTimer()
+        step += 1
+        report(step, total, f"Training ASA Risk Model ({asa_samples} samples)...")
+        asa_model, scaler, asa_features = train_asa_model(asa_samples, timer)
+        bundle = {"model": asa_model, "features": asa_features}
+        step += 1
+        saved = []
+        with timer.stage("save"):
+            if "pickle" in formats:
+                _atomic_pickle(bundle, ASA_MODEL_PATH)
+                _atomic_pickle(scaler, SCALER_PATH)
+                saved.append(str(ASA_MODEL_PATH))
+            if "npy" in formats:
+                saved.append(str(export_artifact("asa", compile_asa_model(bundle, scaler))))
+        timings["asa"] = timer.stages
+        report(step, total, f"✅ ASA model saved → {', '.join(saved)}  ({timer.summary()})")
+
+    if "complication" in models:
+        timer = StageTimer()
+        step += 1
+        report(step, total, f"Training Complication Model ({complication_samples} samples)...")
+        comp_model, comp_features, comp_targets = train_complication_model(complication_samples, timer)
+        bundle = {"model": comp_model, "features": comp_features, "targets": comp_targets}
+        step += 1
+        saved = []
+        with timer.stage("save"):
+            if "pickle" in formats:
+                _atomic_pickle(bundle, COMPLICATION_MODEL_PATH)
+                saved.append(str(COMPLICATION_MODEL_PATH))
+            if "npy" in formats:
+                saved.append(str(export_artifact("complication", compile_complication_model(bundle))))
+        timings["complication"] = timer.stages
+        report(step, total, f"✅ Complication model saved → {', '.join(saved)}  ({timer.summary()})")
+
+    return timings
+
+
+def _load_pickle(path: Path):
+    if not path.exists():
+        raise FileNotFoundError(
+            f"{path} not found — train it offline with `python -m app.ml.train`"
+        )
+    with open(path, "rb") as f:
         return pickle.load(f)
 
 
+def load_asa_model():
+    return _load_pickle(ASA_MODEL_PATH)
+
+
 def load_complication_model():
-    if not COMPLICATION_MODEL_PATH.exists():
-        logger.warning("Complication model not found — training now...")
-        save_models()
-    with open(COMPLICATION_MODEL_PATH, "rb") as f:
-        return pickle.load(f)
+    return _load_pickle(COMPLICATION_MODEL_PATH)
 
 
 def load_scaler():
-    if not SCALER_PATH.exists():
-        save_models()
-    with open(SCALER_PATH, "rb") as f:
-        return pickle.load(f)
+    return _load_pickle(SCALER_PATH)
+
+
+# ── COMPILED INFERENCE EXPORT ──────────────────────────────────────────────
+# Batch sizes up to which the NumPy engine beats sklearn (see README → Performance).
+# Larger batches amortise sklearn's per-call overhead and its Cython descent wins.
+ASA_COMPILED_MAX_ROWS          = 64
+COMPLICATION_COMPILED_MAX_ROWS = 512
+
+
+def compile_asa_model(bundle: dict, scaler):
+    """
+    Export the ASA classifier + scaler to the flat NumPy engine.
+    Raises ValueError if the compiled engine disagrees with sklearn.
+    """
+    from app.ml.tree_engine import compile_gradient_boosting, probe_matrix
+
+    model = bundle["model"]
+    compiled = compile_gradient_boosting(model, bundle["features"], scaler, ASA_COMPILED_MAX_ROWS)
+
+    # Probe in scaled space, then map back so both paths see identical inputs
+    Z = probe_matrix(compiled.ensemble, model.n_features_in_)
+    X = Z * compiled.scaler_scale + compiled.scaler_mean
+    X_scaled = scaler.transform(pd.DataFrame(X, columns=bundle["features"]))
+    # sklearn returns 1-D scores for binary classifiers; the engine is always (rows × outputs)
+    expected = model.decision_function(X_scaled).reshape(len(X), -1)
+    if not np.allclose(compiled.decision_function(X), expected, rtol=1e-9, atol=1e-9):
+        raise ValueError("Compiled ASA model does not match sklearn decision_function")
+    if not np.array_equal(compiled.predict(X), model.predict(X_scaled)):
+        raise ValueError("Compiled ASA model does not match sklearn predictions")
+    return compiled
+
+
+def compile_complication_model(bundle: dict):
+    """
+    Export the complication forests to the flat NumPy engine.
+    Raises ValueError if the compiled engine disagrees with sklearn.
+    """
+    from app.ml.tree_engine import compile_forest_regressor, probe_matrix
+
+    model = bundle["model"]
+    compiled = compile_forest_regressor(
+        model, bundle["features"], bundle["targets"], COMPLICATION_COMPILED_MAX_ROWS,
+    )
+
+    X = probe_matrix(compiled.ensemble, len(bundle["features"]))
+    expected = model.predict(pd.DataFrame(X, columns=bundle["features"]))
+    if not np.allclose(compiled.predict(X), expected, rtol=1e-9, atol=1e-9):
+        raise ValueError("Compiled complication model does not match sklearn predictions")
+    return compiled
+
+
+# ── MEMORY-MAPPABLE ARTIFACTS ──────────────────────────────────────────────
+def export_artifact(name: str, compiled) -> Path:
+    """
+    Write a compiled model to a new version directory and point CURRENT at it.
+    The directory is fully written before it is renamed into place, and
+    CURRENT is swapped atomically, so readers only ever see complete versions.
+    """
+    from app.ml.tree_engine import save_compiled
+
+    root = ARTIFACTS_DIR / name
+    root.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc)
+    tmp = root / f".tmp-{stamp:%Y%m%dT%H%M%S%f}-{os.getpid()}"
+    try:
+        manifest = save_compiled(compiled, tmp)
+        version = f"{stamp:%Y%m%dT%H%M%SZ}-{manifest['sha256'][:12]}"
+        target = root / version
+        if target.exists():
+            shutil.rmtree(tmp)          # identical model already exported this second
+        else:
+            os.replace(tmp, target)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    pointer = root / "CURRENT.tmp"
+    pointer.write_text(version)
+    os.replace(pointer, root / "CURRENT")
+    _prune_artifacts(root, keep=version)
+    return target
+
+
+def _prune_artifacts(root: Path, keep: str):
+    """Drop all but the newest ARTIFACT_KEEP_VERSIONS versions (never `keep`).
+    Processes still mapping a removed version keep reading it until they reload."""
+    versions = sorted(p for p in root.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for old in versions[:-ARTIFACT_KEEP_VERSIONS]:
+        if old.name != keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def current_artifact_version(name: str) -> Optional[str]:
+    """Version named by ARTIFACTS_DIR/<name>/CURRENT, or None if never exported."""
+    try:
+        version = (ARTIFACTS_DIR / name / "CURRENT").read_text().strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def artifact_path(name: str, version: str) -> Path:
+    return ARTIFACTS_DIR / name / version
+
+
+def load_artifact(name: str, version: Optional[str] = None):
+    """Memory-map a compiled model artifact (the CURRENT version by default)."""
+    from app.ml.tree_engine import load_compiled
+
+    version = version or current_artifact_version(name)
+    if version is None:
+        raise FileNotFoundError(
+            f"No '{name}' artifact in {ARTIFACTS_DIR} — export it with `python -m app.ml.train`"
+        )
+    return load_compiled(artifact_path(name, version), mmap=True)
 
 
 if __name__ == "__main__":
-    logging.basicConfig(level=logging.INFO)
-    save_models()
-    print("All models saved successfully!")
+    import sys
+    from app.ml.train import main
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Aetheris — Offline Model Training Job
+Trains the ML models and writes the artifacts the API serves from.
+Runs outside the API process; running servers hot-reload the new files.
+
+Usage:
+    python -m app.ml.train
+    python -m app.ml.train --only asa --asa-samples 20000
+    python -m app.ml.train --format npy
+    python -m app.ml.train --asa-samples 2000000 --timings-json timings.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Dict
+
+from app.ml.model_service import ARTIFACT_FORMATS, save_models
+
+logger = logging.getLogger("aetheris.ml.train")
+
+MODEL_CHOICES = ("asa", "complication")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.ml.train",
+        description="Train and save the Aetheris ML models.",
+    )
+    parser.add_argument(
+        "--only", choices=MODEL_CHOICES, action="append",
+        help="Train only this model (repeatable). Default: all models.",
+    )
+    parser.add_argument("--asa-samples", type=int, default=8000,
+                        help="Synthetic rows for the ASA classifier.")
+    parser.add_argument("--complication-samples", type=int, default=6000,
+                        help="Synthetic rows for the complication model.")
+    parser.add_argument(
+        "--format", choices=(*ARTIFACT_FORMATS, "both"), default="both",
+        help="pickle: sklearn estimators; npy: memory-mappable compiled "
+             "artifacts; both (default).",
+    )
+    parser.add_argument("--timings-json", metavar="PATH",
+                        help="Also write per-stage timings (seconds) to this JSON file.")
+    return parser.parse_args(argv)
+
+
+def print_timings(timings: Dict[str, Dict[str, float]]):
+    """Per-stage wall time table, one row per model."""
+    stages = list(dict.fromkeys(stage for t in timings.values() for stage in t))
+    print(f"{'model':<14}" + "".join(f"{s:>10}" for s in stages) + f"{'total':>10}")
+    for model, t in timings.items():
+        cells = "".join(f"{t[s]:>9.2f}s" if s in t else f"{'—':>10}" for s in stages)
+        print(f"{model:<14}{cells}{sum(t.values()):>9.2f}s")
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+    started = time.perf_counter()
+
+    def progress(step: int, total: int, message: str):
+        elapsed = time.perf_counter() - started
+        print(f"[{step}/{total}] {elapsed:7.1f}s  {message}", flush=True)
+
+    try:
+        timings = save_models(
+            models=args.only or MODEL_CHOICES,
+            asa_samples=args.asa_samples,
+            complication_samples=args.complication_samples,
+            progress=progress,
+            formats=ARTIFACT_FORMATS if args.format == "both" else (args.format,),
+        )
+    except Exception:
+        logger.exception("Model training failed")
+        return 1
+
+    print_timings(timings)
+    if args.timings_json:
+        with open(args.timings_json, "w") as f:
+            json.dump(timings, f, indent=2)
+    print(f"All models saved successfully in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
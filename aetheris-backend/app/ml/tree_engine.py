@@ -0,0 +1,380 @@
+"""
+Aetheris — Flat NumPy Tree-Ensemble Engine
+Compiled form of the sklearn tree ensembles: every tree of a model is packed
+into one set of contiguous node arrays and evaluated for all trees and all
+rows at once, without sklearn's per-call validation or per-estimator dispatch.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+# Rows evaluated per pass; bounds the (rows × trees) working arrays.
+ROW_CHUNK = 1024
+# Descent steps before finished (row, tree) pairs start being compacted away,
+# and how often to compact after that.
+COMPACT_AFTER = 8
+COMPACT_EVERY = 2
+
+# On-disk layout written by save_compiled(); bump on incompatible changes.
+ARTIFACT_FORMAT         = "aetheris-tree-engine"
+ARTIFACT_FORMAT_VERSION = 1
+MANIFEST_NAME           = "manifest.json"
+
+
+def _float32_floor(threshold: np.ndarray) -> np.ndarray:
+    """
+    Largest float32 <= each float64 threshold. sklearn compares float32
+    features against float64 thresholds; for a float32 x,
+    x <= t  ⇔  x <= floor32(t), so the whole descent can stay in float32.
+    """
+    t32 = threshold.astype(np.float32)
+    too_big = t32.astype(np.float64) > threshold
+    t32[too_big] = np.nextafter(t32[too_big], np.float32(-np.inf))
+    return t32
+
+
+def _sibling_order(children_left: np.ndarray, children_right: np.ndarray) -> np.ndarray:
+    """
+    Renumber a tree level by level so every right child sits right after its
+    left sibling. Returns `new_id[old_id]`.
+    """
+    new_id = np.zeros(children_left.shape[0], dtype=np.intp)
+    level = np.array([0], dtype=np.intp)
+    next_id = 1
+    while level.size:
+        internal = level[children_left[level] >= 0]
+        kids = np.empty(2 * internal.size, dtype=np.intp)
+        kids[0::2] = children_left[internal]
+        kids[1::2] = children_right[internal]
+        new_id[kids] = np.arange(next_id, next_id + kids.size)
+        next_id += kids.size
+        level = kids
+    return new_id
+
+
+class TreeEnsemble:
+    """
+    All trees of an ensemble in flat arrays.
+
+    Nodes are laid out so the right child of node i is `left[i] + 1`; one
+    descent step is `node = left[node] + (x[feature[node]] > threshold[node])`.
+    Leaves point `left` at themselves with an infinite threshold, so rows that
+    finish early stay put. `weights[t, k]` scales tree t's leaf value into
+    output k; `base[k]` is the constant added to output k.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        weights: np.ndarray,
+        base: np.ndarray,
+        max_depth: int,
+        is_leaf: Optional[np.ndarray] = None,
+    ):
+        self.feature   = feature      # int32   (n_nodes,)
+        self.threshold = threshold    # float32 (n_nodes,)
+        self.left      = left         # int32   (n_nodes,)
+        self.value     = value        # float64 (n_nodes,)
+        self.roots     = roots        # int32   (n_trees,)
+        self.weights   = weights      # float64 (n_trees, n_outputs)
+        self.base      = base         # float64 (n_outputs,)
+        self.max_depth = int(max_depth)
+        self.is_leaf   = is_leaf if is_leaf is not None else (
+            left == np.arange(left.shape[0], dtype=left.dtype)
+        )
+
+    @classmethod
+    def from_trees(
+        cls,
+        trees: Sequence[Tuple[object, int, float]],
+        n_outputs: int,
+        base: Optional[np.ndarray] = None,
+    ) -> "TreeEnsemble":
+        """Pack (sklearn Tree, output index, weight) triples into one ensemble."""
+        feature, threshold, left, value, roots = [], [], [], [], []
+        weights = np.zeros((len(trees), n_outputs), dtype=np.float64)
+        offset = 0
+
+        for i, (tree, output, weight) in enumerate(trees):
+            new_id = _sibling_order(tree.children_left, tree.children_right)
+            old_id = np.empty_like(new_id)
+            old_id[new_id] = np.arange(new_id.shape[0])
+
+            cl = tree.children_left[old_id]
+            is_leaf = cl < 0
+            feature.append(np.where(is_leaf, 0, tree.feature[old_id]))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold[old_id]))
+            own = np.arange(new_id.shape[0])
+            left.append(np.where(is_leaf, own, new_id[np.where(is_leaf, 0, cl)]) + offset)
+            value.append(tree.value[old_id, 0, 0])
+            roots.append(offset)
+            weights[i, output] = weight
+            offset += new_id.shape[0]
+
+        return cls(
+            feature=np.concatenate(feature).astype(np.int32),
+            threshold=_float32_floor(np.concatenate(threshold)),
+            left=np.concatenate(left).astype(np.int32),
+            value=np.concatenate(value).astype(np.float64),
+            roots=np.array(roots, dtype=np.int32),
+            weights=weights,
+            base=np.zeros(n_outputs) if base is None else np.asarray(base, dtype=np.float64),
+            max_depth=max(t.max_depth for t, _, _ in trees),
+        )
+
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """(n_rows × n_trees) leaf node id reached by every row in every tree."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        n_trees = self.roots.shape[0]
+        flat_x = X.ravel()
+
+        nodes  = np.tile(self.roots, n_rows)
+        rowoff = np.repeat(np.arange(n_rows, dtype=np.int32) * n_features, n_trees)
+        pos    = np.arange(nodes.shape[0])
+        result = np.empty_like(nodes)
+
+        for step in range(self.max_depth):
+            go_right = flat_x[rowoff + self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.left[nodes] + go_right
+            if step >= COMPACT_AFTER and step % COMPACT_EVERY == 0:
+                done = self.is_leaf[nodes]
+                if done.any():
+                    result[pos[done]] = nodes[done]
+                    active = ~done
+                    nodes, rowoff, pos = nodes[active], rowoff[active], pos[active]
+                    if not nodes.shape[0]:
+                        break
+        result[pos] = nodes
+        return result.reshape(n_rows, n_trees)
+
+    def raw_predict(self, X: np.ndarray) -> np.ndarray:
+        """(n_rows × n_outputs) weighted sum of leaf values plus base."""
+        X = np.atleast_2d(X)
+        out = np.empty((X.shape[0], self.base.shape[0]), dtype=np.float64)
+        for start in range(0, X.shape[0], ROW_CHUNK):
+            chunk = X[start:start + ROW_CHUNK]
+            out[start:start + ROW_CHUNK] = self.value[self.leaves(chunk)] @ self.weights
+        out += self.base
+        return out
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "feature": self.feature, "threshold": self.threshold, "left": self.left,
+            "value": self.value, "roots": self.roots, "weights": self.weights, "base": self.base,
+            "is_leaf": self.is_leaf,
+        }
+
+
+class CompiledClassifier:
+    """GradientBoostingClassifier (+ optional StandardScaler) as a TreeEnsemble."""
+
+    def __init__(
+        self,
+        ensemble: TreeEnsemble,
+        classes: np.ndarray,
+        features: List[str],
+        scaler_mean: Optional[np.ndarray] = None,
+        scaler_scale: Optional[np.ndarray] = None,
+        max_rows: Optional[int] = None,
+    ):
+        self.max_rows     = max_rows   # beyond this, sklearn's Cython loop is faster
+        self.ensemble     = ensemble
+        self.classes      = np.asarray(classes)
+        self.features     = list(features)
+        self.scaler_mean  = scaler_mean
+        self.scaler_scale = scaler_scale
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if self.scaler_mean is not None:
+            X = (X - self.scaler_mean) / self.scaler_scale
+        return X
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return self.ensemble.raw_predict(self.transform(X))
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        raw = self.decision_function(X)
+        if raw.shape[1] == 1:
+            return self.classes[(raw[:, 0] > 0).astype(int)]
+        return self.classes[np.argmax(raw, axis=1)]
+
+
+class CompiledRegressor:
+    """Forest regressor(s), one output per target, as a TreeEnsemble."""
+
+    def __init__(
+        self,
+        ensemble: TreeEnsemble,
+        features: List[str],
+        targets: List[str],
+        max_rows: Optional[int] = None,
+    ):
+        self.max_rows = max_rows   # beyond this, sklearn's Cython loop is faster
+        self.ensemble = ensemble
+        self.features = list(features)
+        self.targets  = list(targets)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.ensemble.raw_predict(np.asarray(X, dtype=np.float64))
+
+
+def probe_matrix(ensemble: TreeEnsemble, n_features: int, n_rows: int = 512, seed: int = 0) -> np.ndarray:
+    """Random rows spanning each feature's split thresholds, for parity checks."""
+    rng = np.random.default_rng(seed)
+    internal = ~ensemble.is_leaf
+    X = np.zeros((n_rows, n_features))
+    for j in range(n_features):
+        thresholds = ensemble.threshold[internal & (ensemble.feature == j)].astype(np.float64)
+        if thresholds.size:
+            lo, hi = thresholds.min(), thresholds.max()
+            pad = max(1.0, hi - lo) * 0.1
+            X[:, j] = rng.uniform(lo - pad, hi + pad, n_rows)
+    return X
+
+
+# ── ARTIFACT I/O ───────────────────────────────────────────────────────────
+def _describe(arr: np.ndarray) -> Dict[str, Any]:
+    return {"dtype": arr.dtype.str, "shape": list(arr.shape)}
+
+
+def save_compiled(compiled: Union[CompiledClassifier, CompiledRegressor], directory: Path) -> Dict[str, Any]:
+    """
+    Write a compiled model as raw .npy arrays plus a JSON manifest.
+    Returns the manifest; its "sha256" covers every array's bytes.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    arrays = compiled.ensemble.arrays()
+    manifest: Dict[str, Any] = {
+        "format":         ARTIFACT_FORMAT,
+        "format_version": ARTIFACT_FORMAT_VERSION,
+        "features":       compiled.features,
+        "max_rows":       compiled.max_rows,
+        "max_depth":      compiled.ensemble.max_depth,
+    }
+    if isinstance(compiled, CompiledClassifier):
+        manifest["kind"] = "classifier"
+        manifest["classes"] = compiled.classes.tolist()
+        if compiled.scaler_mean is not None:
+            arrays["scaler_mean"]  = compiled.scaler_mean
+            arrays["scaler_scale"] = compiled.scaler_scale
+    else:
+        manifest["kind"] = "regressor"
+        manifest["targets"] = compiled.targets
+
+    digest = hashlib.sha256()
+    manifest["arrays"] = {}
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        np.save(directory / f"{name}.npy", arr, allow_pickle=False)
+        digest.update(name.encode())
+        digest.update(arr.tobytes())
+        manifest["arrays"][name] = _describe(arr)
+    manifest["sha256"] = digest.hexdigest()
+
+    (directory / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def load_compiled(directory: Path, mmap: bool = True) -> Union[CompiledClassifier, CompiledRegressor]:
+    """
+    Load a model written by save_compiled(). With mmap=True the node arrays
+    are read-only views of the files, so every process that loads the same
+    artifact shares one copy in the page cache.
+    """
+    directory = Path(directory)
+    manifest = json.loads((directory / MANIFEST_NAME).read_text())
+    if manifest.get("format") != ARTIFACT_FORMAT or manifest.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(
+            f"{directory}: unsupported artifact format "
+            f"{manifest.get('format')} v{manifest.get('format_version')}"
+        )
+
+    arrays: Dict[str, np.ndarray] = {}
+    for name, spec in manifest["arrays"].items():
+        arr = np.load(directory / f"{name}.npy", mmap_mode="r" if mmap else None, allow_pickle=False)
+        if arr.dtype.str != spec["dtype"] or list(arr.shape) != spec["shape"]:
+            raise ValueError(f"{directory}: {name}.npy does not match its manifest entry")
+        # Plain ndarray view of the mapping — skips np.memmap's per-operation overhead
+        arrays[name] = arr.view(np.ndarray)
+
+    ensemble = TreeEnsemble(
+        feature=arrays["feature"],
+        threshold=arrays["threshold"],
+        left=arrays["left"],
+        value=arrays["value"],
+        roots=arrays["roots"],
+        weights=arrays["weights"],
+        base=arrays["base"],
+        max_depth=manifest["max_depth"],
+        is_leaf=arrays.get("is_leaf"),
+    )
+    if manifest["kind"] == "classifier":
+        return CompiledClassifier(
+            ensemble=ensemble,
+            classes=np.array(manifest["classes"]),
+            features=manifest["features"],
+            scaler_mean=arrays.get("scaler_mean"),
+            scaler_scale=arrays.get("scaler_scale"),
+            max_rows=manifest["max_rows"],
+        )
+    return CompiledRegressor(
+        ensemble=ensemble,
+        features=manifest["features"],
+        targets=manifest["targets"],
+        max_rows=manifest["max_rows"],
+    )
+
+
+# ── COMPILERS ──────────────────────────────────────────────────────────────
+def compile_gradient_boosting(
+    model, features: List[str], scaler=None, max_rows: Optional[int] = None,
+) -> CompiledClassifier:
+    """Flatten a fitted GradientBoostingClassifier (prior-initialised)."""
+    n_stages, n_outputs = model.estimators_.shape
+    trees = [
+        (model.estimators_[stage, k].tree_, k, model.learning_rate)
+        for stage in range(n_stages)
+        for k in range(n_outputs)
+    ]
+    # The init estimator is a class-prior DummyClassifier: its raw prediction is constant.
+    base = model._raw_predict_init(np.zeros((1, model.n_features_in_)))[0]
+    return CompiledClassifier(
+        ensemble=TreeEnsemble.from_trees(trees, n_outputs, base),
+        classes=model.classes_,
+        features=features,
+        scaler_mean=None if scaler is None else np.asarray(scaler.mean_, dtype=np.float64),
+        scaler_scale=None if scaler is None else np.asarray(scaler.scale_, dtype=np.float64),
+        max_rows=max_rows,
+    )
+
+
+def compile_forest_regressor(
+    model, features: List[str], targets: List[str], max_rows: Optional[int] = None,
+) -> CompiledRegressor:
+    """Flatten a fitted MultiOutputRegressor(RandomForestRegressor) or a single forest."""
+    forests = getattr(model, "estimators_", None)
+    if forests is None or not hasattr(forests[0], "estimators_"):
+        forests = [model]
+    trees = [
+        (tree.tree_, k, 1.0 / len(forest.estimators_))
+        for k, forest in enumerate(forests)
+        for tree in forest.estimators_
+    ]
+    return CompiledRegressor(
+        ensemble=TreeEnsemble.from_trees(trees, len(forests)),
+        features=features,
+        targets=targets,
+        max_rows=max_rows,
+    )
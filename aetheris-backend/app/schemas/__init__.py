@@ -73,6 +73,7 @@ class PreOpAssessmentRequest(BaseModel):
     hypertension:  bool = False
     cardiac_hx:    bool = False
     smoking:       bool = False
+    regenerate:    bool = False   # bypass the LLM cache for the AI summary
 
 class DrugInteraction(BaseModel):
     drug_a:      str
@@ -104,8 +105,17 @@ class PreOpAssessmentResponse(BaseModel):
     checklist:          List[ChecklistItem]
     recommendation:     str
     ai_summary:         str
+    stage_timings_ms:   Dict[str, float] = {}   # time in each pipeline stage, plus "total"
+    fallback_stages:    List[str] = []          # stages that timed out or failed and used a fallback
     created_at:         datetime
 
+class PreOpBatchRequest(BaseModel):
+    cases: List[PreOpAssessmentRequest] = Field(..., min_length=1, max_length=500)
+
+class PreOpBatchResult(BaseModel):
+    index:      int                 # position of the case in the request
+    assessment: PreOpAssessmentResponse
+
 
 # ── VITALS SCHEMAS ─────────────────────────────────────────────────────────
 class VitalsReading(BaseModel):
@@ -160,6 +170,14 @@ class AnomalyResult(BaseModel):
     alerts_fired:  List[AlertCreate]
     vitals_status: Dict[str, str]   # {"hr": "normal", "spo2": "critical", ...}
 
+class AnomalyCheckBatchRequest(BaseModel):
+    readings: List[AnomalyCheckRequest] = Field(..., min_length=1, max_length=10000)
+
+class AnomalyCheckBatchResponse(BaseModel):
+    results:   List[AnomalyResult]   # same order as the request's readings
+    total:     int
+    anomalies: int                   # readings with at least one alert
+
 class VoiceCommandRequest(BaseModel):
     patient_id:  str
     surgery_id:  Optional[str] = None
@@ -204,6 +222,13 @@ class ComplicationRiskResponse(BaseModel):
     complications:   List[ComplicationRisk]
     recommendation:  str
 
+class ComplicationRiskBatchRequest(BaseModel):
+    patients: List[ComplicationRiskRequest] = Field(..., min_length=1, max_length=10000)
+
+class ComplicationRiskBatchResponse(BaseModel):
+    results: List[ComplicationRiskResponse]
+    total:   int
+
 
 # ── REPORT SCHEMAS ──────────────────────────────────────────────────────────
 class ReportGenerateRequest(BaseModel):
@@ -211,6 +236,7 @@ class ReportGenerateRequest(BaseModel):
     surgery_id:   Optional[str] = None
     report_type:  ReportType = ReportType.OPERATIVE_NOTE
     extra_notes:  Optional[str] = None
+    regenerate:   bool = False     # bypass the LLM cache and draft a fresh report
 
 class ReportResponse(BaseModel):
     id:          str
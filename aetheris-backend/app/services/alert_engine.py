@@ -0,0 +1,217 @@
+"""
+Aetheris — Stateful Alert Engine
+Turns a stream of vitals readings into alert *state changes* instead of one
+alert per out-of-range reading. Each (patient, vital) pair holds its current
+status; a notification is emitted only when that status changes:
+
+  • onset       — normal → warning/critical
+  • escalated   — warning → critical
+  • deescalated — critical → warning
+  • resolved    — back to normal
+  • renotify    — still abnormal after the re-notify interval for its severity
+
+Onset and escalation trigger at the THRESHOLDS values, exactly like
+check_vital_status, so a reading has the same severity here as on the
+anomaly-check and bulk paths. Hysteresis is on the clear side only: leaving
+a status needs the value CLEAR_BANDS back inside its threshold, and staying
+there for ALERT_CLEAR_HOLD_SEC, so a value hovering at a threshold does not
+flap between onset and resolved.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Mapping, Optional
+
+from app.core.config import settings
+from app.schemas import AlertCreate, AlertSeverity
+from app.services.intraop_service import THRESHOLDS, build_alert
+
+logger = logging.getLogger("aetheris.alert_engine")
+
+# How far back inside a threshold a vital must be to leave that status, in its unit
+CLEAR_BANDS = {
+    "heart_rate":   3,
+    "spo2":         1,
+    "systolic_bp":  5,
+    "diastolic_bp": 3,
+    "temperature":  0.2,
+    "etco2":        2,
+    "resp_rate":    1,
+}
+
+EVENT_KINDS = ("onset", "escalated", "deescalated", "resolved", "renotify")
+
+_LOW_RANK  = {"warning_low": 1, "critical_low": 2}
+_HIGH_RANK = {"warning_high": 1, "critical_high": 2}
+_RANK      = {"normal": 0, **_LOW_RANK, **_HIGH_RANK}
+
+
+def _severity_rank(status: str) -> int:
+    return _RANK[status]
+
+
+def status_with_hysteresis(name: str, value: float, current: str = "normal") -> str:
+    """
+    check_vital_status, except that thresholds the vital is already past (per
+    `current`) are moved inward by its clear band. Thresholds not yet crossed
+    are used as-is.
+    """
+    t = THRESHOLDS[name]
+    clear = CLEAR_BANDS.get(name, 0)
+    low, high = _LOW_RANK.get(current, 0), _HIGH_RANK.get(current, 0)
+
+    if value <= t["critical_low"]  + (clear if low >= 2 else 0):  return "critical_low"
+    if value >= t["critical_high"] - (clear if high >= 2 else 0): return "critical_high"
+    if value <= t["warning_low"]   + (clear if low >= 1 else 0):  return "warning_low"
+    if value >= t["warning_high"]  - (clear if high >= 1 else 0): return "warning_high"
+    return "normal"
+
+
+class AlertEvent:
+    """One notification: what changed, and the alert to show for it."""
+
+    __slots__ = ("kind", "vital", "status", "previous", "value", "alert")
+
+    def __init__(self, kind: str, vital: str, status: str, previous: str, value: float, alert: AlertCreate):
+        self.kind     = kind
+        self.vital    = vital
+        self.status   = status
+        self.previous = previous
+        self.value    = value
+        self.alert    = alert
+
+    def to_frame(self) -> Dict[str, Any]:
+        """Alert dict for the ANOMALY_ALERT websocket frame."""
+        return {**self.alert.model_dump(mode="json"), "event": self.kind, "status": self.status, "previous": self.previous}
+
+
+class _VitalState:
+    __slots__ = ("status", "since", "notified_at", "clearing_since")
+
+    def __init__(self, status: str, now: float):
+        self.status         = status
+        self.since          = now
+        self.notified_at    = now
+        self.clearing_since: Optional[float] = None   # when the value first fell back below this status
+
+
+def _resolved_alert(patient_id: str, surgery_id: Optional[str], name: str, value: float, previous: str) -> AlertCreate:
+    unit = THRESHOLDS.get(name, {}).get("unit", "")
+    vital_display = name.replace("_", " ").title()
+    return AlertCreate(
+        patient_id  = patient_id,
+        surgery_id  = surgery_id,
+        severity    = AlertSeverity.INFO,
+        title       = f"✅ RESOLVED: {vital_display}",
+        message     = f"{vital_display} back within range: {value:.1f} {unit} (was {previous.replace('_', ' ')}).",
+        vital_type  = name,
+        vital_value = value,
+    )
+
+
+class AlertEngine:
+    """Per-patient, per-vital alert state machine with hysteresis and re-notify."""
+
+    def __init__(
+        self,
+        renotify_critical_sec: Optional[float] = None,
+        renotify_warning_sec: Optional[float] = None,
+        clear_hold_sec: Optional[float] = None,
+    ):
+        self.clear_hold_sec = settings.ALERT_CLEAR_HOLD_SEC if clear_hold_sec is None else clear_hold_sec
+        self.renotify_sec = {
+            2: settings.ALERT_RENOTIFY_CRITICAL_SEC if renotify_critical_sec is None else renotify_critical_sec,
+            1: settings.ALERT_RENOTIFY_WARNING_SEC if renotify_warning_sec is None else renotify_warning_sec,
+        }
+        self._states: Dict[str, Dict[str, _VitalState]] = {}
+
+        # Metrics
+        self.readings_total    = 0
+        self.breaches_total    = 0    # out-of-range vital readings (one alert each without the engine)
+        self.events_total: Dict[str, int] = {kind: 0 for kind in EVENT_KINDS}
+
+    def evaluate(
+        self,
+        patient_id: str,
+        vitals: Mapping[str, float],
+        surgery_id: Optional[str] = None,
+        now: Optional[float] = None,
+    ) -> List[AlertEvent]:
+        """Feed one reading; return the notifications it triggers (usually none)."""
+        now = time.monotonic() if now is None else now
+        states = self._states.setdefault(patient_id, {})
+        events: List[AlertEvent] = []
+        self.readings_total += 1
+
+        for name in THRESHOLDS:
+            value = vitals.get(name)
+            if value is None:
+                continue
+            state = states.get(name)
+            previous = state.status if state is not None else "normal"
+            status = status_with_hysteresis(name, value, previous)
+            if status != "normal":
+                self.breaches_total += 1
+
+            if state is not None:
+                if _severity_rank(status) < _severity_rank(previous):
+                    # Improving: only believe it once it has held for clear_hold_sec
+                    if state.clearing_since is None:
+                        state.clearing_since = now
+                    if now - state.clearing_since < self.clear_hold_sec:
+                        status = previous
+                else:
+                    state.clearing_since = None
+
+            if status == previous:
+                if status == "normal":
+                    continue
+                interval = self.renotify_sec[_severity_rank(status)]
+                if not interval or now - state.notified_at < interval:
+                    continue
+                kind = "renotify"
+            elif previous == "normal":
+                kind = "onset"
+            elif status == "normal":
+                kind = "resolved"
+            else:
+                change = _severity_rank(status) - _severity_rank(previous)
+                kind = "escalated" if change > 0 else "deescalated" if change < 0 else "onset"
+
+            if kind == "resolved":
+                del states[name]
+                alert = _resolved_alert(patient_id, surgery_id, name, value, previous)
+            else:
+                if kind == "renotify":
+                    state.notified_at = now
+                else:
+                    states[name] = _VitalState(status, now)
+                alert = build_alert(patient_id, surgery_id, name, value, status)
+            events.append(AlertEvent(kind, name, status, previous, value, alert))
+            self.events_total[kind] += 1
+
+        if not states:
+            del self._states[patient_id]
+        return events
+
+    def active(self, patient_id: str) -> Dict[str, str]:
+        """Current abnormal status per vital for a patient."""
+        return {name: s.status for name, s in self._states.get(patient_id, {}).items()}
+
+    def forget(self, patient_id: str) -> None:
+        """Drop a patient's state (their stream stopped)."""
+        self._states.pop(patient_id, None)
+
+    def metrics(self) -> Dict[str, Any]:
+        notified = sum(self.events_total.values())
+        return {
+            "patients_with_active_alerts": len(self._states),
+            "readings_total":              self.readings_total,
+            "breaches_total":              self.breaches_total,
+            "notifications_total":         notified,
+            "notifications_by_kind":       dict(self.events_total),
+            "suppressed_total":            self.breaches_total - (notified - self.events_total["resolved"]),
+        }
+
+
+alert_engine = AlertEngine()
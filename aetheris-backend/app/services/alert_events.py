@@ -0,0 +1,148 @@
+"""
+Aetheris — Alert Event Bus
+Pushes alert lifecycle events (created, acknowledged) to subscribed clients
+so dashboards can stop polling `GET /api/alerts/`. The alert store publishes
+every change here; each event is serialized once as a Server-Sent Events
+frame and fanned out to every subscriber whose patient filter matches.
+
+Events carry increasing ids and the last ALERT_EVENTS_REPLAY of them are
+kept, so a client reconnecting with `Last-Event-ID` gets exactly what it
+missed. If its id has already been evicted, it receives a `reset` event and
+should refetch the alert list once.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger("aetheris.alert_events")
+
+EVENT_CREATED      = "alert.created"
+EVENT_ACKNOWLEDGED = "alert.acknowledged"
+
+
+class StreamEvent:
+    """One published event, pre-encoded as an SSE frame."""
+
+    __slots__ = ("id", "kind", "patient_id", "frame")
+
+    def __init__(self, event_id: int, kind: str, alert: Dict[str, Any]):
+        self.id         = event_id
+        self.kind       = kind
+        self.patient_id = alert.get("patient_id")
+        self.frame      = f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(alert, default=str)}\n\n"
+
+
+class AlertSubscription:
+    """A client's filter, its queue of live frames, and the replayed backlog."""
+
+    def __init__(self, patient_id: Optional[str], queue_size: int):
+        self.patient_id = patient_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.backlog: List[str] = []
+        self.closed = False
+
+    def matches(self, event: StreamEvent) -> bool:
+        return self.patient_id is None or event.patient_id == self.patient_id
+
+
+def reset_frame(event_id: int) -> str:
+    """Tell a client its resume point is gone: refetch the list, then continue from `event_id`."""
+    return f"id: {event_id}\nevent: reset\ndata: {{}}\n\n"
+
+
+class AlertEventBus:
+    """Fan-out of alert events to SSE subscribers, with a bounded replay buffer."""
+
+    def __init__(self, replay_size: Optional[int] = None, queue_size: Optional[int] = None):
+        self.queue_size = queue_size or settings.ALERT_STREAM_QUEUE
+        self._replay: Deque[StreamEvent] = deque(maxlen=replay_size or settings.ALERT_EVENTS_REPLAY)
+        self._subscribers: Set[AlertSubscription] = set()
+        self._last_id = 0
+
+        # Metrics
+        self.events_published_total = 0
+        self.frames_sent_total      = 0
+        self.overflow_disconnects   = 0
+        self.resets_total           = 0
+
+    @property
+    def last_event_id(self) -> int:
+        return self._last_id
+
+    def publish(self, kind: str, alert: Dict[str, Any]) -> None:
+        """Record an event and queue it for every matching subscriber (never blocks)."""
+        self._last_id += 1
+        event = StreamEvent(self._last_id, kind, alert)
+        self._replay.append(event)
+        self.events_published_total += 1
+        for sub in self._subscribers:
+            if sub.closed or not sub.matches(event):
+                continue
+            if sub.queue.full():
+                # Never drop an alert silently: end this stream and let the
+                # client reconnect with Last-Event-ID to replay what it missed.
+                self._close(sub)
+                self.overflow_disconnects += 1
+                continue
+            sub.queue.put_nowait(event.frame)
+            self.frames_sent_total += 1
+
+    @asynccontextmanager
+    async def subscribe(
+        self,
+        patient_id: Optional[str] = None,
+        last_event_id: Optional[int] = None,
+    ) -> AsyncIterator[AlertSubscription]:
+        """
+        Register a subscriber. If `last_event_id` is given, `backlog` holds the
+        matching events after it (or a reset frame if they are no longer buffered).
+        Backlog and live queue are captured together, so no event is missed or doubled.
+        """
+        sub = AlertSubscription(patient_id, self.queue_size)
+        if last_event_id is not None and last_event_id < self._last_id:
+            oldest = self._replay[0].id if self._replay else self._last_id + 1
+            if last_event_id + 1 < oldest or last_event_id < 0:
+                sub.backlog.append(reset_frame(self._last_id))
+                self.resets_total += 1
+            else:
+                sub.backlog.extend(e.frame for e in self._replay if e.id > last_event_id and sub.matches(e))
+        elif last_event_id is not None and last_event_id > self._last_id:
+            # Id from before a restart: the client's view is stale
+            sub.backlog.append(reset_frame(self._last_id))
+            self.resets_total += 1
+        self._subscribers.add(sub)
+        try:
+            yield sub
+        finally:
+            self._subscribers.discard(sub)
+
+    def _close(self, sub: AlertSubscription) -> None:
+        sub.closed = True
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(None)
+
+    def close(self) -> None:
+        """End every open stream (app shutdown)."""
+        for sub in list(self._subscribers):
+            self._close(sub)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "subscribers":            len(self._subscribers),
+            "last_event_id":          self._last_id,
+            "replay_buffered":        len(self._replay),
+            "events_published_total": self.events_published_total,
+            "frames_sent_total":      self.frames_sent_total,
+            "overflow_disconnects":   self.overflow_disconnects,
+            "resets_total":           self.resets_total,
+        }
+
+
+alert_events = AlertEventBus()
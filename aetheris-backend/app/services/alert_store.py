@@ -0,0 +1,174 @@
+"""
+Aetheris — Indexed Alert Store
+In-memory alerts with the indexes the dashboards query by, so a poll costs
+O(log n + page) instead of copying, filtering and sorting every alert:
+
+  • timeline     — every alert in creation order
+  • per patient  — each patient's alerts in creation order
+  • unacked      — unacknowledged alerts, overall and per patient
+
+Alerts are numbered with a monotonically increasing sequence; pages are
+newest-first and the cursor is the sequence of the last alert returned.
+Every change is published to the alert event bus for push subscribers.
+"""
+
+import logging
+import uuid
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.schemas import AlertCreate
+from app.services.alert_events import EVENT_ACKNOWLEDGED, EVENT_CREATED, alert_events
+
+logger = logging.getLogger("aetheris.alert_store")
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that this store did not issue."""
+
+
+def _page_sorted(seqs: List[int], before: Optional[int], limit: Optional[int]) -> Iterator[int]:
+    """Newest-first page of an ascending seq list, seeking to the cursor by bisection."""
+    hi = len(seqs) if before is None else bisect_left(seqs, before)
+    lo = 0 if limit is None else max(0, hi - limit)
+    return reversed(seqs[lo:hi])
+
+
+def _page_unacked(seqs: Dict[int, None], before: Optional[int], limit: Optional[int]) -> Iterator[int]:
+    """
+    Newest-first page of an insertion-ordered seq set. Seeking skips the newer
+    unacknowledged alerts one by one; that set stays small on a staffed shift.
+    """
+    taken = 0
+    for seq in reversed(seqs):
+        if before is not None and seq >= before:
+            continue
+        if taken == limit:
+            return
+        taken += 1
+        yield seq
+
+
+class AlertStore:
+    """Alerts keyed by id, with time, patient and unacknowledged indexes."""
+
+    def __init__(self):
+        self._next_seq = 1
+        self._alerts: Dict[int, Dict[str, Any]] = {}         # seq → alert
+        self._seq_of: Dict[str, int] = {}                    # alert id → seq
+        self._timeline: List[int] = []                       # ascending seqs
+        self._by_patient: Dict[str, List[int]] = {}
+        self._unacked: Dict[int, None] = {}                  # ordered set of seqs
+        self._unacked_by_patient: Dict[str, Dict[int, None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    # ── WRITES ──────────────────────────────────────────────────────────────
+    def add(self, req: AlertCreate) -> Dict[str, Any]:
+        """Store a new, unacknowledged alert and return it."""
+        seq = self._next_seq
+        self._next_seq += 1
+        alert = {
+            "id": str(uuid.uuid4()), **req.model_dump(),
+            "acknowledged": False,
+            "created_at": datetime.utcnow().isoformat(),
+        }
+        pid = alert["patient_id"]
+        self._alerts[seq] = alert
+        self._seq_of[alert["id"]] = seq
+        self._timeline.append(seq)
+        self._by_patient.setdefault(pid, []).append(seq)
+        self._unacked[seq] = None
+        self._unacked_by_patient.setdefault(pid, {})[seq] = None
+        alert_events.publish(EVENT_CREATED, alert)
+        return alert
+
+    def get(self, alert_id: str) -> Optional[Dict[str, Any]]:
+        seq = self._seq_of.get(alert_id)
+        return self._alerts[seq] if seq is not None else None
+
+    def _ack(self, seq: int, acknowledged_by: Optional[str]) -> None:
+        alert = self._alerts[seq]
+        if alert["acknowledged"]:
+            return
+        alert["acknowledged"] = True
+        if acknowledged_by is not None:
+            alert["acknowledged_by"] = acknowledged_by
+        self._unacked.pop(seq, None)
+        alert_events.publish(EVENT_ACKNOWLEDGED, alert)
+
+    def acknowledge(self, alert_id: str, acknowledged_by: Optional[str] = None) -> bool:
+        """O(1). False if the alert does not exist."""
+        seq = self._seq_of.get(alert_id)
+        if seq is None:
+            return False
+        pid = self._alerts[seq]["patient_id"]
+        self._ack(seq, acknowledged_by)
+        self._unacked_by_patient.get(pid, {}).pop(seq, None)
+        return True
+
+    def acknowledge_all(self, patient_id: Optional[str] = None, acknowledged_by: Optional[str] = None) -> int:
+        """
+        Acknowledge every open alert (for one patient, or all patients).
+        O(k) in the number of open alerts touched; returns that k.
+        """
+        if patient_id is not None:
+            open_seqs = self._unacked_by_patient.pop(patient_id, {})
+            for seq in open_seqs:
+                self._ack(seq, acknowledged_by)
+            return len(open_seqs)
+
+        open_seqs = list(self._unacked)
+        self._unacked_by_patient.clear()
+        for seq in open_seqs:
+            self._ack(seq, acknowledged_by)
+        return len(open_seqs)
+
+    # ── READS ───────────────────────────────────────────────────────────────
+    def query(
+        self,
+        patient_id: Optional[str] = None,
+        unread_only: bool = False,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = 50,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str], int]:
+        """
+        One newest-first page of matching alerts (every one when `limit` is None).
+        Returns (alerts, next_cursor or None on the last page, total matching).
+        """
+        before = self._parse_cursor(cursor)
+        probe = None if limit is None else limit + 1
+        if unread_only:
+            index = self._unacked if patient_id is None else self._unacked_by_patient.get(patient_id, {})
+            seqs = list(_page_unacked(index, before, probe))
+        else:
+            index = self._timeline if patient_id is None else self._by_patient.get(patient_id, [])
+            seqs = list(_page_sorted(index, before, probe))
+
+        has_more = limit is not None and len(seqs) > limit
+        seqs = seqs[:limit]
+        next_cursor = str(seqs[-1]) if has_more else None
+        return [self._alerts[s] for s in seqs], next_cursor, len(index)
+
+    def _parse_cursor(self, cursor: Optional[str]) -> Optional[int]:
+        if cursor is None:
+            return None
+        try:
+            before = int(cursor)
+        except ValueError:
+            raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+        if not 0 < before <= self._next_seq:
+            raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+        return before
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "alerts":   len(self._alerts),
+            "unacked":  len(self._unacked),
+            "patients": len(self._by_patient),
+        }
+
+
+alert_store = AlertStore()
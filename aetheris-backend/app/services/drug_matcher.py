@@ -0,0 +1,126 @@
+"""
+Aetheris — Drug Interaction Matcher
+Finds the known interactions among a patient's medications without scanning
+the whole interaction database. Built once from the interaction list:
+
+  • an Aho-Corasick automaton over every drug / class term, so one pass over
+    each medication string finds every term it contains (substring match,
+    as before: "warfarin 5mg" → warfarin)
+  • drug-class members ("sertraline" → ssri, "ibuprofen" → nsaid) as extra
+    patterns that report their class term
+  • a hash index of (term_a, term_b) → interactions
+
+A check then costs O(medication text + matched terms²), independent of how
+many pairs the database holds.
+"""
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Sequence, Set, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_drug(name: str) -> str:
+    """Lower-case, trimmed, single-spaced: the form both terms and medications are matched in."""
+    return _WHITESPACE.sub(" ", name.lower()).strip()
+
+
+class TermAutomaton:
+    """Aho-Corasick automaton: all patterns found in a text in one left-to-right pass."""
+
+    def __init__(self, patterns: Mapping[str, Iterable[str]]):
+        """`patterns` maps each pattern string to the terms a match reports."""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+
+        for pattern, terms in patterns.items():
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] = tuple(dict.fromkeys(self._out[node] + tuple(terms)))
+
+        # Breadth-first failure links; each node also reports its failure chain's terms
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                if self._out[self._fail[child]]:
+                    self._out[child] = tuple(dict.fromkeys(self._out[child] + self._out[self._fail[child]]))
+
+    @property
+    def states(self) -> int:
+        return len(self._goto)
+
+    def find(self, text: str) -> Set[str]:
+        """Every term whose pattern occurs in `text`."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[str] = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class InteractionMatcher:
+    """Interaction lookup over an automaton of drug terms and a hashed pair index."""
+
+    def __init__(
+        self,
+        interactions: Sequence[Mapping[str, str]],
+        drug_classes: Mapping[str, Iterable[str]] = (),
+    ):
+        self.interactions = list(interactions)
+        patterns: Dict[str, List[str]] = {}
+        self._pairs: Dict[Tuple[str, str], List[int]] = {}
+        for i, pair in enumerate(self.interactions):
+            a, b = normalize_drug(pair["a"]), normalize_drug(pair["b"])
+            patterns.setdefault(a, []).append(a)
+            patterns.setdefault(b, []).append(b)
+            self._pairs.setdefault((a, b), []).append(i)
+
+        # Class members match their class, only for classes the database uses
+        for cls, members in dict(drug_classes).items():
+            cls = normalize_drug(cls)
+            if cls not in patterns:
+                continue
+            for member in members:
+                patterns.setdefault(normalize_drug(member), []).append(cls)
+
+        self._automaton = TermAutomaton(patterns)
+        self.terms = len({t for terms in patterns.values() for t in terms})
+
+    def matched_terms(self, medications: Iterable[str]) -> Set[str]:
+        found: Set[str] = set()
+        for med in medications:
+            found |= self._automaton.find(normalize_drug(med))
+        return found
+
+    def match(self, medications: Iterable[str]) -> List[Mapping[str, str]]:
+        """Interactions whose both sides appear among `medications`, in database order."""
+        terms = self.matched_terms(medications)
+        hits: List[int] = []
+        for a in terms:
+            for b in terms:
+                hits.extend(self._pairs.get((a, b), ()))
+        return [self.interactions[i] for i in sorted(hits)]
@@ -5,14 +5,21 @@ Handles: Anomaly Detection, Voice Command Processing, Vitals Analysis
 
 import logging
 import asyncio
-from typing import List, Dict, Optional
+import math
+import random
+import httpx
+import numpy as np
+from typing import List, Dict, Optional, Sequence
 from datetime import datetime
 
 from app.core.config import settings
+from app.core.http import UPSTREAM_OPENAI, http_clients
+from app.core.inference import MicroBatcher
 from app.schemas import (
     VitalsReading, AnomalyCheckRequest, AnomalyResult,
     AlertCreate, AlertSeverity, VoiceCommandRequest, VoiceCommandResponse
 )
+from app.services import llm_gateway
 
 logger = logging.getLogger("aetheris.intraop")
 
@@ -57,6 +64,17 @@ THRESHOLDS = {
 }
 
 
+# Compiled form of THRESHOLDS: one column per vital, in VITAL_NAMES order
+VITAL_NAMES   = list(THRESHOLDS)
+CRITICAL_LOW  = np.array([THRESHOLDS[n]["critical_low"]  for n in VITAL_NAMES], dtype=np.float64)
+CRITICAL_HIGH = np.array([THRESHOLDS[n]["critical_high"] for n in VITAL_NAMES], dtype=np.float64)
+WARNING_LOW   = np.array([THRESHOLDS[n]["warning_low"]   for n in VITAL_NAMES], dtype=np.float64)
+WARNING_HIGH  = np.array([THRESHOLDS[n]["warning_high"]  for n in VITAL_NAMES], dtype=np.float64)
+# Status codes returned by classify_vitals index into this table
+STATUS_LABELS = np.array(["normal", "critical_low", "critical_high", "warning_low", "warning_high"])
+_STATUS_NAMES = STATUS_LABELS.tolist()
+
+
 # ── ANOMALY DETECTION ──────────────────────────────────────────────────────
 def check_vital_status(name: str, value: float) -> str:
     """Returns: 'normal', 'warning_low', 'warning_high', 'critical_low', 'critical_high'"""
@@ -112,6 +130,63 @@ def build_alert(
     )
 
 
+def vitals_matrix(reqs: Sequence[AnomalyCheckRequest]) -> np.ndarray:
+    """(N patients × 7 vitals) matrix, columns in VITAL_NAMES order."""
+    return np.array(
+        [[getattr(r.vitals, name) for name in VITAL_NAMES] for r in reqs],
+        dtype=np.float64,
+    ).reshape(len(reqs), len(VITAL_NAMES))
+
+
+def classify_vitals(V: np.ndarray) -> np.ndarray:
+    """
+    Status code for every cell of an (N × 7) vitals matrix in one pass.
+    Same precedence as check_vital_status: critical before warning, low before high.
+    """
+    return np.select(
+        [V <= CRITICAL_LOW, V >= CRITICAL_HIGH, V <= WARNING_LOW, V >= WARNING_HIGH],
+        [1, 2, 3, 4],
+        0,
+    ).astype(np.int8)
+
+
+def analyze_anomalies_batch(reqs: Sequence[AnomalyCheckRequest]) -> List[AnomalyResult]:
+    """
+    Check many readings at once: one vectorised threshold pass over the whole
+    batch, with alert objects built only for the cells that breach.
+    """
+    if not reqs:
+        return []
+    V = vitals_matrix(reqs)
+    codes = classify_vitals(V)
+
+    alerts: Dict[int, List[AlertCreate]] = {}
+    rows, cols = np.nonzero(codes)
+    for i, j in zip(rows.tolist(), cols.tolist()):
+        req = reqs[i]
+        alerts.setdefault(i, []).append(build_alert(
+            req.patient_id, req.surgery_id, VITAL_NAMES[j], float(V[i, j]), _STATUS_NAMES[codes[i, j]],
+        ))
+
+    # Most rows share a handful of status patterns (usually all-normal).
+    # AnomalyResult copies the dict/list it is given, so patterns can be reused.
+    patterns: Dict[tuple, Dict[str, str]] = {}
+    no_alerts: List[AlertCreate] = []
+    results = []
+    for i, row in enumerate(codes.tolist()):
+        key = tuple(row)
+        status = patterns.get(key)
+        if status is None:
+            status = patterns[key] = {name: _STATUS_NAMES[c] for name, c in zip(VITAL_NAMES, row)}
+        fired = alerts.get(i, no_alerts)
+        results.append(AnomalyResult(
+            has_anomaly   = bool(fired),
+            alerts_fired  = fired,
+            vitals_status = status,
+        ))
+    return results
+
+
 def analyze_anomalies(req: AnomalyCheckRequest) -> AnomalyResult:
     """Check all vitals against thresholds and return fired alerts."""
     v = req.vitals
@@ -143,6 +218,51 @@ def analyze_anomalies(req: AnomalyCheckRequest) -> AnomalyResult:
     )
 
 
+# Runs anomaly checks on the inference pool, coalescing concurrent readings.
+anomaly_batcher = MicroBatcher("anomaly", analyze_anomalies_batch)
+
+
+# ── LIVE VITALS SIMULATION ─────────────────────────────────────────────────
+def simulate_vitals(t: int, patient_id: str) -> dict:
+    """
+    Simulate realistic live vitals with sinusoidal variation + noise.
+    In production: replace with real IoT device data.
+    """
+    # Use patient_id as seed offset for variety between patients
+    seed_offset = sum(ord(c) for c in patient_id) % 20
+
+    hr   = 75 + 8 * math.sin(t * 0.05 + seed_offset) + random.gauss(0, 1.5)
+    spo2 = 97.5 + 1.5 * math.sin(t * 0.03) + random.gauss(0, 0.3)
+    sbp  = 120 + 12 * math.sin(t * 0.04 + 1) + random.gauss(0, 2)
+    dbp  = 78  + 8  * math.sin(t * 0.04 + 1) + random.gauss(0, 1.5)
+    temp = 36.8 + 0.3 * math.sin(t * 0.02) + random.gauss(0, 0.05)
+    etco2 = 38 + 4 * math.sin(t * 0.06) + random.gauss(0, 0.8)
+    rr   = 15 + 3 * math.sin(t * 0.03) + random.gauss(0, 0.5)
+
+    # Clamp values to clinical ranges
+    vitals = {
+        "heart_rate":   round(max(40, min(160, hr)), 1),
+        "spo2":         round(max(85, min(100, spo2)), 1),
+        "systolic_bp":  round(max(70, min(200, sbp)), 1),
+        "diastolic_bp": round(max(40, min(130, dbp)), 1),
+        "temperature":  round(max(35.0, min(40.5, temp)), 2),
+        "etco2":        round(max(15, min(70, etco2)), 1),
+        "resp_rate":    round(max(6, min(35, rr)), 1),
+        "timestamp":    datetime.utcnow().isoformat(),
+        "patient_id":   patient_id,
+    }
+
+    # Determine overall status
+    status = "normal"
+    if vitals["spo2"] < 90 or vitals["heart_rate"] > 135 or vitals["heart_rate"] < 45:
+        status = "critical"
+    elif vitals["spo2"] < 93 or vitals["systolic_bp"] > 160:
+        status = "warning"
+    vitals["status"] = status
+
+    return vitals
+
+
 # ── VOICE COMMAND PROCESSOR ────────────────────────────────────────────────
 # Procedure steps for the timeline
 PROCEDURE_STEPS = [
@@ -155,26 +275,19 @@ PROCEDURE_STEPS = [
     "Recovery Handoff",
 ]
 
-async def transcribe_audio(audio_b64: str) -> str:
-    """Transcribe audio using OpenAI Whisper API."""
+async def transcribe_audio(audio_b64: str, client: Optional[httpx.AsyncClient] = None) -> str:
+    """Transcribe audio using OpenAI Whisper API (over the shared connection pool)."""
+    client = client or http_clients.get(UPSTREAM_OPENAI)
     try:
-        import base64, tempfile, os
-        import httpx
+        import base64
 
         audio_bytes = base64.b64decode(audio_b64)
-        with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as tmp:
-            tmp.write(audio_bytes)
-            tmp_path = tmp.name
-
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            with open(tmp_path, "rb") as audio_file:
-                resp = await client.post(
-                    "https://api.openai.com/v1/audio/transcriptions",
-                    headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
-                    data={"model": "whisper-1"},
-                    files={"file": ("audio.webm", audio_file, "audio/webm")},
-                )
-        os.unlink(tmp_path)
+        resp = await client.post(
+            "https://api.openai.com/v1/audio/transcriptions",
+            headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+            data={"model": "whisper-1"},
+            files={"file": ("audio.webm", audio_bytes, "audio/webm")},
+        )
 
         if resp.status_code == 200:
             return resp.json().get("text", "")
@@ -267,26 +380,16 @@ async def process_voice_command(
 async def ask_claude_voice(query: str, vitals: Optional[Dict]) -> str:
     """Fallback: send unrecognized query to Claude API."""
     try:
-        import anthropic
-        client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
-
         vitals_context = ""
         if vitals:
             vitals_context = f"Current vitals: {vitals}"
 
-        message = await client.messages.create(
-            model=settings.LLM_MODEL,
+        return await llm_gateway.complete(
+            f"You are Aetheris, a surgical AI co-pilot. "
+            f"Answer this surgeon's query concisely (1-2 sentences max). "
+            f"Query: '{query}'. {vitals_context}",
             max_tokens=150,
-            messages=[{
-                "role": "user",
-                "content": (
-                    f"You are Aetheris, a surgical AI co-pilot. "
-                    f"Answer this surgeon's query concisely (1-2 sentences max). "
-                    f"Query: '{query}'. {vitals_context}"
-                )
-            }]
         )
-        return message.content[0].text
     except Exception as e:
         logger.warning(f"Claude voice fallback failed: {e}")
         return "Query received. Please refer to the patient record for detailed information."
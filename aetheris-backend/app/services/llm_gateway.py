@@ -0,0 +1,314 @@
+"""
+Aetheris — LLM Gateway
+Single entry point for Claude completions (pre-op summaries, reports, voice
+answers). Responses are cached by content: the key is a SHA-256 of
+(model, prompt, max_tokens, temperature), so re-opening an assessment or
+regenerating an unchanged note is served from the cache in milliseconds and
+spends no tokens. The cache has an in-memory LRU tier and an on-disk tier,
+both with LLM_CACHE_TTL_SEC. Callers pass `bypass_cache=True` to force a
+fresh completion; its result replaces the cached one. Identical completions
+requested while one is in flight wait for it instead of calling Claude again.
+`stream` yields text as Claude writes it and records time to first token.
+
+Every uncached call goes through one process-wide client and is admitted by:
+
+  • a circuit breaker — after LLM_BREAKER_FAILURES consecutive failed calls,
+    fail fast with CircuitOpen for LLM_BREAKER_COOLDOWN_SEC, then probe once
+  • a concurrency cap of LLM_MAX_CONCURRENCY in-flight calls
+  • a token bucket of LLM_RATE_PER_SEC requests (burst LLM_RATE_BURST)
+
+Transient errors (connection, timeout, 408/409/429/5xx) are retried
+LLM_RETRIES times with jittered exponential backoff. Errors are raised to the
+caller, which owns the template fallback, so during an outage requests reach
+their fallback immediately instead of after the full timeout. Failures are
+never cached.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core.cache import TieredCache
+from app.core.config import settings
+from app.core.resilience import CircuitBreaker, TokenBucket, backoff_delay
+from app.core.singleflight import SingleFlight
+
+logger = logging.getLogger("aetheris.llm")
+
+llm_cache = TieredCache(
+    "llm_completions",
+    max_entries = settings.LLM_CACHE_MAX_ENTRIES,
+    ttl_sec     = settings.LLM_CACHE_TTL_SEC,
+    path        = settings.LLM_CACHE_PATH or None,
+)
+
+breaker = CircuitBreaker(settings.LLM_BREAKER_FAILURES, settings.LLM_BREAKER_COOLDOWN_SEC)
+rate_limiter = TokenBucket(settings.LLM_RATE_PER_SEC, settings.LLM_RATE_BURST)
+llm_flight = SingleFlight("llm_completion")
+
+_client_instance = None
+_slots: Optional[asyncio.Semaphore] = None
+_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+_in_flight = 0
+
+
+class LLMUnavailable(RuntimeError):
+    """No capacity for the call within LLM_QUEUE_TIMEOUT_SEC (concurrency cap or rate limit)."""
+
+
+# Metrics
+_usage: Dict[str, int] = {
+    "completions_total":    0,
+    "cache_bypass_total":   0,
+    "input_tokens_total":   0,
+    "output_tokens_total":  0,
+    "input_tokens_saved":   0,
+    "output_tokens_saved":  0,
+    "retries_total":        0,
+    "failures_total":       0,
+    "queue_timeouts_total": 0,
+}
+# Time to first token of streamed (uncached) completions
+_ttft: Dict[str, float] = {"streams_total": 0, "ttft_ms_last": 0.0, "ttft_ms_max": 0.0, "ttft_ms_sum": 0.0}
+
+
+def cache_key(model: str, prompt: str, max_tokens: int, temperature: Optional[float]) -> str:
+    """Content address of a completion request."""
+    payload = json.dumps([model, prompt, max_tokens, temperature], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ── CLIENT & ADMISSION ─────────────────────────────────────────────────────
+def _client():
+    """The process-wide Anthropic client (its connection pool is reused across calls)."""
+    global _client_instance
+    if _client_instance is None:
+        import anthropic
+        _client_instance = anthropic.AsyncAnthropic(
+            api_key=settings.ANTHROPIC_API_KEY,
+            timeout=settings.LLM_TIMEOUT_SEC,
+            max_retries=0,   # retried here, under the breaker and rate limit
+        )
+    return _client_instance
+
+
+async def aclose() -> None:
+    """Close the shared client (app shutdown)."""
+    global _client_instance
+    client, _client_instance = _client_instance, None
+    if client is not None:
+        await client.close()
+
+
+def _semaphore() -> asyncio.Semaphore:
+    global _slots, _slots_loop
+    loop = asyncio.get_running_loop()
+    if _slots is None or _slots_loop is not loop:
+        _slots, _slots_loop = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY), loop
+    return _slots
+
+
+@asynccontextmanager
+async def _admitted() -> AsyncIterator[Optional[object]]:
+    """
+    Breaker check plus a concurrency slot, held for one call and all its
+    retries. Yields the breaker's probe token (None unless this is the probe).
+    """
+    global _in_flight
+    probe = breaker.before_call()
+    try:
+        slots = _semaphore()
+        try:
+            await asyncio.wait_for(slots.acquire(), settings.LLM_QUEUE_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            _usage["queue_timeouts_total"] += 1
+            raise LLMUnavailable(f"All {settings.LLM_MAX_CONCURRENCY} LLM slots busy")
+        _in_flight += 1
+        try:
+            yield probe
+        finally:
+            _in_flight -= 1
+            slots.release()
+    finally:
+        breaker.release(probe)
+
+
+async def _rate_limit() -> None:
+    if not await rate_limiter.acquire(settings.LLM_QUEUE_TIMEOUT_SEC):
+        _usage["queue_timeouts_total"] += 1
+        raise LLMUnavailable(f"LLM rate limit ({settings.LLM_RATE_PER_SEC:g}/s) exceeded")
+
+
+def _is_transient(e: Exception) -> bool:
+    import anthropic
+    if isinstance(e, (anthropic.APIConnectionError, asyncio.TimeoutError)):   # includes APITimeoutError
+        return True
+    if isinstance(e, anthropic.APIStatusError):
+        return e.status_code in (408, 409, 429) or e.status_code >= 500
+    return False
+
+
+def _retry_delay(e: Exception, attempt: int, probe: Optional[object], can_retry: bool = True) -> Optional[float]:
+    """
+    Backoff before retrying after `e`, or None if it must be raised. Transient
+    failures that will not be retried count against the circuit breaker.
+    """
+    if not _is_transient(e):
+        return None
+    if not can_retry or attempt >= settings.LLM_RETRIES:
+        _usage["failures_total"] += 1
+        breaker.record_failure(probe)
+        return None
+    _usage["retries_total"] += 1
+    logger.warning(f"LLM call failed (attempt {attempt + 1}), retrying: {e!r}")
+    return backoff_delay(attempt, settings.LLM_RETRY_BASE_SEC, settings.LLM_RETRY_MAX_SEC)
+
+
+def _request(prompt: str, max_tokens: int, temperature: Optional[float]) -> Dict[str, Any]:
+    params: Dict[str, Any] = {
+        "model":      settings.LLM_MODEL,
+        "max_tokens": max_tokens,
+        "messages":   [{"role": "user", "content": prompt}],
+    }
+    if temperature is not None:
+        params["temperature"] = temperature
+    return params
+
+
+async def _cached(key: str, bypass_cache: bool) -> Optional[str]:
+    """Cached text for `key`, or None (also when bypassed or disabled)."""
+    if bypass_cache:
+        _usage["cache_bypass_total"] += 1
+        return None
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    hit, cached = await llm_cache.get(key)
+    if not hit:
+        return None
+    _usage["input_tokens_saved"]  += cached.get("input_tokens", 0)
+    _usage["output_tokens_saved"] += cached.get("output_tokens", 0)
+    return cached["text"]
+
+
+async def _record(key: str, text: str, usage: Any) -> None:
+    """Count a billed completion and cache it."""
+    entry = {
+        "text":          text,
+        "input_tokens":  getattr(usage, "input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+    }
+    _usage["completions_total"]   += 1
+    _usage["input_tokens_total"]  += entry["input_tokens"]
+    _usage["output_tokens_total"] += entry["output_tokens"]
+    if settings.LLM_CACHE_ENABLED:
+        await llm_cache.set(key, entry)
+
+
+def _record_ttft(ms: float) -> None:
+    _ttft["streams_total"] += 1
+    _ttft["ttft_ms_last"]   = ms
+    _ttft["ttft_ms_max"]    = max(_ttft["ttft_ms_max"], ms)
+    _ttft["ttft_ms_sum"]   += ms
+
+
+async def complete(
+    prompt: str,
+    max_tokens: int,
+    temperature: Optional[float] = None,
+    bypass_cache: bool = False,
+) -> str:
+    """Text of a single-turn Claude completion, from the cache when possible."""
+    key = cache_key(settings.LLM_MODEL, prompt, max_tokens, temperature)
+    # Identical prompts already in flight share one call (a forced-fresh one only with its own kind)
+    flight_key = f"fresh:{key}" if bypass_cache else key
+    return await llm_flight.do(flight_key, lambda: _complete(key, prompt, max_tokens, temperature, bypass_cache))
+
+
+async def _complete(
+    key: str,
+    prompt: str,
+    max_tokens: int,
+    temperature: Optional[float],
+    bypass_cache: bool,
+) -> str:
+    cached = await _cached(key, bypass_cache)
+    if cached is not None:
+        return cached
+
+    async with _admitted() as probe:
+        for attempt in range(settings.LLM_RETRIES + 1):
+            await _rate_limit()
+            try:
+                message = await _client().messages.create(**_request(prompt, max_tokens, temperature))
+                break
+            except Exception as e:
+                delay = _retry_delay(e, attempt, probe)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+        breaker.record_success(probe)
+
+    text = message.content[0].text
+    await _record(key, text, getattr(message, "usage", None))
+    return text
+
+
+async def stream(
+    prompt: str,
+    max_tokens: int,
+    temperature: Optional[float] = None,
+    bypass_cache: bool = False,
+) -> AsyncIterator[str]:
+    """
+    Text deltas of a streamed Claude completion, as they arrive. A cache hit
+    yields the whole text at once. The completion is cached once it finishes;
+    an interrupted stream is not.
+    """
+    key = cache_key(settings.LLM_MODEL, prompt, max_tokens, temperature)
+    cached = await _cached(key, bypass_cache)
+    if cached is not None:
+        yield cached
+        return
+
+    start = time.perf_counter()
+    parts: List[str] = []
+    async with _admitted() as probe:
+        for attempt in range(settings.LLM_RETRIES + 1):
+            await _rate_limit()
+            try:
+                async with _client().messages.stream(**_request(prompt, max_tokens, temperature)) as response:
+                    async for text in response.text_stream:
+                        if not parts:
+                            _record_ttft((time.perf_counter() - start) * 1000)
+                        parts.append(text)
+                        yield text
+                    message = await response.get_final_message()
+                break
+            except Exception as e:
+                # Once text has been sent, a retry would repeat it: give up instead
+                delay = _retry_delay(e, attempt, probe, can_retry=not parts)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+        breaker.record_success(probe)
+
+    await _record(key, "".join(parts), getattr(message, "usage", None))
+
+
+def metrics() -> Dict[str, Any]:
+    streams = _ttft["streams_total"]
+    return {
+        **_usage,
+        "in_flight":       _in_flight,
+        "max_concurrency": settings.LLM_MAX_CONCURRENCY,
+        "circuit":         breaker.metrics(),
+        "streams_total":   streams,
+        "ttft_ms_last":    round(_ttft["ttft_ms_last"], 1),
+        "ttft_ms_avg":     round(_ttft["ttft_ms_sum"] / streams, 1) if streams else 0.0,
+        "ttft_ms_max":     round(_ttft["ttft_ms_max"], 1),
+        "cache":           llm_cache.metrics(),
+    }
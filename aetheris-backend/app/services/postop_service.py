@@ -4,15 +4,21 @@ Handles: Complication Risk Prediction, Operative Note Generation, Discharge Summ
 """
 
 import logging
+import time
 import uuid
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, AsyncIterator, Optional, List, Tuple, Dict, Callable, Sequence
+
+import numpy as np
 
 from app.core.config import settings
+from app.core.inference import MicroBatcher, round1
+from app.core.singleflight import SingleFlight, request_key
 from app.schemas import (
     ComplicationRiskRequest, ComplicationRiskResponse, ComplicationRisk,
     ReportGenerateRequest, ReportResponse, ReportType
 )
+from app.services import llm_gateway
 
 logger = logging.getLogger("aetheris.postop")
 
@@ -34,56 +40,66 @@ def risk_to_level(pct: float) -> str:
     elif pct < 25: return "MEDIUM"
     else:          return "HIGH"
 
-def predict_complications(req: ComplicationRiskRequest) -> ComplicationRiskResponse:
-    """Heuristic + ML hybrid complication risk prediction."""
-    try:
-        # Try ML model first
-        from app.ml.model_service import load_complication_model
-        import pandas as pd
-
-        bundle  = load_complication_model()
-        model   = bundle["model"]
-        features = bundle["features"]
-        targets  = bundle["targets"]
-
-        row = {
-            "age":                    req.age or 55,
-            "bmi":                    26.0,
-            "surgery_duration_min":   req.duration_min or 150,
-            "blood_loss_ml":          req.blood_loss_ml or 300,
-            "asa_class":              {"I":1,"II":2,"III":3,"IV":4,"V":5}.get(req.asa_class or "II", 2),
-            "diabetes":               int(req.diabetes),
-            "hypertension":           int(req.hypertension),
-            "cardiac_hx":             int(req.cardiac_hx),
-            "smoker":                 int(req.smoker),
-            "surgery_type_cardiac":   int(req.surgery_type.value == "Cardiac"),
-            "surgery_type_orthopedic":int(req.surgery_type.value == "Orthopedic"),
-            "surgery_type_neuro":     int(req.surgery_type.value == "Neurological"),
-        }
-        X   = pd.DataFrame([row])
-        preds = model.predict(X)[0]
-        dvt, infection, pneumonia, readmission = [round(float(p), 1) for p in preds]
+def heuristic_complications(req: ComplicationRiskRequest) -> Tuple[float, float, float, float]:
+    """Surgery-type baseline scaled by comorbidity modifiers; used while the ML model is unavailable."""
+    base = SURGERY_COMPLICATION_BASE.get(req.surgery_type.value,
+           {"dvt":10,"infection":8,"pneumonia":10,"readmission":12})
+    mod = 1.0
+    if req.diabetes:    mod += 0.3
+    if req.cardiac_hx:  mod += 0.4
+    if req.hypertension: mod += 0.15
+    if req.smoker:      mod += 0.2
+    asa_map = {"I":0.7,"II":1.0,"III":1.4,"IV":2.0,"V":3.0}
+    mod *= asa_map.get(req.asa_class or "II", 1.0)
+    if req.duration_min and req.duration_min > 240: mod += 0.2
+    if req.blood_loss_ml and req.blood_loss_ml > 500: mod += 0.25
+
+    dvt          = round(min(base["dvt"]        * mod, 75), 1)
+    infection    = round(min(base["infection"]   * mod, 60), 1)
+    pneumonia    = round(min(base["pneumonia"]   * mod, 70), 1)
+    readmission  = round(min(base["readmission"] * mod, 60), 1)
+    return dvt, infection, pneumonia, readmission
+
+
+# Feature extractors keyed by the FEATURES names in train_complication_model.
+# Defaults fill in fields the request leaves empty.
+ASA_ORDINAL = {"I":1, "II":2, "III":3, "IV":4, "V":5}
+
+COMPLICATION_FEATURE_EXTRACTORS: Dict[str, Callable[[ComplicationRiskRequest], float]] = {
+    "age":                     lambda r: r.age or 55,
+    "bmi":                     lambda r: 26.0,
+    "surgery_duration_min":    lambda r: r.duration_min or 150,
+    "blood_loss_ml":           lambda r: r.blood_loss_ml or 300,
+    "asa_class":               lambda r: ASA_ORDINAL.get(r.asa_class or "II", 2),
+    "diabetes":                lambda r: r.diabetes,
+    "hypertension":            lambda r: r.hypertension,
+    "cardiac_hx":              lambda r: r.cardiac_hx,
+    "smoker":                  lambda r: r.smoker,
+    "surgery_type_cardiac":    lambda r: r.surgery_type.value == "Cardiac",
+    "surgery_type_orthopedic": lambda r: r.surgery_type.value == "Orthopedic",
+    "surgery_type_neuro":      lambda r: r.surgery_type.value == "Neurological",
+}
 
-    except Exception as e:
-        logger.warning(f"Complication ML model fallback: {e}")
-        # Heuristic fallback
-        base = SURGERY_COMPLICATION_BASE.get(req.surgery_type.value,
-               {"dvt":10,"infection":8,"pneumonia":10,"readmission":12})
-        mod = 1.0
-        if req.diabetes:    mod += 0.3
-        if req.cardiac_hx:  mod += 0.4
-        if req.hypertension: mod += 0.15
-        if req.smoker:      mod += 0.2
-        asa_map = {"I":0.7,"II":1.0,"III":1.4,"IV":2.0,"V":3.0}
-        mod *= asa_map.get(req.asa_class or "II", 1.0)
-        if req.duration_min and req.duration_min > 240: mod += 0.2
-        if req.blood_loss_ml and req.blood_loss_ml > 500: mod += 0.25
-
-        dvt          = round(min(base["dvt"]        * mod, 75), 1)
-        infection    = round(min(base["infection"]   * mod, 60), 1)
-        pneumonia    = round(min(base["pneumonia"]   * mod, 70), 1)
-        readmission  = round(min(base["readmission"] * mod, 60), 1)
 
+def complication_feature_matrix(
+    reqs: Sequence[ComplicationRiskRequest],
+    features: Sequence[str],
+) -> np.ndarray:
+    """Build one (n_requests × n_features) float matrix in the model's feature order."""
+    X = np.empty((len(reqs), len(features)), dtype=np.float64)
+    for j, name in enumerate(features):
+        extract = COMPLICATION_FEATURE_EXTRACTORS[name]
+        X[:, j] = np.fromiter((extract(r) for r in reqs), dtype=np.float64, count=len(reqs))
+    return X
+
+
+def build_complication_response(
+    req: ComplicationRiskRequest,
+    dvt: float,
+    infection: float,
+    pneumonia: float,
+    readmission: float,
+) -> ComplicationRiskResponse:
     overall = round((dvt * 0.25 + infection * 0.25 + pneumonia * 0.25 + readmission * 0.25), 1)
     overall_level = risk_to_level(overall)
 
@@ -130,6 +146,44 @@ def predict_complications(req: ComplicationRiskRequest) -> ComplicationRiskRespo
     )
 
 
+def predict_complications_batch(
+    reqs: Sequence[ComplicationRiskRequest],
+) -> List[ComplicationRiskResponse]:
+    """
+    Score many patients with a single model.predict call.
+    Falls back to the per-patient heuristic if the model is unavailable.
+    """
+    from app.ml.model_registry import model_registry
+
+    risks = None
+    if reqs and model_registry.is_loaded("complication"):
+        try:
+            X = complication_feature_matrix(reqs, model_registry.features("complication"))
+            model = model_registry.predictor("complication", len(reqs))
+            risks = round1(model.predict(X)).tolist()
+        except Exception as e:
+            logger.warning(f"Complication ML model fallback: {e}")
+    if risks is None:
+        risks = [heuristic_complications(r) for r in reqs]
+
+    return [build_complication_response(req, *row) for req, row in zip(reqs, risks)]
+
+
+def predict_complications(req: ComplicationRiskRequest) -> ComplicationRiskResponse:
+    """Heuristic + ML hybrid complication risk prediction."""
+    return predict_complications_batch([req])[0]
+
+
+# Coalesces concurrent single-patient requests into one model.predict call.
+complication_batcher = MicroBatcher("complication", predict_complications_batch)
+complication_flight = SingleFlight("complication_risk")
+
+
+async def predict_complication_risk(req: ComplicationRiskRequest) -> ComplicationRiskResponse:
+    """Complication risks for one patient; identical requests in flight share one prediction."""
+    return await complication_flight.do(request_key(req), lambda: complication_batcher.submit(req))
+
+
 # ── REPORT GENERATION ──────────────────────────────────────────────────────
 OPERATIVE_NOTE_TEMPLATE = """
 OPERATIVE NOTE
@@ -205,18 +259,10 @@ DISCHARGE PHYSICIAN: ___________________________
 """.strip()
 
 
-async def generate_report_with_llm(
-    req: ReportGenerateRequest,
-    patient_data: dict,
-    surgery_data: dict,
-) -> str:
-    """Use Claude API to generate a clinical report."""
-    try:
-        import anthropic
-        client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
-
-        if req.report_type == ReportType.OPERATIVE_NOTE:
-            prompt = f"""Generate a professional operative note for the following surgery.
+def build_report_prompt(req: ReportGenerateRequest, patient_data: dict, surgery_data: dict) -> str:
+    """Claude prompt for a clinical report."""
+    if req.report_type == ReportType.OPERATIVE_NOTE:
+        return f"""Generate a professional operative note for the following surgery.
 Use standard clinical format. Be concise but complete.
 
 Patient: {patient_data.get('name', 'N/A')}, Age: {patient_data.get('age', 'N/A')}
@@ -229,8 +275,8 @@ Additional notes: {req.extra_notes or 'None'}
 Write a complete operative note with sections: Preoperative Diagnosis, 
 Postoperative Diagnosis, Procedure Performed, Operative Details, Disposition.
 """
-        elif req.report_type == ReportType.DISCHARGE_SUMMARY:
-            prompt = f"""Generate a professional discharge summary.
+    elif req.report_type == ReportType.DISCHARGE_SUMMARY:
+        return f"""Generate a professional discharge summary.
 
 Patient: {patient_data.get('name', 'N/A')}, Age: {patient_data.get('age', 'N/A')}
 Procedure: {surgery_data.get('surgery_type', 'N/A')}
@@ -239,15 +285,18 @@ Additional notes: {req.extra_notes or 'None'}
 Write a complete discharge summary with sections: Hospital Course, 
 Discharge Condition, Discharge Medications, Instructions, Follow-up.
 """
-        else:
-            prompt = f"Generate a {req.report_type.value} report for patient {req.patient_id}."
+    return f"Generate a {req.report_type.value} report for patient {req.patient_id}."
 
-        message = await client.messages.create(
-            model=settings.LLM_MODEL,
-            max_tokens=settings.LLM_MAX_TOKENS,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return message.content[0].text
+
+async def generate_report_with_llm(
+    req: ReportGenerateRequest,
+    patient_data: dict,
+    surgery_data: dict,
+) -> str:
+    """Use Claude API to generate a clinical report."""
+    try:
+        prompt = build_report_prompt(req, patient_data, surgery_data)
+        return await llm_gateway.complete(prompt, max_tokens=settings.LLM_MAX_TOKENS, bypass_cache=req.regenerate)
 
     except Exception as e:
         logger.warning(f"Claude API unavailable for report: {e}")
@@ -288,10 +337,16 @@ def generate_template_report(req, patient_data: dict, surgery_data: dict) -> str
         )
 
 
-async def run_report_generation(req: ReportGenerateRequest) -> ReportResponse:
-    """Orchestrate full report generation pipeline."""
-    logger.info(f"Generating {req.report_type} for patient {req.patient_id}")
+REPORT_TITLES = {
+    ReportType.OPERATIVE_NOTE:      "Operative Note",
+    ReportType.DISCHARGE_SUMMARY:   "Discharge Summary",
+    ReportType.RISK_ASSESSMENT:     "Pre-Op Risk Assessment Report",
+    ReportType.COMPLICATION_REPORT: "Complication Risk Report",
+}
 
+
+def _report_context(req: ReportGenerateRequest) -> Tuple[dict, dict]:
+    """Patient and surgery data for a report."""
     # Mock patient/surgery data (in production: fetch from DB)
     patient_data = {
         "name": "Patient", "age": "N/A",
@@ -305,23 +360,76 @@ async def run_report_generation(req: ReportGenerateRequest) -> ReportResponse:
         "duration_minutes": 180,
         "estimated_blood_loss_ml": 300,
     }
+    return patient_data, surgery_data
 
-    content = await generate_report_with_llm(req, patient_data, surgery_data)
-
-    titles = {
-        ReportType.OPERATIVE_NOTE:      "Operative Note",
-        ReportType.DISCHARGE_SUMMARY:   "Discharge Summary",
-        ReportType.RISK_ASSESSMENT:     "Pre-Op Risk Assessment Report",
-        ReportType.COMPLICATION_REPORT: "Complication Risk Report",
-    }
 
+def _report_response(req: ReportGenerateRequest, content: str) -> ReportResponse:
     return ReportResponse(
         id          = str(uuid.uuid4()),
         patient_id  = req.patient_id,
         surgery_id  = req.surgery_id,
         report_type = req.report_type.value,
-        title       = titles.get(req.report_type, "Clinical Report"),
+        title       = REPORT_TITLES.get(req.report_type, "Clinical Report"),
         content     = content,
         status      = "draft",
         created_at  = datetime.utcnow(),
     )
+
+
+report_flight = SingleFlight("report_generation")
+
+async def run_report_generation(req: ReportGenerateRequest) -> ReportResponse:
+    """
+    Orchestrate full report generation pipeline. Identical requests already in
+    flight share one draft's content; each still gets its own report id.
+    """
+    content = await report_flight.do(request_key(req), lambda: _draft_report(req))
+    return _report_response(req, content)
+
+
+async def _draft_report(req: ReportGenerateRequest) -> str:
+    logger.info(f"Generating {req.report_type} for patient {req.patient_id}")
+    patient_data, surgery_data = _report_context(req)
+    return await generate_report_with_llm(req, patient_data, surgery_data)
+
+
+async def stream_report_generation(req: ReportGenerateRequest) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Streaming run_report_generation. Yields (event, data):
+
+      • ("token",  {"text"})   — report text as Claude writes it
+      • ("reset",  {})         — the API failed mid-report: discard the text so far
+      • ("stats",  {"source", "ttft_ms", "total_ms"})
+      • ("report", ReportResponse as JSON) — always last
+
+    When the API is unavailable the template report is streamed instead.
+    """
+    logger.info(f"Streaming {req.report_type} for patient {req.patient_id}")
+    patient_data, surgery_data = _report_context(req)
+    start = time.perf_counter()
+    ttft_ms: Optional[float] = None
+    parts: List[str] = []
+    source = "llm"
+
+    try:
+        prompt = build_report_prompt(req, patient_data, surgery_data)
+        async for text in llm_gateway.stream(prompt, max_tokens=settings.LLM_MAX_TOKENS, bypass_cache=req.regenerate):
+            if ttft_ms is None:
+                ttft_ms = (time.perf_counter() - start) * 1000
+            parts.append(text)
+            yield "token", {"text": text}
+    except Exception as e:
+        logger.warning(f"Claude API unavailable for streamed report, streaming template: {e}")
+        if parts:
+            yield "reset", {}
+        parts, source = [], "template"
+        for line in generate_template_report(req, patient_data, surgery_data).splitlines(keepends=True):
+            if ttft_ms is None:
+                ttft_ms = (time.perf_counter() - start) * 1000
+            parts.append(line)
+            yield "token", {"text": line}
+
+    total_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"Report stream for {req.patient_id}: {source}, first token {ttft_ms or 0:.0f} ms, total {total_ms:.0f} ms")
+    yield "stats", {"source": source, "ttft_ms": round(ttft_ms or 0.0, 1), "total_ms": round(total_ms, 1)}
+    yield "report", _report_response(req, "".join(parts)).model_dump(mode="json")
@@ -8,10 +8,17 @@ import asyncio
 import logging
 import numpy as np
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Callable, AsyncIterator, Tuple
 import uuid
 
+from app.core.cache import TieredCache
 from app.core.config import settings
+from app.core.http import UPSTREAM_OPENFDA, http_clients
+from app.core.inference import MicroBatcher, inference_pool, round1
+from app.core.pipeline import PipelineRun, Stage, run_pipeline
+from app.core.singleflight import SingleFlight, request_key
+from app.services import llm_gateway
+from app.services.drug_matcher import InteractionMatcher
 from app.schemas import (
     PreOpAssessmentRequest, PreOpAssessmentResponse,
     DrugInteraction, RiskBreakdown, ChecklistItem
@@ -19,6 +26,7 @@ from app.schemas import (
 
 logger = logging.getLogger("aetheris.preop")
 
+
 # ── ASA RISK SCORING ───────────────────────────────────────────────────────
 SURGERY_RISK_MAP = {
     "Cardiac":      {"cardiac": 35, "anesthesia": 28, "surgical": 40},
@@ -31,53 +39,70 @@ SURGERY_RISK_MAP = {
     "Ophthalmic":   {"cardiac": 5,  "anesthesia": 8,  "surgical": 6},
 }
 
-def calculate_risk_scores(req: PreOpAssessmentRequest) -> Dict[str, float]:
-    """Heuristic + ML hybrid risk calculation."""
-    base = SURGERY_RISK_MAP.get(req.surgery_type.value, {"cardiac":10,"anesthesia":12,"surgical":15})
+DEFAULT_SURGERY_RISK = {"cardiac":10, "anesthesia":12, "surgical":15}
+ASA_RISK_BONUS = {"I":0, "II":5, "III":15, "IV":30, "V":50}
+ASA_LABELS = np.array(["I","II","III","IV","V"])
 
-    # Modifiers
-    cardiac    = base["cardiac"]
-    anesthesia = base["anesthesia"]
-    surgical   = base["surgical"]
 
-    # Age factor
-    age = getattr(req, "age", None)
-    # Fallback from context
-    if req.cardiac_hx:  cardiac    += 20; anesthesia += 10
-    if req.diabetes:    cardiac    += 8;  surgical   += 5
-    if req.hypertension: cardiac   += 10; anesthesia += 5
-    if req.smoking:     anesthesia += 8;  surgical   += 6
+def _column(reqs: Sequence[PreOpAssessmentRequest], extract: Callable[[PreOpAssessmentRequest], Any]) -> np.ndarray:
+    return np.fromiter((extract(r) for r in reqs), dtype=np.float64, count=len(reqs))
+
+
+def _bmi(req: PreOpAssessmentRequest) -> Optional[float]:
+    if req.weight_kg and req.height_cm:
+        return req.weight_kg / ((req.height_cm / 100) ** 2)
+    return None
+
+
+def calculate_risk_scores_batch(reqs: Sequence[PreOpAssessmentRequest]) -> List[Dict[str, float]]:
+    """Heuristic + ML hybrid risk calculation, vectorized across requests."""
+    bases = [SURGERY_RISK_MAP.get(r.surgery_type.value, DEFAULT_SURGERY_RISK) for r in reqs]
+    cardiac    = _column(bases, lambda b: b["cardiac"])
+    anesthesia = _column(bases, lambda b: b["anesthesia"])
+    surgical   = _column(bases, lambda b: b["surgical"])
+
+    # Comorbidity modifiers
+    cardiac_hx   = _column(reqs, lambda r: r.cardiac_hx)
+    diabetes     = _column(reqs, lambda r: r.diabetes)
+    hypertension = _column(reqs, lambda r: r.hypertension)
+    smoking      = _column(reqs, lambda r: r.smoking)
+    cardiac    += 20 * cardiac_hx;   anesthesia += 10 * cardiac_hx
+    cardiac    += 8  * diabetes;     surgical   += 5  * diabetes
+    cardiac    += 10 * hypertension; anesthesia += 5  * hypertension
+    anesthesia += 8  * smoking;      surgical   += 6  * smoking
 
     # ASA adjustment
-    asa_map = {"I":0, "II":5, "III":15, "IV":30, "V":50}
-    asa_bonus = asa_map.get(req.asa_class.value if req.asa_class else "II", 5)
+    asa_bonus = _column(reqs, lambda r: ASA_RISK_BONUS.get(r.asa_class.value if r.asa_class else "II", 5))
     cardiac    += asa_bonus * 0.4
     anesthesia += asa_bonus * 0.4
     surgical   += asa_bonus * 0.2
 
-    # SpO2 / vitals penalties
-    if req.spo2 and req.spo2 < 93:   anesthesia += 15
-    if req.systolic_bp and req.systolic_bp > 160: cardiac += 10
+    # SpO2 / vitals penalties (missing values are NaN and never trigger)
+    spo2        = _column(reqs, lambda r: r.spo2 or np.nan)
+    systolic_bp = _column(reqs, lambda r: r.systolic_bp or np.nan)
+    anesthesia += 15 * (spo2 < 93)
+    cardiac    += 10 * (systolic_bp > 160)
 
     # BMI
-    bmi = None
-    if req.weight_kg and req.height_cm:
-        bmi = req.weight_kg / ((req.height_cm / 100) ** 2)
-        if bmi > 40: anesthesia += 12; surgical += 8
-        elif bmi > 30: anesthesia += 5; surgical += 3
+    bmi = _column(reqs, lambda r: _bmi(r) or np.nan)
+    anesthesia += np.where(bmi > 40, 12, np.where(bmi > 30, 5, 0))
+    surgical   += np.where(bmi > 40, 8,  np.where(bmi > 30, 3, 0))
 
     # Clamp to 0-100
-    cardiac    = min(100, max(1, round(cardiac, 1)))
-    anesthesia = min(100, max(1, round(anesthesia, 1)))
-    surgical   = min(100, max(1, round(surgical, 1)))
-    overall    = round((cardiac * 0.35 + anesthesia * 0.35 + surgical * 0.30), 1)
+    cardiac    = np.clip(round1(cardiac), 1, 100)
+    anesthesia = np.clip(round1(anesthesia), 1, 100)
+    surgical   = np.clip(round1(surgical), 1, 100)
+    overall    = round1(cardiac * 0.35 + anesthesia * 0.35 + surgical * 0.30)
 
-    return {
-        "cardiac": cardiac,
-        "anesthesia": anesthesia,
-        "surgical": surgical,
-        "overall": overall,
-    }
+    return [
+        {"cardiac": c, "anesthesia": a, "surgical": s, "overall": o}
+        for c, a, s, o in zip(cardiac.tolist(), anesthesia.tolist(), surgical.tolist(), overall.tolist())
+    ]
+
+
+def calculate_risk_scores(req: PreOpAssessmentRequest) -> Dict[str, float]:
+    """Heuristic + ML hybrid risk calculation."""
+    return calculate_risk_scores_batch([req])[0]
 
 
 def score_to_level(score: float) -> str:
@@ -87,48 +112,63 @@ def score_to_level(score: float) -> str:
     else:            return "CRITICAL"
 
 
+# Feature extractors keyed by the FEATURES names in train_asa_model.
+# Fields the request does not carry use population defaults.
+ASA_FEATURE_EXTRACTORS: Dict[str, Callable[[PreOpAssessmentRequest], float]] = {
+    "age":               lambda r: 40,  # default — ideally passed from patient record
+    "bmi":               lambda r: _bmi(r) or 26,
+    "weight_kg":         lambda r: r.weight_kg or 75,
+    "systolic_bp":       lambda r: r.systolic_bp or 120,
+    "diastolic_bp":      lambda r: r.diastolic_bp or 80,
+    "heart_rate":        lambda r: r.heart_rate or 75,
+    "temperature":       lambda r: r.temperature or 36.8,
+    "spo2":              lambda r: r.spo2 or 98,
+    "resp_rate":         lambda r: 16,
+    "etco2":             lambda r: 38,
+    "diabetes":          lambda r: r.diabetes,
+    "hypertension":      lambda r: r.hypertension,
+    "cardiac_hx":        lambda r: r.cardiac_hx,
+    "smoking":           lambda r: r.smoking,
+    "comorbidity_count": lambda r: sum([r.diabetes, r.hypertension, r.cardiac_hx, r.smoking]),
+    "albumin_low":       lambda r: 0,
+    "hematocrit_low":    lambda r: 0,
+}
+
+
+def asa_feature_matrix(reqs: Sequence[PreOpAssessmentRequest], features: Sequence[str]) -> np.ndarray:
+    """Build one (n_requests × n_features) matrix in the model's feature order."""
+    X = np.empty((len(reqs), len(features)), dtype=np.float64)
+    for j, name in enumerate(features):
+        X[:, j] = _column(reqs, ASA_FEATURE_EXTRACTORS[name])
+    return X
+
+
+def heuristic_asa(req: PreOpAssessmentRequest) -> str:
+    """Comorbidity-count ASA estimate used while the ML model is unavailable."""
+    score = sum([req.diabetes, req.hypertension, req.cardiac_hx, req.smoking])
+    return ["I","II","III","IV","V"][min(score, 4)]
+
+
+def predict_asa_batch(reqs: Sequence[PreOpAssessmentRequest]) -> List[str]:
+    """Predict ASA class for many requests with one scaler/model call."""
+    from app.ml.model_registry import model_registry
+    if reqs and model_registry.is_loaded("asa"):
+        try:
+            X = asa_feature_matrix(reqs, model_registry.features("asa"))
+            predicted = model_registry.predictor("asa", len(reqs)).predict(X)
+            return ASA_LABELS[predicted.astype(int) - 1].tolist()
+        except Exception as e:
+            logger.warning(f"ML model fallback to heuristic: {e}")
+    return [heuristic_asa(r) for r in reqs]
+
+
 def predict_asa(req: PreOpAssessmentRequest) -> str:
     """Use saved ML model or fall back to heuristic."""
-    try:
-        from app.ml.model_service import load_asa_model, load_scaler
-        import pandas as pd
-
-        bundle = load_asa_model()
-        model  = bundle["model"]
-        scaler = load_scaler()
-
-        bmi = None
-        if req.weight_kg and req.height_cm:
-            bmi = req.weight_kg / ((req.height_cm / 100) ** 2)
-
-        row = {
-            "age":              40,  # default — ideally passed from patient record
-            "bmi":              bmi or 26,
-            "weight_kg":        req.weight_kg or 75,
-            "systolic_bp":      req.systolic_bp or 120,
-            "diastolic_bp":     req.diastolic_bp or 80,
-            "heart_rate":       req.heart_rate or 75,
-            "temperature":      req.temperature or 36.8,
-            "spo2":             req.spo2 or 98,
-            "resp_rate":        16,
-            "etco2":            38,
-            "diabetes":         int(req.diabetes),
-            "hypertension":     int(req.hypertension),
-            "cardiac_hx":       int(req.cardiac_hx),
-            "smoking":          int(req.smoking),
-            "comorbidity_count": sum([req.diabetes, req.hypertension, req.cardiac_hx, req.smoking]),
-            "albumin_low":      0,
-            "hematocrit_low":   0,
-        }
-        X = pd.DataFrame([row])
-        X_scaled = scaler.transform(X)
-        predicted = model.predict(X_scaled)[0]
-        return ["I","II","III","IV","V"][predicted - 1]
-    except Exception as e:
-        logger.warning(f"ML model fallback to heuristic: {e}")
-        # Heuristic fallback
-        score = sum([req.diabetes, req.hypertension, req.cardiac_hx, req.smoking])
-        return ["I","II","III","IV","V"][min(score, 4)]
+    return predict_asa_batch([req])[0]
+
+
+# Coalesces concurrent single-patient ASA predictions into one batch call.
+asa_batcher = MicroBatcher("asa", predict_asa_batch)
 
 
 # ── DRUG INTERACTION CHECKER ───────────────────────────────────────────────
@@ -156,41 +196,107 @@ KNOWN_INTERACTIONS = [
      "desc": "NSAIDs reduce lithium clearance — risk of toxicity."},
 ]
 
-async def check_drug_interactions(medications: List[str]) -> List[DrugInteraction]:
-    """Check medications against known interaction database + OpenFDA API."""
-    interactions = []
-    meds_lower = [m.lower().strip() for m in medications]
-
-    # Local DB check
-    for pair in KNOWN_INTERACTIONS:
-        a_found = any(pair["a"] in m for m in meds_lower)
-        b_found = any(pair["b"] in m for m in meds_lower)
-        if a_found and b_found:
-            interactions.append(DrugInteraction(
-                drug_a=pair["a"].title(),
-                drug_b=pair["b"].title(),
-                severity=pair["severity"],
-                description=pair["desc"],
-                source="Aetheris Drug DB (OpenFDA-derived)",
-            ))
-
-    # Try OpenFDA API for first medication (non-blocking)
-    if medications and settings.OPENFDA_BASE_URL:
-        try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                primary_drug = medications[0].split()[0]
-                url = f"https://api.fda.gov/drug/label.json?search=warnings:{primary_drug}&limit=1"
-                resp = await client.get(url)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    # Surface warning text if available
-                    results = data.get("results", [])
-                    if results and "warnings" in results[0]:
-                        logger.info(f"OpenFDA warning found for {primary_drug}")
-        except Exception as e:
-            logger.warning(f"OpenFDA API unavailable: {e}")
+# Drug classes named in KNOWN_INTERACTIONS → member drugs that count as that class
+DRUG_CLASSES = {
+    "ssri":     ["fluoxetine", "sertraline", "paroxetine", "citalopram", "escitalopram", "fluvoxamine"],
+    "nsaid":    ["ibuprofen", "naproxen", "diclofenac", "ketorolac", "celecoxib", "indomethacin", "meloxicam"],
+    "nitrates": ["nitroglycerin", "isosorbide"],
+}
 
-    return interactions
+# Built once: term automaton + pair index over the interaction database
+interaction_matcher = InteractionMatcher(KNOWN_INTERACTIONS, DRUG_CLASSES)
+
+def _primary_drug(medications: List[str]) -> Optional[str]:
+    """The OpenFDA lookup key: first word of the first medication."""
+    if medications and medications[0].split():
+        return medications[0].split()[0]
+    return None
+
+
+def match_known_interactions(medications: List[str]) -> List[DrugInteraction]:
+    """Check medications against the local known-interaction database."""
+    return [
+        DrugInteraction(
+            drug_a=pair["a"].title(),
+            drug_b=pair["b"].title(),
+            severity=pair["severity"],
+            description=pair["desc"],
+            source="Aetheris Drug DB (OpenFDA-derived)",
+        )
+        for pair in interaction_matcher.match(medications)
+    ]
+
+
+openfda_cache = TieredCache(
+    "openfda_label_warnings",
+    max_entries      = settings.OPENFDA_CACHE_MAX_ENTRIES,
+    ttl_sec          = settings.OPENFDA_CACHE_TTL_SEC,
+    negative_ttl_sec = settings.OPENFDA_CACHE_NEGATIVE_TTL_SEC,
+    error_ttl_sec    = settings.OPENFDA_CACHE_ERROR_TTL_SEC,
+    path             = settings.OPENFDA_CACHE_PATH or None,
+)
+openfda_flight = SingleFlight("openfda_lookup")
+
+
+async def _fetch_openfda_warnings(drug: str, client: httpx.AsyncClient) -> bool:
+    """One OpenFDA label query. True if a label has warnings; raises if the API is unavailable."""
+    url = f"https://api.fda.gov/drug/label.json?search=warnings:{drug}&limit=1"
+    resp = await client.get(url)
+    if resp.status_code == 404:   # OpenFDA's "no matches"
+        return False
+    if resp.status_code != 200:
+        raise httpx.HTTPError(f"OpenFDA returned HTTP {resp.status_code}")
+    # Surface warning text if available
+    results = resp.json().get("results", [])
+    if results and "warnings" in results[0]:
+        logger.info(f"OpenFDA warning found for {drug}")
+        return True
+    return False
+
+
+async def lookup_openfda_warnings(drug: str, client: Optional[httpx.AsyncClient] = None) -> bool:
+    """
+    Whether OpenFDA has label warnings for a drug, through the two-tier cache.
+    Never raises: while the API is unreachable, the last known answer (or
+    False) is returned.
+    """
+    client = client or http_clients.get(UPSTREAM_OPENFDA)
+    drug = drug.lower().strip()
+    # On a cold key, concurrent assessments for the same drug make one API call
+    return await openfda_flight.do(drug, lambda: openfda_cache.get_or_fetch(
+        drug,
+        lambda: _fetch_openfda_warnings(drug, client),
+        is_negative=lambda found: not found,
+        fallback=False,
+    ))
+
+
+async def check_openfda_warnings(medications: List[str]) -> bool:
+    """OpenFDA label warnings for the first medication (False when disabled or unknown)."""
+    primary_drug = _primary_drug(medications)
+    if primary_drug and settings.OPENFDA_BASE_URL:
+        return await lookup_openfda_warnings(primary_drug)
+    return False
+
+
+async def check_drug_interactions_batch(medication_lists: Sequence[List[str]]) -> List[List[DrugInteraction]]:
+    """
+    Drug checks for many patients. Identical medication sets share one local
+    match and each distinct primary drug is looked up on OpenFDA once.
+    """
+    by_med_set: Dict[Tuple[str, ...], List[DrugInteraction]] = {}
+    results = []
+    for meds in medication_lists:
+        key = tuple(sorted({m.lower().strip() for m in meds}))
+        if key not in by_med_set:
+            by_med_set[key] = match_known_interactions(meds)
+        results.append(by_med_set[key])
+
+    primary_drugs = {d for d in map(_primary_drug, medication_lists) if d}
+    if primary_drugs and settings.OPENFDA_BASE_URL:
+        await asyncio.gather(*(lookup_openfda_warnings(d) for d in primary_drugs))
+
+    return results
 
 
 # ── PRE-OP CHECKLIST ────────────────────────────────────────────────────────
@@ -242,9 +348,6 @@ async def generate_ai_summary(
 ) -> str:
     """Generate clinical AI summary using Claude API."""
     try:
-        import anthropic
-        client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
-
         interactions_text = ""
         if drug_interactions:
             interactions_text = "\n".join([
@@ -275,49 +378,48 @@ Drug Interactions:
 Write a 3-sentence clinical summary and one clear recommendation for the surgical team.
 Be concise, factual, and use clinical language appropriate for surgeons and anesthesiologists.
 """
-        message = await client.messages.create(
-            model=settings.LLM_MODEL,
-            max_tokens=400,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        return message.content[0].text
+        return await llm_gateway.complete(prompt, max_tokens=400, bypass_cache=req.regenerate)
 
     except Exception as e:
         logger.warning(f"Claude API unavailable, using fallback summary: {e}")
-        level = score_to_level(risk_scores["overall"])
-        return (
-            f"Patient scheduled for {req.surgery_type.value} surgery with predicted ASA Class {asa_predicted}. "
-            f"Overall surgical risk is assessed as {level} ({risk_scores['overall']}%) based on clinical profile. "
-            f"{'Drug interactions detected — review with pharmacist before proceeding. ' if drug_interactions else 'No significant drug interactions identified. '}"
-            f"Recommendation: {'Obtain specialist clearance before proceeding.' if level in ('HIGH','CRITICAL') else 'Proceed with standard pre-operative protocol.'}"
-        )
-
+        return fallback_summary(req, risk_scores, drug_interactions, asa_predicted)
 
-# ── MAIN SERVICE FUNCTION ──────────────────────────────────────────────────
-async def run_preop_assessment(req: PreOpAssessmentRequest) -> PreOpAssessmentResponse:
-    """Orchestrate the full pre-op assessment pipeline."""
-    logger.info(f"Running Pre-Op assessment for patient {req.patient_id}")
 
-    # 1. Calculate risk scores
-    scores = calculate_risk_scores(req)
-    risk_level = score_to_level(scores["overall"])
+def fallback_summary(
+    req: PreOpAssessmentRequest,
+    risk_scores: Dict,
+    drug_interactions: List[DrugInteraction],
+    asa_predicted: str,
+) -> str:
+    """Template summary used when Claude is unavailable or too slow."""
+    level = score_to_level(risk_scores["overall"])
+    return (
+        f"Patient scheduled for {req.surgery_type.value} surgery with predicted ASA Class {asa_predicted}. "
+        f"Overall surgical risk is assessed as {level} ({risk_scores['overall']}%) based on clinical profile. "
+        f"{'Drug interactions detected — review with pharmacist before proceeding. ' if drug_interactions else 'No significant drug interactions identified. '}"
+        f"Recommendation: {'Obtain specialist clearance before proceeding.' if level in ('HIGH','CRITICAL') else 'Proceed with standard pre-operative protocol.'}"
+    )
 
-    # 2. Predict ASA class
-    asa_predicted = predict_asa(req)
 
-    # 3. Check drug interactions (async)
-    drug_interactions = await check_drug_interactions(req.medications)
+# ── MAIN SERVICE FUNCTION ──────────────────────────────────────────────────
+def build_preop_response(
+    req: PreOpAssessmentRequest,
+    scores: Dict[str, float],
+    asa_predicted: str,
+    drug_interactions: List[DrugInteraction],
+    ai_summary: str,
+    stage_timings_ms: Optional[Dict[str, float]] = None,
+    fallback_stages: Optional[List[str]] = None,
+) -> PreOpAssessmentResponse:
+    """Assemble checklist, recommendation and response from computed stages."""
+    risk_level = score_to_level(scores["overall"])
 
-    # 4. Generate checklist
     checklist = generate_checklist(
         surgery_type=req.surgery_type.value,
         has_drug_interactions=len(drug_interactions) > 0,
         risk_level=risk_level,
     )
 
-    # 5. AI clinical summary (async)
-    ai_summary = await generate_ai_summary(req, scores, drug_interactions, asa_predicted)
-
     recommendation = (
         "Obtain cardiology clearance and consider ICU reservation post-operatively."
         if risk_level in ("HIGH", "CRITICAL")
@@ -339,5 +441,89 @@ async def run_preop_assessment(req: PreOpAssessmentRequest) -> PreOpAssessmentRe
         checklist          = checklist,
         recommendation     = recommendation,
         ai_summary         = ai_summary,
+        stage_timings_ms   = stage_timings_ms or {},
+        fallback_stages    = fallback_stages or [],
         created_at         = datetime.utcnow(),
     )
+
+
+preop_flight = SingleFlight("preop_assessment")
+
+async def run_preop_assessment(req: PreOpAssessmentRequest) -> PreOpAssessmentResponse:
+    """
+    Pre-op assessment for `req`. Identical requests already in flight (same
+    patient and inputs, e.g. surgeon and anesthesiologist opening the case
+    together) share one pipeline run; each caller still gets its own
+    assessment id.
+    """
+    run = await preop_flight.do(request_key(req), lambda: _run_preop_pipeline(req))
+    r = run.results
+    return build_preop_response(
+        req, r["risk_scores"], r["asa"], r["drug_interactions"], r["ai_summary"],
+        stage_timings_ms=run.timings_ms, fallback_stages=run.fallbacks,
+    )
+
+
+async def _run_preop_pipeline(req: PreOpAssessmentRequest) -> PipelineRun:
+    """
+    Orchestrate the full pre-op assessment pipeline as a dependency graph:
+
+        risk_scores ─────────┐
+        asa ─────────────────┼─→ ai_summary ─→ response
+        drug_interactions ───┘
+        openfda_warnings ─────────────────────→ response
+
+    Independent stages run concurrently, and the Claude summary starts as soon
+    as its inputs are ready. Slow or failing stages fall back (heuristic ASA,
+    template summary) after their deadline.
+    """
+    logger.info(f"Running Pre-Op assessment for patient {req.patient_id}")
+
+    return await run_pipeline([
+        Stage("risk_scores",       lambda r: calculate_risk_scores(req)),
+        Stage("asa",               lambda r: asa_batcher.submit(req),
+              timeout=settings.PREOP_ASA_TIMEOUT_SEC,
+              fallback=lambda r: heuristic_asa(req)),
+        Stage("drug_interactions", lambda r: match_known_interactions(req.medications)),
+        Stage("openfda_warnings",  lambda r: check_openfda_warnings(req.medications),
+              timeout=settings.PREOP_OPENFDA_TIMEOUT_SEC,
+              fallback=lambda r: False),
+        Stage("ai_summary",
+              lambda r: generate_ai_summary(req, r["risk_scores"], r["drug_interactions"], r["asa"]),
+              deps=("risk_scores", "asa", "drug_interactions"),
+              timeout=settings.PREOP_SUMMARY_TIMEOUT_SEC,
+              fallback=lambda r: fallback_summary(req, r["risk_scores"], r["drug_interactions"], r["asa"])),
+    ], label=f"preop {req.patient_id}")
+
+
+async def run_preop_assessment_batch(
+    reqs: Sequence[PreOpAssessmentRequest],
+) -> AsyncIterator[Tuple[int, PreOpAssessmentResponse]]:
+    """
+    Assess a whole OR schedule. Risk scores and ASA are computed once for all
+    rows, drug lookups are de-duplicated, and LLM summaries run with bounded
+    concurrency. Yields (index, response) as each case completes.
+    """
+    logger.info(f"Running batch Pre-Op assessment for {len(reqs)} cases")
+
+    scores_all = calculate_risk_scores_batch(reqs)
+    asa_all    = await inference_pool.run(predict_asa_batch, reqs)
+    drugs_all  = await check_drug_interactions_batch([r.medications for r in reqs])
+
+    llm_slots = asyncio.Semaphore(settings.PREOP_BATCH_LLM_CONCURRENCY)
+
+    async def finish(i: int) -> Tuple[int, PreOpAssessmentResponse]:
+        async with llm_slots:
+            ai_summary = await generate_ai_summary(reqs[i], scores_all[i], drugs_all[i], asa_all[i])
+        return i, build_preop_response(reqs[i], scores_all[i], asa_all[i], drugs_all[i], ai_summary)
+
+    tasks = [asyncio.create_task(finish(i)) for i in range(len(reqs))]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away mid-stream: stop the remaining summaries, and wait
+        # for them so none outlives the response or logs "never retrieved".
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
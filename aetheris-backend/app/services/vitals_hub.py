@@ -0,0 +1,143 @@
+"""
+Aetheris — Live Vitals Broadcast Hub
+One producer task per monitored patient generates each vitals tick, runs it
+through the stateful alert engine once, and fans the serialized frames out to
+every websocket subscribed to that patient. Producers start with the first subscriber and
+stop when the last one leaves, so cost scales with patients, not sockets.
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.services.alert_engine import AlertEvent, alert_engine
+from app.services.alert_store import alert_store
+from app.services.intraop_service import simulate_vitals
+
+logger = logging.getLogger("aetheris.vitals_hub")
+
+# Alert engine events that open a new entry in the alert store
+STORED_EVENTS = ("onset", "escalated")
+
+
+class PatientChannel:
+    """Subscribers and the producer task for one patient."""
+
+    def __init__(self, patient_id: str):
+        self.patient_id = patient_id
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.tick = 0
+
+
+class VitalsHub:
+    """
+    Per-patient publish/subscribe for the live vitals stream.
+
+    Each subscriber gets a bounded queue of ready-to-send text frames. A
+    socket that falls behind loses its oldest frames rather than slowing the
+    producer or the other dashboards.
+    """
+
+    def __init__(self, interval_sec: Optional[float] = None, queue_size: Optional[int] = None):
+        self.interval_sec = interval_sec if interval_sec is not None else settings.VITALS_STREAM_INTERVAL_SEC
+        self.queue_size = queue_size or settings.VITALS_STREAM_SUBSCRIBER_QUEUE
+        self._channels: Dict[str, PatientChannel] = {}
+
+        # Metrics
+        self.ticks_total = 0
+        self.frames_sent_total = 0
+        self.frames_dropped_total = 0
+        self.errors_total = 0
+
+    @asynccontextmanager
+    async def subscribe(self, patient_id: str) -> AsyncIterator[asyncio.Queue]:
+        """Yield a queue of JSON frames for `patient_id` until the caller exits."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        channel = self._channels.get(patient_id)
+        if channel is None:
+            channel = self._channels[patient_id] = PatientChannel(patient_id)
+        channel.subscribers.add(queue)
+        if channel.task is None or channel.task.done():
+            channel.task = asyncio.create_task(self._produce(channel), name=f"vitals-{patient_id}")
+            logger.info(f"Vitals producer started for patient {patient_id}")
+        try:
+            yield queue
+        finally:
+            channel.subscribers.discard(queue)
+            if not channel.subscribers:
+                channel.task.cancel()
+                if self._channels.get(patient_id) is channel:
+                    del self._channels[patient_id]
+                    alert_engine.forget(patient_id)
+                logger.info(f"Vitals producer stopped for patient {patient_id}")
+
+    async def _produce(self, channel: PatientChannel) -> None:
+        while True:
+            try:
+                await self._tick(channel)
+                self.ticks_total += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Keep streaming; one bad tick should not drop every dashboard
+                self.errors_total += 1
+                logger.warning(f"Vitals tick failed for patient {channel.patient_id}: {e}")
+            channel.tick += 1
+            await asyncio.sleep(self.interval_sec)
+
+    async def _tick(self, channel: PatientChannel) -> None:
+        """Publish one reading, then an alert frame if an alert state changed."""
+        vitals = simulate_vitals(channel.tick, channel.patient_id)
+        self._publish(channel, json.dumps(vitals))
+
+        self.publish_alerts(channel.patient_id, alert_engine.evaluate(channel.patient_id, vitals))
+
+    def publish_alerts(self, patient_id: str, events: List[AlertEvent]) -> None:
+        """
+        Store onset/escalation events and send one alert frame to the patient's
+        live subscribers, if any. Used for ingested readings as well as ticks.
+        """
+        if not events:
+            return
+        for event in events:
+            if event.kind in STORED_EVENTS:
+                alert_store.add(event.alert)
+        channel = self._channels.get(patient_id)
+        if channel is not None and channel.subscribers:
+            self._publish(channel, json.dumps({
+                "type": "ANOMALY_ALERT",
+                "alerts": [e.to_frame() for e in events],
+            }))
+
+    def _publish(self, channel: PatientChannel, frame: str) -> None:
+        for queue in channel.subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.frames_dropped_total += 1
+            queue.put_nowait(frame)
+            self.frames_sent_total += 1
+
+    async def shutdown(self) -> None:
+        """Stop all producers (app shutdown)."""
+        tasks = [c.task for c in self._channels.values() if c.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._channels.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "patients":             len(self._channels),
+            "subscribers":          sum(len(c.subscribers) for c in self._channels.values()),
+            "ticks_total":          self.ticks_total,
+            "frames_sent_total":    self.frames_sent_total,
+            "frames_dropped_total": self.frames_dropped_total,
+            "errors_total":         self.errors_total,
+        }
+
+
+vitals_hub = VitalsHub()
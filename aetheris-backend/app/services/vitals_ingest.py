@@ -0,0 +1,299 @@
+"""
+Aetheris — Bulk Vitals Ingestion
+Accepts batches of readings from OR monitor gateways (JSON array or NDJSON,
+many patients mixed together) without building a Pydantic model per reading:
+each vital is validated as a NumPy column against the VitalsReading bounds,
+readings are grouped per patient and appended to history in one pass, and
+the anomaly thresholds run once over the whole batch. Accepted readings then
+go through the stateful alert engine, like the live stream's ticks, so
+onsets reach the alert store and its push subscribers.
+
+Work is split in two: `prepare_batch` is pure CPU work and runs off the event
+loop; `apply_batch` touches the shared vitals store and runs on it.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.schemas import VitalsReading
+from app.services.alert_engine import alert_engine
+from app.services.intraop_service import VITAL_NAMES, _STATUS_NAMES, build_alert, classify_vitals
+from app.services.vitals_hub import vitals_hub
+from app.services.vitals_store import VITAL_COLUMNS, from_epoch_us, to_epoch_us, vitals_store
+from app.services.vitals_writer import vitals_row
+
+logger = logging.getLogger("aetheris.vitals_ingest")
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+class BulkIngestError(ValueError):
+    """The request body as a whole cannot be ingested (maps to HTTP 400)."""
+
+
+def _field_bounds(name: str) -> Tuple[float, float]:
+    lo, hi = -np.inf, np.inf
+    for constraint in VitalsReading.model_fields[name].metadata:
+        lo = getattr(constraint, "ge", lo)
+        hi = getattr(constraint, "le", hi)
+    return float(lo), float(hi)
+
+
+# Validation bounds per stored column, straight from the VitalsReading Field(ge, le)s
+_BOUNDS    = [_field_bounds(name) for name in VITAL_COLUMNS]
+_LOWER     = np.array([lo for lo, _ in _BOUNDS])
+_UPPER     = np.array([hi for _, hi in _BOUNDS])
+# Stored column order → threshold (VITAL_NAMES) order
+_THRESHOLD_ORDER = [VITAL_COLUMNS.index(name) for name in VITAL_NAMES]
+_COLUMN_OF = {name: j for j, name in enumerate(VITAL_COLUMNS)}
+
+
+# ── DECODING ───────────────────────────────────────────────────────────────
+def decode_body(body: bytes, content_type: Optional[str]) -> List[Any]:
+    """
+    JSON array, or NDJSON when the content type says so. A malformed NDJSON
+    line becomes a None item (rejected in its ack) rather than failing the batch.
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in NDJSON_CONTENT_TYPES:
+        items: List[Any] = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(None)
+    else:
+        try:
+            items = json.loads(body)
+        except ValueError as e:
+            raise BulkIngestError(f"Body is not valid JSON: {e}")
+        if not isinstance(items, list):
+            raise BulkIngestError("Body must be a JSON array of readings (or NDJSON)")
+
+    if not items:
+        raise BulkIngestError("No readings in request")
+    if len(items) > settings.VITALS_BULK_MAX_ITEMS:
+        raise BulkIngestError(f"Batch of {len(items)} exceeds VITALS_BULK_MAX_ITEMS={settings.VITALS_BULK_MAX_ITEMS}")
+    return items
+
+
+def _column(vitals: List[dict], name: str) -> np.ndarray:
+    """One vital across the batch as float64; missing or non-numeric → NaN."""
+    raw = [v.get(name) for v in vitals]
+    try:
+        return np.array(raw, dtype=np.float64)   # None → NaN
+    except (TypeError, ValueError):
+        return np.array([_to_float(x) for x in raw], dtype=np.float64)
+
+
+def _to_float(x: Any) -> float:
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+# ── PREPARE (off the event loop) ───────────────────────────────────────────
+class PreparedBatch:
+    """A validated, classified batch, ready to be appended to the store."""
+
+    def __init__(self, n: int, received_us: int = 0):
+        self.n            = n
+        self.received_us  = received_us
+        self.patient_ids: List[Optional[str]] = [None] * n
+        self.surgery_ids: List[Optional[str]] = [None] * n
+        self.errors:      Dict[int, List[str]] = {}
+        self.ts_us        = np.zeros(n, dtype=np.int64)
+        self.values       = np.zeros((n, len(VITAL_COLUMNS)), dtype=np.float64)
+        self.alerts:      Dict[int, List[dict]] = {}
+        self.accepted     = np.zeros(n, dtype=bool)   # set by apply_batch
+        # Valid rows as {patient_id: row indices sorted by time}
+        self.groups:      Dict[str, np.ndarray] = {}
+
+
+def prepare_batch(items: List[Any], received_at: Optional[datetime] = None) -> PreparedBatch:
+    """
+    Validate every reading, order each patient's readings by time, and run the
+    anomaly thresholds over the valid rows. Readings without a
+    vitals.recorded_at are stamped with `received_at`, and so are readings
+    up to VITALS_BULK_MAX_CLOCK_SKEW_SEC ahead of it, so a device clock
+    running fast cannot push a patient's history past server time (which
+    would make the server-stamped `/log` readings out of order).
+    """
+    received_at = received_at or datetime.utcnow()
+    received_us = to_epoch_us(received_at)
+    max_future_us = received_us + int(settings.VITALS_BULK_MAX_CLOCK_SKEW_SEC * 1_000_000)
+    batch = PreparedBatch(len(items), received_us)
+    errors = batch.errors
+
+    # Envelope: patient_id, surgery_id, vitals object, timestamp
+    vitals: List[dict] = []
+    empty: dict = {}
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[i] = ["reading must be a JSON object"]
+            vitals.append(empty)
+            continue
+        pid, v = item.get("patient_id"), item.get("vitals")
+        problems = []
+        if not isinstance(pid, str) or not pid:
+            problems.append("patient_id: required string")
+        else:
+            batch.patient_ids[i] = pid
+        sid = item.get("surgery_id")
+        if sid is not None and not isinstance(sid, str):
+            problems.append("surgery_id: must be a string")
+        batch.surgery_ids[i] = sid
+        if not isinstance(v, dict):
+            problems.append("vitals: required object")
+            v = empty
+        else:
+            ts = v.get("recorded_at")
+            if ts is None:
+                batch.ts_us[i] = received_us
+            else:
+                try:
+                    batch.ts_us[i] = to_epoch_us(datetime.fromisoformat(ts))
+                except (TypeError, ValueError):
+                    problems.append("vitals.recorded_at: invalid ISO 8601 datetime")
+                else:
+                    if batch.ts_us[i] > max_future_us:
+                        problems.append("vitals.recorded_at: in the future")
+                    elif batch.ts_us[i] > received_us:
+                        batch.ts_us[i] = received_us
+        if problems:
+            errors[i] = problems
+        vitals.append(v)
+
+    # Columns: one array per vital, range-checked in one comparison each
+    V = batch.values
+    for j, name in enumerate(VITAL_COLUMNS):
+        V[:, j] = _column(vitals, name)
+    missing = np.isnan(V)
+    out_of_range = ~missing & ((V < _LOWER) | (V > _UPPER))
+    for i, j in zip(*np.nonzero(missing | out_of_range)):
+        i, j = int(i), int(j)
+        if vitals[i] is not empty:   # no per-field noise when the envelope is already wrong
+            name = VITAL_COLUMNS[j]
+            errors.setdefault(i, []).append(
+                f"vitals.{name}: must be between {_BOUNDS[j][0]:g} and {_BOUNDS[j][1]:g}"
+                if out_of_range[i, j] else f"vitals.{name}: required number"
+            )
+
+    # Per-patient time order (lexsort is stable, so equal timestamps keep arrival order)
+    valid = np.ones(batch.n, dtype=bool)
+    if errors:
+        valid[list(errors)] = False
+    rows = np.flatnonzero(valid)
+    if rows.size:
+        codes: Dict[str, int] = {}
+        pid_codes = np.array([codes.setdefault(batch.patient_ids[i], len(codes)) for i in rows.tolist()])
+        perm = np.lexsort((batch.ts_us[rows], pid_codes))
+        order, pids_sorted = rows[perm], pid_codes[perm]
+        bounds = np.flatnonzero(np.r_[True, pids_sorted[1:] != pids_sorted[:-1]])
+        for group in np.split(order, bounds[1:]):
+            batch.groups[batch.patient_ids[int(group[0])]] = group
+
+        # Anomaly thresholds over the valid rows; alerts only for breaching cells
+        T = V[rows][:, _THRESHOLD_ORDER]
+        status = classify_vitals(T)
+        for r, j in zip(*np.nonzero(status)):
+            i = int(rows[r])
+            alert = build_alert(
+                batch.patient_ids[i], batch.surgery_ids[i], VITAL_NAMES[j],
+                float(T[r, j]), _STATUS_NAMES[status[r, j]],
+            )
+            batch.alerts.setdefault(i, []).append(alert.model_dump(mode="json"))
+    return batch
+
+
+def prepare_body(body: bytes, content_type: Optional[str], received_at: Optional[datetime] = None) -> PreparedBatch:
+    """decode_body + prepare_batch, for running in a worker thread."""
+    return prepare_batch(decode_body(body, content_type), received_at)
+
+
+# ── APPLY (on the event loop) ──────────────────────────────────────────────
+def apply_batch(batch: PreparedBatch) -> Dict[str, Any]:
+    """
+    Append each patient's rows to the vitals store in one call and build the
+    per-item acks. Rows older than the patient's newest stored reading are
+    rejected individually; the rest of that patient's rows are still stored
+    and fed, in time order, to the alert engine.
+    """
+    errors = batch.errors
+    accepted = batch.accepted
+    for pid, group in batch.groups.items():
+        ts = batch.ts_us[group]
+        newest = vitals_store.newest_us(pid)
+        stale = 0 if newest is None else int(np.searchsorted(ts, newest, side="left"))
+        if stale:
+            latest = from_epoch_us(newest).isoformat()
+            for i in group[:stale].tolist():
+                errors[i] = [f"out of order: older than the latest stored reading ({latest})"]
+        fresh = group[stale:]
+        vitals_store.append_many(pid, ts[stale:], batch.values[fresh])
+        accepted[fresh] = True
+        _raise_alerts(batch, pid, fresh)
+
+    acks: List[Dict[str, Any]] = []
+    n_alerts = 0
+    for i, ok in enumerate(accepted.tolist()):
+        ack: Dict[str, Any] = {"index": i, "patient_id": batch.patient_ids[i]}
+        if ok:
+            ack["status"] = "accepted"
+            fired = batch.alerts.get(i)
+            if fired:
+                ack["alerts"] = fired
+                n_alerts += len(fired)
+        else:
+            ack["status"] = "rejected"
+            ack["errors"] = errors[i]
+        acks.append(ack)
+
+    n_accepted = int(accepted.sum())
+    return {
+        "received": batch.n,
+        "accepted": n_accepted,
+        "rejected": batch.n - n_accepted,
+        "alerts":   n_alerts,
+        "acks":     acks,
+    }
+
+
+def _raise_alerts(batch: PreparedBatch, pid: str, rows: np.ndarray) -> None:
+    """
+    Run one patient's accepted rows through the alert engine. Device times
+    are mapped onto the engine's monotonic clock relative to receipt, so
+    clear holds and re-notify intervals follow the readings' own spacing.
+    Only breaching vitals and those with open alert state are passed: an
+    in-range vital with no state cannot produce an event.
+    """
+    now = time.monotonic()
+    for i, ts in zip(rows.tolist(), batch.ts_us[rows].tolist()):
+        names = [a["vital_type"] for a in batch.alerts.get(i, ())]
+        names.extend(n for n in alert_engine.active(pid) if n not in names)
+        if not names:
+            continue
+        values = batch.values[i].tolist()
+        events = alert_engine.evaluate(
+            pid, {n: values[_COLUMN_OF[n]] for n in names}, batch.surgery_ids[i],
+            now=now - (batch.received_us - ts) / 1_000_000,
+        )
+        vitals_hub.publish_alerts(pid, events)
+
+
+def log_rows(batch: PreparedBatch) -> List[Dict[str, Any]]:
+    """`vitals_logs` rows for the readings apply_batch accepted, for the write-behind queue."""
+    rows = np.flatnonzero(batch.accepted)
+    return [
+        vitals_row(batch.patient_ids[i], batch.surgery_ids[i], dict(zip(VITAL_COLUMNS, values)), from_epoch_us(ts))
+        for i, ts, values in zip(rows.tolist(), batch.ts_us[rows].tolist(), batch.values[rows].tolist())
+    ]
@@ -0,0 +1,324 @@
+"""
+Aetheris — Vitals History Store
+Per-patient vitals history in fixed-capacity ring buffers backed by
+preallocated NumPy arrays: one column per vital plus a timestamp column.
+Appends are O(1) with no copying; reads return zero-copy views.
+
+Alongside the raw samples, each patient keeps incremental rollup tiers
+(1 s, 1 min, 5 min buckets with min/max/mean/last) so a chart of any time
+range can be served from a bounded number of points.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.schemas import VitalsReading
+
+logger = logging.getLogger("aetheris.vitals_store")
+
+# Stored vitals, in VitalsReading field order (recorded_at is the timestamp column)
+VITAL_COLUMNS: Tuple[str, ...] = tuple(f for f in VitalsReading.model_fields if f != "recorded_at")
+
+# Rollup tiers: name → (bucket width in seconds, retention setting)
+ROLLUP_TIERS: Dict[str, Tuple[int, str]] = {
+    "1s": (1,   "VITALS_ROLLUP_1S_HOURS"),
+    "1m": (60,  "VITALS_ROLLUP_1M_HOURS"),
+    "5m": (300, "VITALS_ROLLUP_5M_HOURS"),
+}
+ROLLUP_STATS = ("min", "max", "mean", "last")
+
+
+class OutOfOrderError(ValueError):
+    """A reading is older than the newest one already stored for the patient."""
+
+_EPOCH = datetime(1970, 1, 1)
+_US    = timedelta(microseconds=1)
+
+
+def to_naive_utc(dt: datetime) -> datetime:
+    """Naive-UTC or aware datetime → naive UTC datetime."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def to_epoch_us(dt: datetime) -> int:
+    """Naive-UTC or aware datetime → integer microseconds since the epoch."""
+    return (to_naive_utc(dt) - _EPOCH) // _US
+
+
+def from_epoch_us(us: int) -> datetime:
+    """Integer microseconds since the epoch → naive UTC datetime."""
+    return _EPOCH + us * _US
+
+
+class VitalsRingBuffer:
+    """
+    Fixed-capacity ring of (timestamp, vitals) samples.
+
+    Storage is doubled and every sample is written at `i` and `i + capacity`,
+    so the newest n samples are always the contiguous slice ending at
+    `head + capacity` — reads never wrap and never copy.
+    """
+
+    def __init__(self, capacity: int, n_columns: int = len(VITAL_COLUMNS)):
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity   = capacity
+        # np.zeros maps pages lazily, so an unfilled buffer costs little resident memory
+        self.timestamps = np.zeros(2 * capacity, dtype=np.int64)                 # epoch µs
+        self.values     = np.zeros((2 * capacity, n_columns), dtype=np.float64)
+        self.head       = 0    # next slot to write, in [0, capacity)
+        self.count      = 0    # samples held, ≤ capacity
+        self.appended   = 0    # samples ever appended
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, ts_us: int, values: Sequence[float]) -> None:
+        i, j = self.head, self.head + self.capacity
+        self.timestamps[i] = self.timestamps[j] = ts_us
+        self.values[i] = self.values[j] = values
+        self.head = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.appended += 1
+
+    def append_many(self, ts_us: np.ndarray, values: np.ndarray) -> None:
+        """Append time-ordered samples with one scatter per array."""
+        n = ts_us.shape[0]
+        keep = min(n, self.capacity)      # older ones would be overwritten anyway
+        idx = (self.head + np.arange(n - keep, n)) % self.capacity
+        self.timestamps[idx] = self.timestamps[idx + self.capacity] = ts_us[n - keep:]
+        self.values[idx] = self.values[idx + self.capacity] = values[n - keep:]
+        self.head = (self.head + n) % self.capacity
+        self.count = min(self.count + n, self.capacity)
+        self.appended += n
+
+    def newest_us(self) -> Optional[int]:
+        return int(self.timestamps[self.head + self.capacity - 1]) if self.count else None
+
+    def last(self, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Read-only (timestamps, values) views of the newest n samples, oldest first."""
+        n = self.count if n is None else max(0, min(n, self.count))
+        end = self.head + self.capacity
+        ts, vals = self.timestamps[end - n:end], self.values[end - n:end]
+        ts.flags.writeable = vals.flags.writeable = False
+        return ts, vals
+
+
+class RollupTier:
+    """
+    Fixed-capacity ring of time buckets holding min/max/sum/last per vital.
+    Samples must arrive in time order; each one updates the newest bucket in
+    place or opens the next one, so the cost per sample is constant.
+    """
+
+    def __init__(self, width_sec: int, capacity: int, n_columns: int = len(VITAL_COLUMNS)):
+        self.width_us = width_sec * 1_000_000
+        self.capacity = max(1, capacity)
+        self.start    = np.zeros(self.capacity, dtype=np.int64)    # bucket start, epoch µs
+        self.count    = np.zeros(self.capacity, dtype=np.int64)
+        self.min      = np.zeros((self.capacity, n_columns))
+        self.max      = np.zeros((self.capacity, n_columns))
+        self.sum      = np.zeros((self.capacity, n_columns))
+        self.last     = np.zeros((self.capacity, n_columns))
+        self.head     = 0    # next slot to open
+        self.size     = 0
+
+    def add(self, ts_us: int, values: np.ndarray) -> None:
+        bucket = ts_us - ts_us % self.width_us
+        cur = self.head - 1
+        if self.size and self.start[cur] == bucket:
+            np.minimum(self.min[cur], values, out=self.min[cur])
+            np.maximum(self.max[cur], values, out=self.max[cur])
+            self.sum[cur] += values
+            self.last[cur] = values
+            self.count[cur] += 1
+            return
+        i = self.head
+        self.start[i] = bucket
+        self.count[i] = 1
+        self.min[i] = self.max[i] = self.sum[i] = self.last[i] = values
+        self.head = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def add_many(self, ts_us: np.ndarray, values: np.ndarray) -> None:
+        """Fold time-ordered samples in: reduce per bucket, then write the buckets."""
+        n = ts_us.shape[0]
+        buckets = ts_us - ts_us % self.width_us
+        first = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        last = np.r_[first[1:], n] - 1
+        g_start = buckets[first]
+        g_count = last - first + 1
+        g_min   = np.minimum.reduceat(values, first, axis=0)
+        g_max   = np.maximum.reduceat(values, first, axis=0)
+        g_sum   = np.add.reduceat(values, first, axis=0)
+        g_last  = values[last]
+
+        cur = self.head - 1
+        if self.size and self.start[cur] == g_start[0]:
+            np.minimum(self.min[cur], g_min[0], out=self.min[cur])
+            np.maximum(self.max[cur], g_max[0], out=self.max[cur])
+            self.sum[cur] += g_sum[0]
+            self.last[cur] = g_last[0]
+            self.count[cur] += g_count[0]
+            g_start, g_count, g_min, g_max, g_sum, g_last = (
+                a[1:] for a in (g_start, g_count, g_min, g_max, g_sum, g_last)
+            )
+
+        m = g_start.shape[0]
+        keep = min(m, self.capacity)
+        idx = (self.head + np.arange(m - keep, m)) % self.capacity
+        self.start[idx] = g_start[m - keep:]
+        self.count[idx] = g_count[m - keep:]
+        self.min[idx]   = g_min[m - keep:]
+        self.max[idx]   = g_max[m - keep:]
+        self.sum[idx]   = g_sum[m - keep:]
+        self.last[idx]  = g_last[m - keep:]
+        self.head = (self.head + m) % self.capacity
+        self.size = min(self.size + m, self.capacity)
+
+    def oldest_us(self) -> Optional[int]:
+        return int(self.start[(self.head - self.size) % self.capacity]) if self.size else None
+
+    def query(self, start_us: int, end_us: int, max_points: int) -> Tuple[Dict[str, np.ndarray], bool]:
+        """
+        Buckets starting in [start_us, end_us), oldest first, as columns
+        {"start", "count", "min", "max", "mean", "last"}. Keeps the newest
+        max_points buckets; the flag says whether any were cut.
+        """
+        slots = np.arange(self.head - self.size, self.head) % self.capacity
+        lo, hi = np.searchsorted(self.start[slots], [start_us, end_us])
+        truncated = hi - lo > max_points
+        slots = slots[max(lo, hi - max_points):hi]
+        return {
+            "start": self.start[slots],
+            "count": self.count[slots],
+            "min":   self.min[slots],
+            "max":   self.max[slots],
+            "mean":  self.sum[slots] / self.count[slots, None],
+            "last":  self.last[slots],
+        }, bool(truncated)
+
+
+class VitalsStore:
+    """Ring buffer and rollup tiers per patient, created on the patient's first reading."""
+
+    def __init__(self, capacity: Optional[int] = None):
+        self.capacity = capacity or max(1, int(settings.VITALS_HISTORY_HOURS * 3600 * settings.VITALS_HISTORY_SAMPLE_HZ))
+        self._buffers: Dict[str, VitalsRingBuffer] = {}
+        self._rollups: Dict[str, Dict[str, RollupTier]] = {}
+
+    def buffer(self, patient_id: str) -> Optional[VitalsRingBuffer]:
+        return self._buffers.get(patient_id)
+
+    def _new_tiers(self) -> Dict[str, RollupTier]:
+        return {
+            name: RollupTier(width, int(getattr(settings, retention) * 3600 / width))
+            for name, (width, retention) in ROLLUP_TIERS.items()
+        }
+
+    def append(self, patient_id: str, reading: VitalsReading, recorded_at: datetime) -> None:
+        """Store one reading. Raises OutOfOrderError if it predates the patient's newest one."""
+        buf = self._buffers.get(patient_id)
+        if buf is None:
+            buf = self._buffers[patient_id] = VitalsRingBuffer(self.capacity)
+            self._rollups[patient_id] = self._new_tiers()
+        ts_us = to_epoch_us(recorded_at)
+        newest = buf.newest_us()
+        if newest is not None and ts_us < newest:
+            raise OutOfOrderError(f"Reading at {recorded_at.isoformat()} is older than the latest stored for {patient_id}")
+        values = np.array([getattr(reading, c) for c in VITAL_COLUMNS], dtype=np.float64)
+        buf.append(ts_us, values)
+        for tier in self._rollups[patient_id].values():
+            tier.add(ts_us, values)
+
+    def append_many(self, patient_id: str, ts_us: np.ndarray, values: np.ndarray) -> None:
+        """
+        Store a time-ordered block of readings for one patient in a single pass.
+        Raises OutOfOrderError if the block starts before the patient's newest reading.
+        """
+        if ts_us.shape[0] == 0:
+            return
+        buf = self._buffers.get(patient_id)
+        if buf is None:
+            buf = self._buffers[patient_id] = VitalsRingBuffer(self.capacity)
+            self._rollups[patient_id] = self._new_tiers()
+        newest = buf.newest_us()
+        if newest is not None and ts_us[0] < newest:
+            raise OutOfOrderError(f"Readings for {patient_id} start before the latest stored reading")
+        buf.append_many(ts_us, values)
+        for tier in self._rollups[patient_id].values():
+            tier.add_many(ts_us, values)
+
+    def newest_us(self, patient_id: str) -> Optional[int]:
+        buf = self._buffers.get(patient_id)
+        return buf.newest_us() if buf is not None else None
+
+    def rollup(self, patient_id: str, resolution: str) -> Optional[RollupTier]:
+        return self._rollups.get(patient_id, {}).get(resolution)
+
+    def pick_resolution(self, patient_id: str, start_us: int, end_us: int, max_points: int) -> str:
+        """Finest tier that covers `start_us` and fits the range in max_points buckets."""
+        tiers = self._rollups.get(patient_id, {})
+        names = list(ROLLUP_TIERS)
+        for name in names:
+            width_us = ROLLUP_TIERS[name][0] * 1_000_000
+            tier = tiers.get(name)
+            oldest = tier.oldest_us() if tier is not None else None
+            fits = (end_us - start_us) / width_us <= max_points
+            covers = oldest is None or oldest <= start_us
+            if fits and covers:
+                return name
+        return names[-1]
+
+    def last(self, patient_id: str, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        buf = self._buffers.get(patient_id)
+        if buf is None:
+            return np.empty(0, dtype=np.int64), np.empty((0, len(VITAL_COLUMNS)))
+        return buf.last(n)
+
+    def size(self, patient_id: str) -> int:
+        buf = self._buffers.get(patient_id)
+        return len(buf) if buf is not None else 0
+
+    def metrics(self) -> Dict[str, int]:
+        buffers = self._buffers.values()
+        return {
+            "patients":             len(self._buffers),
+            "capacity_per_patient": self.capacity,
+            "samples_held":         sum(len(b) for b in buffers),
+            "bytes_allocated":      sum(b.timestamps.nbytes + b.values.nbytes for b in buffers)
+                                    + sum(_tier_nbytes(t) for tiers in self._rollups.values() for t in tiers.values()),
+        }
+
+
+def _tier_nbytes(tier: RollupTier) -> int:
+    return sum(a.nbytes for a in (tier.start, tier.count, tier.min, tier.max, tier.sum, tier.last))
+
+
+def rows_to_readings(ts: np.ndarray, values: np.ndarray) -> List[dict]:
+    """Materialise buffer rows as the API's reading dicts (only for rows being returned)."""
+    return [
+        {**dict(zip(VITAL_COLUMNS, row)), "recorded_at": from_epoch_us(t).isoformat()}
+        for t, row in zip(ts.tolist(), values.tolist())
+    ]
+
+
+def rollup_to_series(columns: Dict[str, np.ndarray]) -> Dict[str, object]:
+    """Rollup columns as a compact, chart-ready payload: parallel arrays per vital and stat."""
+    return {
+        "timestamps": [from_epoch_us(t).isoformat() for t in columns["start"].tolist()],
+        "count":      columns["count"].tolist(),
+        "series": {
+            vital: {stat: columns[stat][:, j].tolist() for stat in ROLLUP_STATS}
+            for j, vital in enumerate(VITAL_COLUMNS)
+        },
+    }
+
+
+vitals_store = VitalsStore()
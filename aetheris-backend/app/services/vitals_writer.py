@@ -0,0 +1,273 @@
+"""
+Aetheris — Write-Behind Vitals Persistence
+Readings are served from the in-memory vitals store; this queue copies them
+to the `vitals_logs` table without putting a database round trip on the
+request path. Rows accumulate in a bounded in-process queue and one flusher
+task writes them as a single executemany INSERT every
+VITALS_WRITE_INTERVAL_MS or VITALS_WRITE_BATCH_ROWS rows, whichever comes
+first. When the queue is full, producers wait (backpressure) and give up
+with WriteBehindFull after VITALS_WRITE_BACKPRESSURE_TIMEOUT_SEC. The queue
+is drained on shutdown.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import VitalsLog
+
+logger = logging.getLogger("aetheris.vitals_writer")
+
+
+class WriteBehindFull(RuntimeError):
+    """The write-behind queue stayed full for the whole backpressure timeout."""
+
+
+def vitals_row(
+    patient_id: str,
+    surgery_id: Optional[str],
+    values: Dict[str, float],
+    recorded_at: datetime,
+) -> Dict[str, Any]:
+    """One `vitals_logs` row. `recorded_at` is naive UTC, as used by the vitals store."""
+    return {
+        "patient_id":  patient_id,
+        "surgery_id":  surgery_id,
+        **values,
+        "recorded_at": recorded_at.replace(tzinfo=timezone.utc),
+    }
+
+
+class VitalsWriteBehind:
+    """Bounded queue of `vitals_logs` rows plus the task that flushes them in batches."""
+
+    def __init__(self):
+        self.enabled         = settings.VITALS_PERSIST_ENABLED
+        self.batch_rows      = settings.VITALS_WRITE_BATCH_ROWS
+        self.interval_sec    = settings.VITALS_WRITE_INTERVAL_MS / 1000
+        self.max_rows        = settings.VITALS_WRITE_QUEUE_MAX
+        self.wait_timeout    = settings.VITALS_WRITE_BACKPRESSURE_TIMEOUT_SEC
+        self.retries         = settings.VITALS_WRITE_RETRIES
+
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._oldest_at: Optional[float] = None   # monotonic time the oldest queued row arrived
+        # One entry per put: (sequence number just past its last row, monotonic arrival time)
+        self._arrivals: Deque[Tuple[int, float]] = deque()
+        self._seq_in  = 0    # rows ever queued
+        self._seq_out = 0    # rows ever taken for a flush
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None    # rows arrived / closing
+        self._space: Optional[asyncio.Event] = None   # a flush freed queue space
+        self._closing = False
+
+        # Metrics
+        self.rows_enqueued_total         = 0
+        self.rows_written_total          = 0
+        self.rows_dropped_total          = 0
+        self.flushes_total               = 0
+        self.flush_errors_total          = 0
+        self.backpressure_waits_total    = 0
+        self.backpressure_timeouts_total = 0
+        self.flush_rows_last             = 0
+        self.flush_ms_last               = 0.0
+        self.flush_ms_max                = 0.0
+        self._flush_ms_sum               = 0.0
+
+    # ── LIFECYCLE ───────────────────────────────────────────────────────────
+    def start(self) -> None:
+        if not self.enabled or (self._task is not None and not self._task.done()):
+            return
+        self._closing = False
+        self._wake = asyncio.Event()
+        self._space = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="vitals-write-behind")
+        logger.info(
+            f"Vitals write-behind started: flush every {self.interval_sec * 1000:.0f} ms "
+            f"or {self.batch_rows} rows, queue bound {self.max_rows}"
+        )
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Flush everything still queued, then stop the flusher (app shutdown)."""
+        if self._task is None:
+            return
+        timeout = timeout if timeout is not None else settings.VITALS_WRITE_DRAIN_TIMEOUT_SEC
+        pending = len(self._queue)
+        self._closing = True
+        self._wake.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+            logger.info(f"Vitals write-behind drained {pending} queued row(s)")
+        except asyncio.TimeoutError:
+            # Wait for the cancel to land so no insert is still running past shutdown
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self.rows_dropped_total += len(self._queue)
+            logger.error(f"Vitals write-behind drain timed out after {timeout}s; dropped {len(self._queue)} row(s)")
+            self._queue.clear()
+            self._arrivals.clear()
+            self._oldest_at = None
+        self._task = None
+
+    # ── PRODUCERS ───────────────────────────────────────────────────────────
+    async def wait_for_capacity(self, n: int = 1) -> None:
+        """
+        Wait until `n` more rows fit in the queue. Call it before changing any
+        other state, then put_nowait() without awaiting in between.
+        Raises WriteBehindFull if space does not free up in time.
+        """
+        if not self.enabled:
+            return
+        self.start()
+        if self._fits(n):
+            return
+        self.backpressure_waits_total += 1
+        deadline = time.monotonic() + self.wait_timeout
+        while not self._fits(n):
+            remaining = deadline - time.monotonic()
+            self._space.clear()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait_for(self._space.wait(), remaining)
+            except asyncio.TimeoutError:
+                self.backpressure_timeouts_total += 1
+                raise WriteBehindFull(
+                    f"Vitals persistence queue full ({len(self._queue)}/{self.max_rows} rows)"
+                )
+
+    def _fits(self, n: int) -> bool:
+        # An empty queue always admits a batch, even one larger than the bound
+        return not self._queue or len(self._queue) + n <= self.max_rows
+
+    def put_nowait(self, rows: List[Dict[str, Any]]) -> None:
+        """Queue rows for the next flush."""
+        if not self.enabled or not rows:
+            return
+        self.start()
+        was_empty = not self._queue
+        now = time.monotonic()
+        self._queue.extend(rows)
+        self._seq_in += len(rows)
+        self._arrivals.append((self._seq_in, now))
+        self.rows_enqueued_total += len(rows)
+        if was_empty:
+            self._oldest_at = now
+        if was_empty or len(self._queue) >= self.batch_rows:
+            self._wake.set()
+
+    # ── FLUSHER ─────────────────────────────────────────────────────────────
+    async def _run(self) -> None:
+        while True:
+            await self._wait_for_batch()
+            if not self._queue:
+                if self._closing:
+                    return
+                continue
+            n = min(len(self._queue), self.batch_rows)
+            rows = [self._queue.popleft() for _ in range(n)]
+            self._seq_out += n
+            # The deadline for the next flush follows the oldest row still queued
+            while self._arrivals and self._arrivals[0][0] <= self._seq_out:
+                self._arrivals.popleft()
+            self._oldest_at = self._arrivals[0][1] if self._arrivals else None
+            self._space.set()
+            try:
+                await self._flush(rows)
+            except asyncio.CancelledError:
+                # Drain timeout: the batch being written is lost with the queue
+                self.rows_dropped_total += len(rows)
+                logger.error(f"Vitals flush of {len(rows)} row(s) cancelled at shutdown")
+                raise
+
+    async def _wait_for_batch(self) -> None:
+        """Return once a full batch is queued, the oldest row is due, or we are closing."""
+        while not self._closing and len(self._queue) < self.batch_rows:
+            timeout = None
+            if self._oldest_at is not None:
+                timeout = self._oldest_at + self.interval_sec - time.monotonic()
+                if timeout <= 0:
+                    return
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                return
+
+    async def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        start = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(insert(VitalsLog), rows)
+                self.rows_written_total += len(rows)
+                break
+            except IntegrityError as e:
+                # e.g. an unknown patient_id where FKs are enforced; keep the rest of the batch
+                logger.warning(f"Vitals batch of {len(rows)} violated a constraint, inserting row by row: {e.orig}")
+                await self._flush_rows_individually(rows)
+                break
+            except Exception as e:
+                e = getattr(e, "orig", None) or e   # DBAPI error without SQLAlchemy's parameter dump
+                self.flush_errors_total += 1
+                if attempt == self.retries:
+                    self.rows_dropped_total += len(rows)
+                    logger.error(f"Dropped {len(rows)} vitals row(s) after {attempt + 1} failed flushes: {e}")
+                    break
+                logger.warning(f"Vitals flush failed (attempt {attempt + 1}), retrying: {e}")
+                await asyncio.sleep(0.5 * 2 ** attempt)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.flushes_total   += 1
+        self.flush_rows_last  = len(rows)
+        self.flush_ms_last    = elapsed_ms
+        self.flush_ms_max     = max(self.flush_ms_max, elapsed_ms)
+        self._flush_ms_sum   += elapsed_ms
+
+    async def _flush_rows_individually(self, rows: List[Dict[str, Any]]) -> None:
+        dropped = 0
+        for row in rows:
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(insert(VitalsLog), [row])
+                self.rows_written_total += 1
+            except Exception as e:
+                if not dropped:
+                    e = getattr(e, "orig", None) or e
+                    logger.error(f"Dropped vitals row for patient {row.get('patient_id')}: {e}")
+                dropped += 1
+                self.rows_dropped_total += 1
+                self.flush_errors_total += 1
+        if dropped > 1:
+            logger.error(f"Dropped {dropped} of {len(rows)} vitals row(s) in a row-by-row flush")
+
+    def metrics(self) -> Dict[str, Any]:
+        oldest_ms = (time.monotonic() - self._oldest_at) * 1000 if self._oldest_at is not None else 0.0
+        return {
+            "enabled":                     self.enabled,
+            "running":                     self._task is not None and not self._task.done(),
+            "queue_depth":                 len(self._queue),
+            "queue_capacity":              self.max_rows,
+            "oldest_row_age_ms":           round(oldest_ms, 1),
+            "rows_enqueued_total":         self.rows_enqueued_total,
+            "rows_written_total":          self.rows_written_total,
+            "rows_dropped_total":          self.rows_dropped_total,
+            "flushes_total":               self.flushes_total,
+            "flush_errors_total":          self.flush_errors_total,
+            "flush_rows_last":             self.flush_rows_last,
+            "flush_latency_ms_last":       round(self.flush_ms_last, 2),
+            "flush_latency_ms_avg":        round(self._flush_ms_sum / self.flushes_total, 2) if self.flushes_total else 0.0,
+            "flush_latency_ms_max":        round(self.flush_ms_max, 2),
+            "backpressure_waits_total":    self.backpressure_waits_total,
+            "backpressure_timeouts_total": self.backpressure_timeouts_total,
+        }
+
+
+vitals_writer = VitalsWriteBehind()
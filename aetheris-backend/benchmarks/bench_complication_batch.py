@@ -0,0 +1,67 @@
+"""
+Aetheris — Complication Risk Throughput Benchmark
+Compares per-patient scoring against the batch path at 1, 100 and 10k rows.
+
+Requires trained models: python -m app.ml.train
+Run: python -m benchmarks.bench_complication_batch
+"""
+
+import random
+import time
+
+from app.ml.model_registry import model_registry
+from app.schemas import ComplicationRiskRequest, SurgeryType
+from app.services.postop_service import predict_complications, predict_complications_batch
+
+SIZES = (1, 100, 10_000)
+SINGLE_MAX_ROWS = 100   # the one-at-a-time path is too slow to run at 10k
+
+
+def make_requests(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    types = list(SurgeryType)
+    return [
+        ComplicationRiskRequest(
+            patient_id    = f"p{i:05d}",
+            surgery_type  = rng.choice(types),
+            duration_min  = rng.randint(30, 480),
+            blood_loss_ml = rng.uniform(50, 2000),
+            asa_class     = rng.choice(["I", "II", "III", "IV"]),
+            age           = rng.randint(18, 90),
+            diabetes      = rng.random() < 0.15,
+            hypertension  = rng.random() < 0.30,
+            cardiac_hx    = rng.random() < 0.12,
+            smoker        = rng.random() < 0.20,
+        )
+        for i in range(n)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    model_registry.load()
+    if not model_registry.is_loaded("complication"):
+        raise SystemExit("Complication model not found — run `python -m app.ml.train` first.")
+
+    print(f"{'rows':>7} | {'path':<8} | {'total ms':>10} | {'rows/s':>10}")
+    print("-" * 46)
+    for n in SIZES:
+        reqs = make_requests(n)
+        repeat = 5 if n <= 100 else 2
+        if n <= SINGLE_MAX_ROWS:
+            t = timed(lambda: [predict_complications(r) for r in reqs], repeat)
+            print(f"{n:>7} | {'single':<8} | {t * 1e3:>10.1f} | {n / t:>10.0f}")
+        t = timed(lambda: predict_complications_batch(reqs), repeat)
+        print(f"{n:>7} | {'batch':<8} | {t * 1e3:>10.1f} | {n / t:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
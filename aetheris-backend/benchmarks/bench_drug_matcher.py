@@ -0,0 +1,87 @@
+"""
+Aetheris — Drug Interaction Matcher Benchmark
+Compares the original scan (substring checks of every pair against every
+medication) with the indexed matcher, on the shipped 10-pair database and on
+synthetic databases of 10k and 100k pairs. Both must find the same pairs.
+
+Run: python -m benchmarks.bench_drug_matcher
+"""
+
+import gc
+import random
+import string
+import time
+
+from app.services.drug_matcher import InteractionMatcher
+from app.services.preop_service import KNOWN_INTERACTIONS
+
+SIZES = (10, 10_000, 100_000)
+PATIENTS = 200
+MEDS_PER_PATIENT = 8
+
+
+def scan_interactions(interactions, medications):
+    """The pre-index algorithm: O(pairs × meds)."""
+    meds_lower = [m.lower().strip() for m in medications]
+    return [
+        pair for pair in interactions
+        if any(pair["a"] in m for m in meds_lower) and any(pair["b"] in m for m in meds_lower)
+    ]
+
+
+def make_database(n: int, rng: random.Random):
+    if n <= len(KNOWN_INTERACTIONS):
+        return list(KNOWN_INTERACTIONS[:n])
+    # ~one distinct drug name per 5 pairs, like a real interaction table
+    vocab = list({
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(6, 12)))
+        for _ in range(max(50, n // 5))
+    })
+    pairs = [
+        {"a": a, "b": b, "severity": "MEDIUM", "desc": "synthetic"}
+        for a, b in (rng.sample(vocab, 2) for _ in range(n))
+    ]
+    return pairs
+
+
+def make_patients(interactions, rng: random.Random):
+    drugs = sorted({p["a"] for p in interactions} | {p["b"] for p in interactions})
+    return [
+        [f"{d} {rng.choice((5, 10, 20, 50))}mg" for d in rng.sample(drugs, min(MEDS_PER_PATIENT, len(drugs)))]
+        for _ in range(PATIENTS)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rng = random.Random(11)
+    print(f"{'pairs':>8} | {'build ms':>9} | {'scan µs/patient':>15} | {'index µs/patient':>16} | {'speedup':>8}")
+    print("-" * 70)
+    for n in SIZES:
+        interactions = make_database(n, rng)
+        patients = make_patients(interactions, rng)
+
+        start = time.perf_counter()
+        matcher = InteractionMatcher(interactions)
+        build = time.perf_counter() - start
+
+        for meds in patients:
+            assert matcher.match(meds) == scan_interactions(interactions, meds)
+
+        repeat = 3 if n > 10_000 else 5
+        t_scan  = timed(lambda: [scan_interactions(interactions, m) for m in patients], repeat) / PATIENTS
+        t_index = timed(lambda: [matcher.match(m) for m in patients], repeat) / PATIENTS
+        print(f"{n:>8} | {build * 1e3:>9.1f} | {t_scan * 1e6:>15.1f} | {t_index * 1e6:>16.1f} | {t_scan / t_index:>7.0f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Aetheris — Compiled Tree Engine Benchmark
+Per-row latency of the flat NumPy engine vs. sklearn for both models.
+
+Requires trained models: python -m app.ml.train
+Run: python -m benchmarks.bench_tree_engine
+"""
+
+import time
+import warnings
+
+from app.ml.model_service import (
+    compile_asa_model, compile_complication_model,
+    load_asa_model, load_complication_model, load_scaler,
+)
+from app.ml.tree_engine import probe_matrix
+
+ROWS = (1, 8, 64, 512, 4096)
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def per_row_us(fn, X, budget_sec: float = 0.5) -> float:
+    fn(X)
+    runs, start = 0, time.perf_counter()
+    while time.perf_counter() - start < budget_sec or runs < 3:
+        fn(X)
+        runs += 1
+    return (time.perf_counter() - start) / runs / X.shape[0] * 1e6
+
+
+def main():
+    asa, scaler, comp = load_asa_model(), load_scaler(), load_complication_model()
+    asa_engine  = compile_asa_model(asa, scaler)
+    comp_engine = compile_complication_model(comp)
+
+    asa_X  = probe_matrix(asa_engine.ensemble, len(asa["features"]), max(ROWS))
+    asa_X  = asa_X * asa_engine.scaler_scale + asa_engine.scaler_mean
+    comp_X = probe_matrix(comp_engine.ensemble, len(comp["features"]), max(ROWS))
+
+    cases = [
+        ("asa",          lambda X: asa["model"].predict(scaler.transform(X)), asa_engine.predict, asa_X),
+        ("complication", comp["model"].predict, comp_engine.predict, comp_X),
+    ]
+    print(f"{'model':<13} | {'rows':>5} | {'sklearn us/row':>14} | {'engine us/row':>13} | {'speedup':>7}")
+    print("-" * 65)
+    for name, sk_fn, engine_fn, X_all in cases:
+        for n in ROWS:
+            X = X_all[:n]
+            sk, en = per_row_us(sk_fn, X), per_row_us(engine_fn, X)
+            print(f"{name:<13} | {n:>5} | {sk:>14.1f} | {en:>13.1f} | {sk / en:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
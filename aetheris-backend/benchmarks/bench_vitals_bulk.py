@@ -0,0 +1,111 @@
+"""
+Aetheris — Bulk Vitals Ingestion Benchmark
+Compares posting readings one at a time to /api/vitals/log against one
+/api/vitals/bulk request (JSON array and NDJSON), and times the in-process
+prepare/apply stages of the bulk path. Runs the app lifespan, so accepted
+readings also go through the write-behind queue to DATABASE_URL.
+
+Run: python -m benchmarks.bench_vitals_bulk
+"""
+
+import gc
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.vitals_ingest import apply_batch, prepare_body
+from app.services.vitals_store import vitals_store
+
+SIZES = (1_000, 10_000, 50_000)
+SINGLE_N = 1_000     # /log is only timed at this size; it scales linearly
+PATIENTS = 40        # one gateway's ORs
+
+
+def make_items(n: int, start: datetime, seed: int = 7):
+    """n readings round-robin over PATIENTS at 1 Hz each, ~10% breaching a threshold."""
+    rng = random.Random(seed)
+    return [
+        {
+            "patient_id": f"or-{i % PATIENTS:02d}",
+            "vitals": {
+                "heart_rate":   round(rng.gauss(75, 12), 1),
+                "spo2":         round(min(100, rng.gauss(97.5, 1.5)), 1),
+                "systolic_bp":  round(rng.gauss(120, 15), 1),
+                "diastolic_bp": round(rng.gauss(78, 9), 1),
+                "temperature":  round(rng.gauss(36.8, 0.3), 2),
+                "etco2":        round(rng.gauss(38, 4), 1),
+                "resp_rate":    round(rng.gauss(15, 2.5), 1),
+                "recorded_at":  (start + timedelta(seconds=i // PATIENTS)).isoformat(),
+            },
+        }
+        for i in range(n)
+    ]
+
+
+def timed(fn) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    with TestClient(app) as client:
+        run(client)
+
+
+def run(client: TestClient):
+    # Each run writes newer timestamps than the last, so nothing is rejected as out of order
+    clock = datetime.utcnow() - timedelta(days=2)
+
+    def fresh(n):
+        nonlocal clock
+        items = make_items(n, clock)
+        clock += timedelta(seconds=n // PATIENTS + 1)
+        return items
+
+    items = fresh(SINGLE_N)
+    # /log stamps readings with server time, so it gets its own patients
+    logs = [{"patient_id": "log-" + it["patient_id"], "vitals": it["vitals"]} for it in items]
+    t = timed(lambda: [client.post("/api/vitals/log", json=p) for p in logs])
+    print(f"/log x {SINGLE_N}: {t * 1e3:8.1f} ms  ({SINGLE_N / t:>9.0f} readings/s)\n")
+
+    print(f"{'readings':>8} | {'path':<12} | {'total ms':>9} | {'readings/s':>10}")
+    print("-" * 50)
+    for n in SIZES:
+        body = json.dumps(fresh(n)).encode()
+        resp = None
+
+        def post(content_type):
+            nonlocal resp
+            resp = client.post("/api/vitals/bulk", content=body, headers={"content-type": content_type})
+        t = timed(lambda: post("application/json"))
+        assert resp.json()["accepted"] == n, resp.json()["rejected"]
+        print(f"{n:>8} | {'bulk json':<12} | {t * 1e3:>9.1f} | {n / t:>10.0f}")
+
+        body = "\n".join(json.dumps(it) for it in fresh(n)).encode()
+        t = timed(lambda: post("application/x-ndjson"))
+        assert resp.json()["accepted"] == n, resp.json()["rejected"]
+        print(f"{n:>8} | {'bulk ndjson':<12} | {t * 1e3:>9.1f} | {n / t:>10.0f}")
+
+        body = json.dumps(fresh(n)).encode()
+        batch = None
+
+        def prepare():
+            nonlocal batch
+            batch = prepare_body(body, "application/json")
+        t_prep = timed(prepare)
+        t_apply = timed(lambda: apply_batch(batch))
+        print(f"{n:>8} | {'  prepare':<12} | {t_prep * 1e3:>9.1f} |")
+        print(f"{n:>8} | {'  apply':<12} | {t_apply * 1e3:>9.1f} |")
+
+    print(f"\nstore:   {vitals_store.metrics()}")
+    print(f"persist: {client.get('/metrics').json()['vitals_persist']}")
+
+
+if __name__ == "__main__":
+    main()
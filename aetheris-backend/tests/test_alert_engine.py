@@ -0,0 +1,84 @@
+"""
+Alert engine state machine: notifications on status changes only, onset at
+the THRESHOLDS values, and clear-side hysteresis with a hold time.
+"""
+
+import pytest
+
+from app.services.alert_engine import AlertEngine, status_with_hysteresis
+from app.services.intraop_service import THRESHOLDS, check_vital_status
+
+
+def _engine() -> AlertEngine:
+    return AlertEngine(renotify_critical_sec=60, renotify_warning_sec=300, clear_hold_sec=30)
+
+
+def _kinds(events):
+    return [(e.kind, e.vital, e.status) for e in events]
+
+
+@pytest.mark.parametrize("name", sorted(THRESHOLDS))
+def test_onset_matches_check_vital_status(name):
+    t = THRESHOLDS[name]
+    for value in (t["critical_low"], t["warning_low"], t["warning_high"], t["critical_high"],
+                  t["critical_low"] - 1, t["warning_low"] + 0.5, t["critical_high"] + 1):
+        assert status_with_hysteresis(name, value) == check_vital_status(name, value)
+
+
+def test_onset_fires_at_threshold():
+    engine = _engine()
+    assert _kinds(engine.evaluate("p1", {"spo2": 90}, now=0)) == [("onset", "spo2", "critical_low")]
+    assert _kinds(engine.evaluate("p2", {"heart_rate": 40, "systolic_bp": 80}, now=0)) == [
+        ("onset", "heart_rate", "critical_low"), ("onset", "systolic_bp", "critical_low"),
+    ]
+
+
+def test_repeated_breach_is_suppressed_until_renotify():
+    engine = _engine()
+    assert _kinds(engine.evaluate("p1", {"spo2": 92}, now=0)) == [("onset", "spo2", "warning_low")]
+    for now in range(1, 300, 5):
+        assert engine.evaluate("p1", {"spo2": 92}, now=now) == []
+    assert _kinds(engine.evaluate("p1", {"spo2": 92}, now=300)) == [("renotify", "spo2", "warning_low")]
+    assert engine.evaluate("p1", {"spo2": 92}, now=301) == []
+
+
+def test_escalation_is_immediate_and_critical_renotifies_faster():
+    engine = _engine()
+    engine.evaluate("p1", {"spo2": 92}, now=0)
+    assert _kinds(engine.evaluate("p1", {"spo2": 90}, now=1)) == [("escalated", "spo2", "critical_low")]
+    assert engine.evaluate("p1", {"spo2": 89}, now=60) == []
+    assert _kinds(engine.evaluate("p1", {"spo2": 89}, now=61)) == [("renotify", "spo2", "critical_low")]
+
+
+def test_deescalation_needs_clear_band_and_hold():
+    engine = _engine()
+    engine.evaluate("p1", {"spo2": 88}, now=0)
+    # Just above the critical threshold but inside the clear band: still critical
+    assert engine.evaluate("p1", {"spo2": 90.5}, now=1) == []
+    # Past the band, but not for ALERT_CLEAR_HOLD_SEC yet
+    assert engine.evaluate("p1", {"spo2": 92}, now=2) == []
+    assert engine.evaluate("p1", {"spo2": 92}, now=31) == []
+    assert _kinds(engine.evaluate("p1", {"spo2": 92}, now=32)) == [("deescalated", "spo2", "warning_low")]
+
+
+def test_dip_during_hold_restarts_it():
+    engine = _engine()
+    engine.evaluate("p1", {"heart_rate": 125}, now=0)
+    assert engine.evaluate("p1", {"heart_rate": 100}, now=10) == []
+    assert engine.evaluate("p1", {"heart_rate": 121}, now=20) == []    # back in the band: hold resets
+    assert engine.evaluate("p1", {"heart_rate": 100}, now=30) == []
+    assert engine.evaluate("p1", {"heart_rate": 100}, now=59) == []
+    assert _kinds(engine.evaluate("p1", {"heart_rate": 100}, now=60)) == [("resolved", "heart_rate", "normal")]
+
+
+def test_resolution_after_clear_hold_clears_state():
+    engine = _engine()
+    engine.evaluate("p1", {"spo2": 92, "heart_rate": 75}, now=0)
+    assert engine.active("p1") == {"spo2": "warning_low"}
+    assert engine.evaluate("p1", {"spo2": 95}, now=1) == []
+    events = engine.evaluate("p1", {"spo2": 95}, now=31)
+    assert _kinds(events) == [("resolved", "spo2", "normal")]
+    assert events[0].alert.severity.value == "info"
+    assert engine.active("p1") == {}
+    # A fresh breach is a new onset
+    assert _kinds(engine.evaluate("p1", {"spo2": 92}, now=40)) == [("onset", "spo2", "warning_low")]
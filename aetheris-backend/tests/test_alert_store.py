@@ -0,0 +1,106 @@
+"""
+Indexed alert store: cursor pagination over each index, acknowledgement and
+the events it publishes.
+"""
+
+import pytest
+
+from app.schemas import AlertCreate, AlertSeverity
+from app.services.alert_events import EVENT_ACKNOWLEDGED, AlertEventBus
+from app.services.alert_store import AlertStore, InvalidCursor
+
+
+def _alert(pid: str, n: int = 0) -> AlertCreate:
+    return AlertCreate(patient_id=pid, severity=AlertSeverity.WARNING, title=f"alert {n}", message="")
+
+
+def _bus(monkeypatch) -> AlertEventBus:
+    bus = AlertEventBus(replay_size=100)
+    monkeypatch.setattr("app.services.alert_store.alert_events", bus)
+    return bus
+
+
+def _acks(bus: AlertEventBus):
+    return [e for e in bus._replay if e.kind == EVENT_ACKNOWLEDGED]
+
+
+def test_reacknowledge_is_a_noop(monkeypatch):
+    bus = _bus(monkeypatch)
+    store = AlertStore()
+    alert = store.add(_alert("p1"))
+
+    assert store.acknowledge(alert["id"], "nurse-a")
+    assert store.acknowledge(alert["id"], "nurse-b")
+    assert store.get(alert["id"])["acknowledged_by"] == "nurse-a"
+    assert len(_acks(bus)) == 1
+    assert store.acknowledge_all("p1") == 0
+    assert store.acknowledge_all() == 0
+    assert len(_acks(bus)) == 1
+
+
+def _pages(store: AlertStore, limit: int, **filters):
+    """Every page of a query, following next_cursor; and the totals reported."""
+    pages, totals, cursor = [], set(), None
+    while True:
+        alerts, cursor, total = store.query(cursor=cursor, limit=limit, **filters)
+        pages.append([a["title"] for a in alerts])
+        totals.add(total)
+        if cursor is None:
+            return pages, totals
+
+
+@pytest.fixture
+def store(monkeypatch):
+    _bus(monkeypatch)
+    store = AlertStore()
+    for n in range(25):
+        store.add(_alert(f"p{n % 3}", n))
+    return store
+
+
+@pytest.mark.parametrize("limit", [1, 4, 7, 25, 100])
+def test_cursor_pages_cover_timeline_newest_first(store, limit):
+    pages, totals = _pages(store, limit)
+    assert [t for page in pages for t in page] == [f"alert {n}" for n in reversed(range(25))]
+    assert all(len(page) == limit for page in pages[:-1]) and 0 < len(pages[-1]) <= limit
+    assert totals == {25}
+
+
+def test_cursor_pages_per_patient_and_unacked(store):
+    p1 = [f"alert {n}" for n in reversed(range(25)) if n % 3 == 1]
+    pages, totals = _pages(store, 3, patient_id="p1")
+    assert [t for page in pages for t in page] == p1 and totals == {len(p1)}
+
+    # Acknowledge some of p1's alerts: the unread index skips them
+    for alert in store.query(patient_id="p1", limit=100)[0][::2]:
+        store.acknowledge(alert["id"])
+    pages, totals = _pages(store, 2, patient_id="p1", unread_only=True)
+    assert [t for page in pages for t in page] == p1[1::2] and totals == {len(p1[1::2])}
+
+
+def test_unbounded_query_returns_everything(store):
+    alerts, cursor, total = store.query(limit=None)
+    assert len(alerts) == total == 25 and cursor is None
+    alerts, cursor, total = store.query(unread_only=True, limit=None)
+    assert len(alerts) == total == 25 and cursor is None
+
+
+@pytest.mark.parametrize("cursor", ["abc", "0", "-3", "10000"])
+def test_foreign_cursor_rejected(store, cursor):
+    with pytest.raises(InvalidCursor):
+        store.query(cursor=cursor)
+
+
+def test_acknowledge_all_for_one_patient(monkeypatch, store):
+    bus = _bus(monkeypatch)
+    n_p2 = store.query(patient_id="p2", limit=None)[2]
+
+    assert store.acknowledge_all("p2", "nurse-a") == n_p2
+    assert len(_acks(bus)) == n_p2
+    assert store.query(patient_id="p2", unread_only=True)[2] == 0
+    assert all(a["acknowledged_by"] == "nurse-a" for a in store.query(patient_id="p2", limit=None)[0])
+    # Other patients are untouched, in both unread indexes
+    assert store.query(unread_only=True)[2] == 25 - n_p2
+    assert all(not a["acknowledged"] for a in store.query(patient_id="p0", limit=None)[0])
+    assert store.acknowledge_all("p2") == 0
+    assert store.acknowledge_all() == 25 - n_p2
@@ -0,0 +1,66 @@
+"""
+The indexed drug interaction matcher must find exactly the pairs the original
+substring scan found, in the same (database) order.
+"""
+
+import itertools
+import random
+import string
+
+import pytest
+
+from app.services.drug_matcher import InteractionMatcher
+from app.services.preop_service import DRUG_CLASSES, KNOWN_INTERACTIONS
+
+
+def scan_interactions(interactions, medications):
+    """The pre-index algorithm: substring checks of every pair against every medication."""
+    meds_lower = [m.lower().strip() for m in medications]
+    return [
+        pair for pair in interactions
+        if any(pair["a"] in m for m in meds_lower) and any(pair["b"] in m for m in meds_lower)
+    ]
+
+
+def test_known_database_matches_scan():
+    matcher = InteractionMatcher(KNOWN_INTERACTIONS)
+    drugs = sorted({p["a"] for p in KNOWN_INTERACTIONS} | {p["b"] for p in KNOWN_INTERACTIONS})
+    spellings = [
+        lambda d: d, lambda d: f"{d} 5mg", lambda d: f"{d.title()} 81 MG daily",
+        lambda d: f"  {d.upper()}  ", lambda d: f"xx{d}yy",
+    ]
+    for a, b in itertools.combinations(drugs, 2):
+        for spell in spellings:
+            meds = [spell(a), spell(b), "paracetamol 1g"]
+            assert matcher.match(meds) == scan_interactions(KNOWN_INTERACTIONS, meds)
+
+
+def test_overlapping_terms_match_scan():
+    # Terms that are prefixes, suffixes or infixes of each other exercise the failure links
+    terms = ["ab", "abc", "bc", "c", "abcd", "bcd", "d"]
+    interactions = [{"a": a, "b": b, "severity": "LOW", "desc": ""} for a, b in itertools.permutations(terms, 2)]
+    matcher = InteractionMatcher(interactions)
+    for meds in (["abcd"], ["xabx", "cd"], ["bcd", "ab"], ["a", "b"], ["dcba"], ["abc abc"]):
+        assert matcher.match(meds) == scan_interactions(interactions, meds)
+
+
+@pytest.mark.parametrize("n_pairs", [100, 5000])
+def test_synthetic_database_matches_scan(n_pairs):
+    rng = random.Random(n_pairs)
+    vocab = sorted({"".join(rng.choices(string.ascii_lowercase[:8], k=rng.randint(3, 7))) for _ in range(n_pairs // 3)})
+    interactions = [
+        {"a": a, "b": b, "severity": "MEDIUM", "desc": "synthetic"}
+        for a, b in (rng.sample(vocab, 2) for _ in range(n_pairs))
+    ]
+    matcher = InteractionMatcher(interactions)
+    for _ in range(200):
+        meds = [f"{rng.choice(vocab)}{rng.choice(['', ' 10mg', 'x'])}" for _ in range(rng.randint(1, 8))]
+        assert matcher.match(meds) == scan_interactions(interactions, meds)
+
+
+def test_class_members_match_their_class():
+    matcher = InteractionMatcher(KNOWN_INTERACTIONS, DRUG_CLASSES)
+    found = matcher.match(["Sertraline 50mg", "Tramadol 50mg"])
+    assert [(p["a"], p["b"]) for p in found] == [("ssri", "tramadol")]
+    # Without the class table only the literal class name matches, as before
+    assert InteractionMatcher(KNOWN_INTERACTIONS).match(["Sertraline 50mg", "Tramadol 50mg"]) == []
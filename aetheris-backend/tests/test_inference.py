@@ -0,0 +1,21 @@
+"""
+Vectorized score rounding must agree with the scalar round(x, 1) it replaced.
+"""
+
+import numpy as np
+
+from app.core.inference import round1
+
+
+def test_round1_matches_builtin_round_on_ties():
+    values = np.array([60.15, 0.25, 2.675, 1.05, 33.35, -0.45, 12.0])
+    assert np.round(values, 1).tolist() != [round(v, 1) for v in values.tolist()]   # the bug being avoided
+    assert round1(values).tolist() == [round(v, 1) for v in values.tolist()]
+
+
+def test_round1_keeps_shape():
+    rng = np.random.default_rng(0)
+    values = np.round(rng.uniform(0, 100, size=(50, 4)), 2) + 0.05
+    out = round1(values)
+    assert out.shape == values.shape
+    assert out.tolist() == [[round(v, 1) for v in row] for row in values.tolist()]
@@ -0,0 +1,24 @@
+"""
+Token bucket reservations: a waiter that is cancelled gives its token back.
+"""
+
+import asyncio
+
+from app.core.resilience import TokenBucket
+
+
+def test_cancelled_waiter_returns_its_token():
+    async def scenario():
+        bucket = TokenBucket(rate=10, burst=1)
+        assert await bucket.acquire()               # burst used up
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0)                      # reserves the next token, then sleeps
+        assert bucket._tokens < 0
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        bucket._refill()
+        # Only the first acquire's token is owed now, not the cancelled one's
+        assert bucket._tokens > -0.01
+        assert await bucket.acquire(timeout=0.15)
+
+    asyncio.run(scenario())
@@ -0,0 +1,121 @@
+"""
+Compiled tree engine vs sklearn: both must reach the same leaves, including
+for inputs that sit exactly on a split threshold or one float32 step either
+side of it (sklearn descends in float32 against float64 thresholds).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestRegressor
+from sklearn.multioutput import MultiOutputRegressor
+from sklearn.preprocessing import StandardScaler
+
+from app.ml.model_service import compile_asa_model, compile_complication_model
+from app.ml.tree_engine import ROW_CHUNK, compile_forest_regressor, compile_gradient_boosting
+
+FEATURES = ["age", "bmi", "duration", "blood_loss", "albumin", "diabetes"]
+TARGETS  = ["dvt_risk", "infection_risk"]
+SCALES   = np.array([18.0, 6.0, 60.0, 200.0, 0.5, 1.0])
+CENTERS  = np.array([55.0, 27.0, 150.0, 300.0, 3.8, 0.0])
+
+
+def _frame(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, len(FEATURES))) * SCALES + CENTERS
+    X[:, -1] = rng.integers(0, 2, n)
+    return pd.DataFrame(X, columns=FEATURES)
+
+
+def _edge_values(t: float) -> list:
+    """A float64 threshold, its float32 rounding and the float32 neighbours of that."""
+    t32 = np.float32(t)
+    return [t, float(t32), float(np.nextafter(t32, np.float32(-np.inf))), float(np.nextafter(t32, np.float32(np.inf)))]
+
+
+def _edge_rows(trees, n_features: int, seed: int = 7, per_feature: int = 25) -> np.ndarray:
+    """Rows that put one feature on (or a float32 ulp beside) a split threshold of `trees`."""
+    rng = np.random.default_rng(seed)
+    base = _frame(1, seed).to_numpy()[0]
+    rows = []
+    for j in range(n_features):
+        thresholds = np.unique(np.concatenate([t.threshold[t.feature == j] for t in trees]))
+        for t in rng.choice(thresholds, min(per_feature, thresholds.size), replace=False):
+            for v in _edge_values(t):
+                row = base.copy()
+                row[j] = v
+                rows.append(row)
+    return np.array(rows)
+
+
+def _softmax(raw: np.ndarray) -> np.ndarray:
+    if raw.shape[1] == 1:
+        p = 1 / (1 + np.exp(-raw[:, 0]))
+        return np.column_stack([1 - p, p])
+    e = np.exp(raw - raw.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+# ── ASA: GradientBoostingClassifier (+ StandardScaler) ─────────────────────
+def _asa_model(n_classes: int, scaled: bool):
+    df = _frame(800, seed=n_classes)
+    score = df["age"] / 18 + df["bmi"] / 6 - df["albumin"] + df["diabetes"]
+    y = np.digitize(score, np.quantile(score, np.linspace(0, 1, n_classes + 1)[1:-1])) + 1
+    scaler = StandardScaler().fit(df) if scaled else None
+    X = scaler.transform(df) if scaled else df.to_numpy()
+    model = GradientBoostingClassifier(n_estimators=30, max_depth=4, random_state=0).fit(X, y)
+    return model, scaler
+
+
+@pytest.mark.parametrize("n_classes", [2, 4])
+def test_asa_compiled_matches_sklearn(n_classes):
+    model, scaler = _asa_model(n_classes, scaled=True)
+    compiled = compile_asa_model({"model": model, "features": FEATURES}, scaler)
+
+    df = _frame(ROW_CHUNK + 300, seed=42)   # spans more than one row chunk
+    X_scaled = scaler.transform(df)
+    assert np.array_equal(compiled.predict(df.to_numpy()), model.predict(X_scaled))
+    np.testing.assert_allclose(
+        _softmax(compiled.decision_function(df.to_numpy())), model.predict_proba(X_scaled), rtol=1e-9, atol=1e-12,
+    )
+
+
+@pytest.mark.parametrize("n_classes", [2, 4])
+def test_asa_compiled_matches_sklearn_at_thresholds(n_classes):
+    model, _ = _asa_model(n_classes, scaled=False)
+    compiled = compile_gradient_boosting(model, FEATURES)
+    trees = [est.tree_ for est in model.estimators_.ravel()]
+    X = _edge_rows(trees, len(FEATURES))
+
+    np.testing.assert_allclose(compiled.decision_function(X), model.decision_function(X).reshape(len(X), -1),
+                               rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(_softmax(compiled.decision_function(X)), model.predict_proba(X), rtol=1e-9, atol=1e-12)
+    assert np.array_equal(compiled.predict(X), model.predict(X))
+
+
+# ── COMPLICATIONS: MultiOutputRegressor(RandomForestRegressor) ─────────────
+@pytest.fixture(scope="module")
+def complication_model():
+    df = _frame(600, seed=3)
+    y = pd.DataFrame({
+        "dvt_risk":       df["age"] * 0.1 + df["duration"] * 0.02 + df["diabetes"] * 5,
+        "infection_risk": df["blood_loss"] * 0.005 + df["diabetes"] * 10 - df["albumin"],
+    })
+    return MultiOutputRegressor(RandomForestRegressor(n_estimators=15, random_state=0)).fit(df, y)
+
+
+def test_complication_compiled_matches_sklearn(complication_model):
+    bundle = {"model": complication_model, "features": FEATURES, "targets": TARGETS}
+    compiled = compile_complication_model(bundle)
+
+    df = _frame(ROW_CHUNK + 300, seed=43)
+    np.testing.assert_allclose(compiled.predict(df.to_numpy()), complication_model.predict(df), rtol=1e-9, atol=1e-9)
+
+
+def test_complication_compiled_matches_sklearn_at_thresholds(complication_model):
+    compiled = compile_forest_regressor(complication_model, FEATURES, TARGETS)
+    trees = [tree.tree_ for forest in complication_model.estimators_ for tree in forest.estimators_]
+    X = _edge_rows(trees, len(FEATURES))
+
+    expected = complication_model.predict(pd.DataFrame(X, columns=FEATURES))
+    np.testing.assert_allclose(compiled.predict(X), expected, rtol=1e-9, atol=1e-9)
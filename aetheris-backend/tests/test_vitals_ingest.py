@@ -0,0 +1,161 @@
+"""
+Bulk vitals ingestion: decoding, per-reading validation, per-patient time
+order, stale-row rejection, ack counts, and alerts reaching the alert store.
+"""
+
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.services.alert_engine import alert_engine
+from app.services.alert_store import alert_store
+from app.services.vitals_ingest import BulkIngestError, apply_batch, decode_body, prepare_batch
+from app.services.vitals_store import to_epoch_us, vitals_store
+
+NORMAL = {"heart_rate": 72, "spo2": 98, "systolic_bp": 118, "diastolic_bp": 76,
+          "temperature": 36.7, "etco2": 37, "resp_rate": 14}
+T0 = datetime(2025, 1, 1, 10, 0, 0)
+
+
+def _pid() -> str:
+    return f"test-{uuid.uuid4().hex[:8]}"
+
+
+def _reading(pid: str, at: datetime, **vitals) -> dict:
+    return {"patient_id": pid, "vitals": {**NORMAL, **vitals, "recorded_at": at.isoformat()}}
+
+
+# ── DECODING ───────────────────────────────────────────────────────────────
+def test_ndjson_malformed_line_is_rejected_alone():
+    pid = _pid()
+    lines = [json.dumps(_reading(pid, T0)), "{not json", "", json.dumps(_reading(pid, T0 + timedelta(seconds=1)))]
+    items = decode_body("\n".join(lines).encode(), "application/x-ndjson; charset=utf-8")
+    assert len(items) == 3 and items[1] is None
+
+    result = apply_batch(prepare_batch(items, received_at=T0 + timedelta(minutes=1)))
+    assert [a["status"] for a in result["acks"]] == ["accepted", "rejected", "accepted"]
+    assert result["acks"][1]["errors"] == ["reading must be a JSON object"]
+
+
+@pytest.mark.parametrize("body, content_type", [
+    (b"{not json", "application/json"),
+    (b'{"patient_id": "p1"}', "application/json"),
+    (b"[]", None),
+    (b"\n\n", "application/x-ndjson"),
+])
+def test_unusable_body_fails_the_batch(body, content_type):
+    with pytest.raises(BulkIngestError):
+        decode_body(body, content_type)
+
+
+def test_batch_size_limit(monkeypatch):
+    monkeypatch.setattr(settings, "VITALS_BULK_MAX_ITEMS", 2)
+    with pytest.raises(BulkIngestError):
+        decode_body(json.dumps([{}, {}, {}]).encode(), "application/json")
+
+
+# ── VALIDATION ─────────────────────────────────────────────────────────────
+def test_per_field_errors():
+    pid = _pid()
+    missing = _reading(pid, T0)
+    del missing["vitals"]["etco2"]
+    items = [
+        _reading(pid, T0, heart_rate=400, spo2=-1),
+        missing,
+        _reading(pid, T0, temperature="warm"),
+        {"patient_id": "", "vitals": "x"},
+        {"vitals": {**NORMAL, "recorded_at": "yesterday"}, "patient_id": pid},
+    ]
+    errors = prepare_batch(items, received_at=T0).errors
+    assert errors[0] == ["vitals.heart_rate: must be between 0 and 300", "vitals.spo2: must be between 0 and 100"]
+    assert errors[1] == ["vitals.etco2: required number"]
+    assert errors[2] == ["vitals.temperature: required number"]
+    # A broken envelope reports itself, not every vital
+    assert errors[3] == ["patient_id: required string", "vitals: required object"]
+    assert errors[4] == ["vitals.recorded_at: invalid ISO 8601 datetime"]
+
+
+def test_future_timestamps_clamped_within_skew_rejected_beyond():
+    pid = _pid()
+    received = T0
+    skew = timedelta(seconds=settings.VITALS_BULK_MAX_CLOCK_SKEW_SEC)
+    batch = prepare_batch([
+        _reading(pid, received + skew / 2),
+        _reading(pid, received + skew + timedelta(seconds=1)),
+        {"patient_id": pid, "vitals": NORMAL},
+    ], received_at=received)
+    assert batch.ts_us[0] == to_epoch_us(received)
+    assert batch.errors[1] == ["vitals.recorded_at: in the future"]
+    assert batch.ts_us[2] == to_epoch_us(received)
+
+
+# ── ORDERING AND APPLY ─────────────────────────────────────────────────────
+def test_mixed_patients_sorted_per_patient():
+    a, b = _pid(), _pid()
+    items = [
+        _reading(a, T0 + timedelta(seconds=2), heart_rate=62),
+        _reading(b, T0 + timedelta(seconds=1), heart_rate=91),
+        _reading(a, T0, heart_rate=60),
+        _reading(b, T0, heart_rate=90),
+        _reading(a, T0 + timedelta(seconds=1), heart_rate=61),
+    ]
+    batch = prepare_batch(items, received_at=T0 + timedelta(minutes=1))
+    assert batch.groups[a].tolist() == [2, 4, 0]
+    assert batch.groups[b].tolist() == [3, 1]
+
+    result = apply_batch(batch)
+    assert result["accepted"] == 5
+    assert vitals_store.newest_us(a) == to_epoch_us(T0 + timedelta(seconds=2))
+    assert vitals_store.newest_us(b) == to_epoch_us(T0 + timedelta(seconds=1))
+
+
+def test_stale_rows_rejected_rest_of_patient_kept():
+    pid = _pid()
+    received = T0 + timedelta(minutes=5)
+    apply_batch(prepare_batch([_reading(pid, T0 + timedelta(seconds=10))], received_at=received))
+
+    batch = prepare_batch([
+        _reading(pid, T0 + timedelta(seconds=5)),
+        _reading(pid, T0 + timedelta(seconds=10)),     # same instant as the newest: kept
+        _reading(pid, T0 + timedelta(seconds=20)),
+        _reading(pid, T0 + timedelta(seconds=25), heart_rate=1000),
+    ], received_at=received)
+    result = apply_batch(batch)
+
+    assert [a["status"] for a in result["acks"]] == ["rejected", "accepted", "accepted", "rejected"]
+    assert result["acks"][0]["errors"][0].startswith("out of order")
+    assert (result["received"], result["accepted"], result["rejected"]) == (4, 2, 2)
+    assert vitals_store.newest_us(pid) == to_epoch_us(T0 + timedelta(seconds=20))
+
+
+def test_acks_in_request_order_with_alert_counts():
+    pid = _pid()
+    result = apply_batch(prepare_batch([
+        _reading(pid, T0, spo2=86, heart_rate=130),
+        _reading(pid, T0 + timedelta(seconds=1)),
+        {"patient_id": pid},
+    ], received_at=T0 + timedelta(minutes=1)))
+
+    assert [a["index"] for a in result["acks"]] == [0, 1, 2]
+    assert [v["vital_type"] for v in result["acks"][0]["alerts"]] == ["heart_rate", "spo2"]
+    assert "alerts" not in result["acks"][1]
+    assert (result["accepted"], result["rejected"], result["alerts"]) == (2, 1, 2)
+
+
+# ── ALERTS ─────────────────────────────────────────────────────────────────
+def test_breaches_reach_the_alert_store_once():
+    pid = _pid()
+    received = T0 + timedelta(minutes=10)
+    items = [_reading(pid, T0 + timedelta(seconds=s), spo2=88) for s in range(0, 30, 2)]
+    result = apply_batch(prepare_batch(items, received_at=received))
+
+    # Every reading breaches, but the engine opens one stored alert
+    assert result["alerts"] == len(items)
+    alerts, _, total = alert_store.query(patient_id=pid)
+    assert total == 1
+    assert alerts[0]["vital_type"] == "spo2" and alerts[0]["severity"] == "critical"
+    assert alert_engine.active(pid) == {"spo2": "critical_low"}
+    alert_engine.forget(pid)